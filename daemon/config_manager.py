@@ -10,7 +10,7 @@ from dataclasses import dataclass, field
 class BlockConfig:
     """Конфигурация блочного хеширования"""
     size: int = 64 * 1024  # 64 KB
-    algorithm: str = "sha256"
+    algorithm: str = "blake3"  # sha256 - для совместимости
 
 @dataclass
 class RansomwareThresholds:
@@ -25,6 +25,18 @@ class MonitoringConfig:
     """Конфигурация мониторинга"""
     fallback_interval: int = 60  # секунд
     use_inotify: bool = True
+    # Одна метка fanotify на ФС вместо inotify на каждую директорию. Выключено
+    # по умолчанию: метка FAN_MARK_FILESYSTEM доставляет события всех файлов
+    # ФС (включая чужие записи вне защищаемых путей) и требует CAP_SYS_ADMIN
+    use_fanotify: bool = False
+
+@dataclass
+class RetentionConfig:
+    """Конфигурация хранения резервных копий и карантина"""
+    max_backups_per_file: int = 5  # последняя копия файла не удаляется никогда
+    backup_max_age: int = 30 * 24 * 3600  # секунд, 0 - без ограничения
+    quarantine_max_age: int = 0  # секунд, 0 - без ограничения
+    cleanup_interval: int = 3600  # секунд
 
 @dataclass
 class SystemConfig:
@@ -33,6 +45,7 @@ class SystemConfig:
     block_config: BlockConfig = field(default_factory=BlockConfig)
     ransomware_thresholds: RansomwareThresholds = field(default_factory=RansomwareThresholds)
     monitoring: MonitoringConfig = field(default_factory=MonitoringConfig)
+    retention: RetentionConfig = field(default_factory=RetentionConfig)
     storage_path: str = "/var/lib/secure_fs_guard/storage"
     log_path: str = "/var/log/secure_fs_guard/system.log"
     ipc_socket: str = "/var/run/secure_fs_guard.sock"
@@ -84,7 +97,7 @@ class ConfigManager:
                 bc = data['block_config']
                 self.config.block_config = BlockConfig(
                     size=bc.get('size', 64 * 1024),
-                    algorithm=bc.get('algorithm', 'sha256')
+                    algorithm=bc.get('algorithm', 'blake3')
                 )
             
             # Загрузка порогов ransomware
@@ -102,7 +115,18 @@ class ConfigManager:
                 mc = data['monitoring']
                 self.config.monitoring = MonitoringConfig(
                     fallback_interval=mc.get('fallback_interval', 60),
-                    use_inotify=mc.get('use_inotify', True)
+                    use_inotify=mc.get('use_inotify', True),
+                    use_fanotify=mc.get('use_fanotify', False)
+                )
+            
+            # Загрузка конфигурации хранения копий
+            if 'retention' in data:
+                rc = data['retention']
+                self.config.retention = RetentionConfig(
+                    max_backups_per_file=rc.get('max_backups_per_file', 5),
+                    backup_max_age=rc.get('backup_max_age', 30 * 24 * 3600),
+                    quarantine_max_age=rc.get('quarantine_max_age', 0),
+                    cleanup_interval=rc.get('cleanup_interval', 3600)
                 )
             
             # Остальные параметры
@@ -125,7 +149,7 @@ class ConfigManager:
             ],
             'block_config': {
                 'size': 65536,  # 64 KB
-                'algorithm': 'sha256'
+                'algorithm': 'blake3'
             },
             'ransomware_thresholds': {
                 'files_count': 10,
@@ -135,7 +159,14 @@ class ConfigManager:
             },
             'monitoring': {
                 'fallback_interval': 60,
-                'use_inotify': True
+                'use_inotify': True,
+                'use_fanotify': False
+            },
+            'retention': {
+                'max_backups_per_file': 5,
+                'backup_max_age': 2592000,  # 30 дней
+                'quarantine_max_age': 0,
+                'cleanup_interval': 3600
             },
             'storage_path': '/var/lib/secure_fs_guard/storage',
             'log_path': '/var/log/secure_fs_guard/system.log',
@@ -170,7 +201,14 @@ class ConfigManager:
                 },
                 'monitoring': {
                     'fallback_interval': self.config.monitoring.fallback_interval,
-                    'use_inotify': self.config.monitoring.use_inotify
+                    'use_inotify': self.config.monitoring.use_inotify,
+                    'use_fanotify': self.config.monitoring.use_fanotify
+                },
+                'retention': {
+                    'max_backups_per_file': self.config.retention.max_backups_per_file,
+                    'backup_max_age': self.config.retention.backup_max_age,
+                    'quarantine_max_age': self.config.retention.quarantine_max_age,
+                    'cleanup_interval': self.config.retention.cleanup_interval
                 },
                 'storage_path': self.config.storage_path,
                 'log_path': self.config.log_path,
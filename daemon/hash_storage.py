@@ -3,10 +3,14 @@
 import sqlite3
 import os
 import json
+import queue
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Tuple, Set, Iterator
 from datetime import datetime
 from dataclasses import dataclass
+from contextlib import contextmanager
 
 @dataclass
 class FileRecord:
@@ -20,6 +24,7 @@ class FileRecord:
     updated_at: str
     is_trusted: bool = True
     backup_path: Optional[str] = None
+    hash_algorithm: str = "sha256"  # алгоритм, которым вычислены хэши блоков
 
 class HashStorage:
     """
@@ -32,11 +37,37 @@ class HashStorage:
     - связь с резервными копиями
     """
     
+    # Число файлов в одной транзакции массовой вставки (add_files)
+    BULK_BATCH_SIZE = 500
+    
+    # Число соединений только для чтения (запросы IPC не ждут записи)
+    READ_POOL_SIZE = 4
+    
+    # Время жизни закэшированной статистики (секунды)
+    STATISTICS_TTL = 1.0
+    
+    # Число путей в одном запросе get_file_summaries (лимит параметров SQLite - 999)
+    SUMMARY_BATCH_SIZE = 500
+    
     def __init__(self, storage_path: str = "/var/lib/secure_fs_guard/storage/hashes.db"):
         self.storage_path = storage_path
         self.connection: Optional[sqlite3.Connection] = None
+        
+        # Блокировка записи через общее соединение: транзакции разных потоков
+        # не перемешиваются
+        self._write_lock = threading.RLock()
+        
+        # Пути файлов в доверенном состоянии (проверка без обращения к БД)
+        self._tracked_paths: Set[str] = set()
+        
+        # Пул соединений только для чтения и кэш статистики (срок, значение)
+        self._read_pool: queue.Queue = queue.Queue()
+        self._statistics_cache: Tuple[float, Optional[Dict]] = (0.0, None)
+        
         self._ensure_storage_directory()
         self._init_database()
+        self._init_read_pool()
+        self._tracked_paths = set(self.get_all_files())
     
     def _ensure_storage_directory(self):
         """Создание директории хранилища с правильными правами"""
@@ -55,6 +86,10 @@ class HashStorage:
             
             cursor = self.connection.cursor()
             
+            # WAL-журнал и временные таблицы в памяти
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            
             # Таблица файлов
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS files (
@@ -66,10 +101,20 @@ class HashStorage:
                     created_at TEXT NOT NULL,
                     updated_at TEXT NOT NULL,
                     is_trusted INTEGER DEFAULT 1,
-                    backup_path TEXT
+                    backup_path TEXT,
+                    hash_algorithm TEXT NOT NULL DEFAULT 'sha256'
                 )
             """)
             
+            # Миграция баз, созданных до появления тега алгоритма
+            # (существующие эталоны вычислены SHA-256)
+            cursor.execute("PRAGMA table_info(files)")
+            columns = {row['name'] for row in cursor.fetchall()}
+            if 'hash_algorithm' not in columns:
+                cursor.execute("""
+                    ALTER TABLE files ADD COLUMN hash_algorithm TEXT NOT NULL DEFAULT 'sha256'
+                """)
+            
             # Таблица хэшей блоков
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS block_hashes (
@@ -100,8 +145,33 @@ class HashStorage:
         except sqlite3.Error as e:
             raise Exception(f"Ошибка инициализации базы данных: {e}")
     
+    def _init_read_pool(self):
+        """Открытие соединений только для чтения (WAL позволяет читать параллельно с записью)"""
+        uri = Path(os.path.abspath(self.storage_path)).as_uri() + "?mode=ro"
+        
+        try:
+            for _ in range(self.READ_POOL_SIZE):
+                connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+                connection.row_factory = sqlite3.Row
+                connection.execute("PRAGMA query_only=ON")
+                connection.execute("PRAGMA mmap_size=268435456")  # 256 MB
+                self._read_pool.put(connection)
+        
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка открытия соединений для чтения: {e}")
+    
+    @contextmanager
+    def _read_connection(self):
+        """Получение соединения только для чтения из пула"""
+        connection = self._read_pool.get()
+        try:
+            yield connection
+        finally:
+            self._read_pool.put(connection)
+    
     def add_file(self, file_path: str, file_size: int, block_size: int, 
-                 block_hashes: List[str], backup_path: Optional[str] = None) -> bool:
+                 block_hashes: List[str], backup_path: Optional[str] = None,
+                 hash_algorithm: str = "sha256") -> bool:
         """
         Добавление файла в доверенное состояние
         
@@ -111,45 +181,105 @@ class HashStorage:
             block_size: размер блока в байтах
             block_hashes: список хэшей блоков
             backup_path: путь к резервной копии
+            hash_algorithm: алгоритм, которым вычислены хэши блоков
             
         Returns:
             True если добавление успешно
         """
-        try:
-            cursor = self.connection.cursor()
-            now = datetime.now().isoformat()
-            blocks_count = len(block_hashes)
-            
-            # Вставка записи о файле
-            cursor.execute("""
-                INSERT OR REPLACE INTO files 
-                (file_path, file_size, block_size, blocks_count, created_at, updated_at, is_trusted, backup_path)
-                VALUES (?, ?, ?, ?, ?, ?, 1, ?)
-            """, (file_path, file_size, block_size, blocks_count, now, now, backup_path))
-            
-            file_id = cursor.lastrowid
+        with self._write_lock:
+            try:
+                self._insert_file(self.connection.cursor(), file_path, file_size, block_size,
+                                  block_hashes, backup_path, hash_algorithm)
+                self.connection.commit()
+                self._tracked_paths.add(file_path)
+                return True
+                
+            except sqlite3.Error as e:
+                self.connection.rollback()
+                raise Exception(f"Ошибка добавления файла {file_path}: {e}")
+    
+    def add_files(self, files: List[tuple]) -> List[Tuple[str, Optional[Exception]]]:
+        """
+        Добавление пачки файлов одной транзакцией
+        
+        Блокировка записи удерживается только на время вставки пачки:
+        хэши и резервные копии подготавливаются вызывающим кодом заранее.
+        Каждый файл - отдельная точка сохранения, ошибка откатывает только его.
+        Пачки больше BULK_BATCH_SIZE не рекомендуются - запись из других
+        потоков ждёт окончания транзакции
+        
+        Args:
+            files: [(путь, размер, размер блока, хэши блоков, путь к копии, алгоритм)]
             
-            # Удаление старых хэшей (если файл обновляется)
-            cursor.execute("DELETE FROM block_hashes WHERE file_id = ?", (file_id,))
+        Returns:
+            [(путь, ошибка или None)] в порядке files
+        """
+        results = []
+        with self._write_lock:
+            cursor = self.connection.cursor()
+            cursor.execute("PRAGMA synchronous")
+            previous_synchronous = cursor.fetchone()[0]
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            
+            try:
+                for file_path, file_size, block_size, block_hashes, backup_path, hash_algorithm in files:
+                    cursor.execute("SAVEPOINT add_file")
+                    try:
+                        self._insert_file(cursor, file_path, file_size, block_size,
+                                          block_hashes, backup_path, hash_algorithm)
+                        cursor.execute("RELEASE SAVEPOINT add_file")
+                        results.append((file_path, None))
+                    except sqlite3.Error as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT add_file")
+                        cursor.execute("RELEASE SAVEPOINT add_file")
+                        results.append((file_path, Exception(f"Ошибка добавления файла {file_path}: {e}")))
+                
+                self.connection.commit()
             
-            # Вставка хэшей блоков
-            for block_index, hash_value in enumerate(block_hashes):
-                cursor.execute("""
-                    INSERT INTO block_hashes (file_id, block_index, hash_value)
-                    VALUES (?, ?, ?)
-                """, (file_id, block_index, hash_value))
+            except Exception:
+                self.connection.rollback()
+                raise
             
-            self.connection.commit()
-            return True
+            finally:
+                cursor.execute(f"PRAGMA synchronous={int(previous_synchronous)}")
             
-        except sqlite3.Error as e:
-            self.connection.rollback()
-            raise Exception(f"Ошибка добавления файла {file_path}: {e}")
+            self._tracked_paths.update(file_path for file_path, error in results if error is None)
+        
+        return results
+    
+    @staticmethod
+    def _insert_file(cursor: sqlite3.Cursor, file_path: str, file_size: int, block_size: int,
+                     block_hashes: List[str], backup_path: Optional[str], hash_algorithm: str):
+        """Вставка записи о файле и хэшей его блоков (без фиксации транзакции)"""
+        now = datetime.now().isoformat()
+        blocks_count = len(block_hashes)
+        
+        # Вставка записи о файле
+        cursor.execute("""
+            INSERT OR REPLACE INTO files 
+            (file_path, file_size, block_size, blocks_count, created_at, updated_at, is_trusted, backup_path,
+             hash_algorithm)
+            VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)
+        """, (file_path, file_size, block_size, blocks_count, now, now, backup_path, hash_algorithm))
+        
+        file_id = cursor.lastrowid
+        
+        # Удаление старых хэшей (если файл обновляется)
+        cursor.execute("DELETE FROM block_hashes WHERE file_id = ?", (file_id,))
+        
+        # Вставка хэшей блоков
+        cursor.executemany("""
+            INSERT INTO block_hashes (file_id, block_index, hash_value)
+            VALUES (?, ?, ?)
+        """, [(file_id, block_index, hash_value) for block_index, hash_value in enumerate(block_hashes)])
     
     def get_file(self, file_path: str) -> Optional[FileRecord]:
         """
         Получение информации о файле
         
+        Читается через соединение только для чтения: незафиксированные
+        изменения пишущего соединения не видны, запрос не ждёт записи
+        
         Args:
             file_path: путь к файлу
             
@@ -157,27 +287,28 @@ class HashStorage:
             FileRecord или None если файл не найден
         """
         try:
-            cursor = self.connection.cursor()
-            
-            # Получение информации о файле
-            cursor.execute("""
-                SELECT * FROM files WHERE file_path = ?
-            """, (file_path,))
-            
-            row = cursor.fetchone()
-            if not row:
-                return None
-            
-            file_id = row['id']
-            
-            # Получение хэшей блоков
-            cursor.execute("""
-                SELECT hash_value FROM block_hashes 
-                WHERE file_id = ? 
-                ORDER BY block_index
-            """, (file_id,))
-            
-            block_hashes = [r['hash_value'] for r in cursor.fetchall()]
+            with self._read_connection() as connection:
+                # Запись о файле и хэши блоков читаются из одного снимка базы
+                connection.execute("BEGIN")
+                try:
+                    # Получение информации о файле
+                    row = connection.execute("""
+                        SELECT * FROM files WHERE file_path = ?
+                    """, (file_path,)).fetchone()
+                    
+                    if not row:
+                        return None
+                    
+                    # Получение хэшей блоков
+                    cursor = connection.execute("""
+                        SELECT hash_value FROM block_hashes 
+                        WHERE file_id = ? 
+                        ORDER BY block_index
+                    """, (row['id'],))
+                    
+                    block_hashes = [r['hash_value'] for r in cursor.fetchall()]
+                finally:
+                    connection.rollback()
             
             return FileRecord(
                 file_path=row['file_path'],
@@ -188,7 +319,8 @@ class HashStorage:
                 created_at=row['created_at'],
                 updated_at=row['updated_at'],
                 is_trusted=bool(row['is_trusted']),
-                backup_path=row['backup_path']
+                backup_path=row['backup_path'],
+                hash_algorithm=row['hash_algorithm']
             )
             
         except sqlite3.Error as e:
@@ -208,44 +340,44 @@ class HashStorage:
         Returns:
             True если обновление успешно
         """
-        try:
-            cursor = self.connection.cursor()
-            
-            # Получение file_id
-            cursor.execute("SELECT id, block_size FROM files WHERE file_path = ?", (file_path,))
-            row = cursor.fetchone()
-            
-            if not row:
-                return False
-            
-            file_id = row['id']
-            block_size = row['block_size']
-            now = datetime.now().isoformat()
-            blocks_count = len(block_hashes)
-            
-            # Обновление метаданных файла
-            cursor.execute("""
-                UPDATE files 
-                SET file_size = ?, blocks_count = ?, updated_at = ?, backup_path = ?
-                WHERE id = ?
-            """, (file_size, blocks_count, now, backup_path, file_id))
-            
-            # Удаление старых хэшей
-            cursor.execute("DELETE FROM block_hashes WHERE file_id = ?", (file_id,))
-            
-            # Вставка новых хэшей
-            for block_index, hash_value in enumerate(block_hashes):
+        with self._write_lock:
+            try:
+                cursor = self.connection.cursor()
+                
+                # Получение file_id
+                cursor.execute("SELECT id, block_size FROM files WHERE file_path = ?", (file_path,))
+                row = cursor.fetchone()
+                
+                if not row:
+                    return False
+                
+                file_id = row['id']
+                block_size = row['block_size']
+                now = datetime.now().isoformat()
+                blocks_count = len(block_hashes)
+                
+                # Обновление метаданных файла
                 cursor.execute("""
+                    UPDATE files 
+                    SET file_size = ?, blocks_count = ?, updated_at = ?, backup_path = ?
+                    WHERE id = ?
+                """, (file_size, blocks_count, now, backup_path, file_id))
+                
+                # Удаление старых хэшей
+                cursor.execute("DELETE FROM block_hashes WHERE file_id = ?", (file_id,))
+                
+                # Вставка новых хэшей
+                cursor.executemany("""
                     INSERT INTO block_hashes (file_id, block_index, hash_value)
                     VALUES (?, ?, ?)
-                """, (file_id, block_index, hash_value))
-            
-            self.connection.commit()
-            return True
-            
-        except sqlite3.Error as e:
-            self.connection.rollback()
-            raise Exception(f"Ошибка обновления файла {file_path}: {e}")
+                """, [(file_id, block_index, hash_value) for block_index, hash_value in enumerate(block_hashes)])
+                
+                self.connection.commit()
+                return True
+                
+            except sqlite3.Error as e:
+                self.connection.rollback()
+                raise Exception(f"Ошибка обновления файла {file_path}: {e}")
     
     def remove_file(self, file_path: str) -> bool:
         """
@@ -257,33 +389,31 @@ class HashStorage:
         Returns:
             True если удаление успешно
         """
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM files WHERE file_path = ?", (file_path,))
-            self.connection.commit()
-            return cursor.rowcount > 0
-            
-        except sqlite3.Error as e:
-            self.connection.rollback()
-            raise Exception(f"Ошибка удаления файла {file_path}: {e}")
+        with self._write_lock:
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM files WHERE file_path = ?", (file_path,))
+                self.connection.commit()
+                self._tracked_paths.discard(file_path)
+                return cursor.rowcount > 0
+                
+            except sqlite3.Error as e:
+                self.connection.rollback()
+                raise Exception(f"Ошибка удаления файла {file_path}: {e}")
     
     def file_exists(self, file_path: str) -> bool:
         """
         Проверка существования файла в хранилище
         
+        Выполняется по множеству путей в памяти, без запроса к базе данных
+        
         Args:
             file_path: путь к файлу
             
         Returns:
             True если файл есть в хранилище
         """
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT 1 FROM files WHERE file_path = ? LIMIT 1", (file_path,))
-            return cursor.fetchone() is not None
-            
-        except sqlite3.Error as e:
-            raise Exception(f"Ошибка проверки файла {file_path}: {e}")
+        return file_path in self._tracked_paths
     
     def get_all_files(self) -> List[str]:
         """
@@ -292,14 +422,85 @@ class HashStorage:
         Returns:
             список путей к файлам
         """
+        return list(self.iter_all_files())
+    
+    def iter_all_files(self) -> Iterator[str]:
+        """
+        Потоковое получение путей всех файлов в доверенном состоянии
+        
+        Строки читаются курсором по мере обхода, список в памяти не создаётся
+        
+        Yields:
+            путь к файлу
+        """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT file_path FROM files ORDER BY file_path")
-            return [row['file_path'] for row in cursor.fetchall()]
+            with self._read_connection() as connection:
+                cursor = connection.execute("SELECT file_path FROM files ORDER BY file_path")
+                for row in cursor:
+                    yield row['file_path']
             
         except sqlite3.Error as e:
             raise Exception(f"Ошибка получения списка файлов: {e}")
     
+    def get_backup_paths(self) -> Set[str]:
+        """
+        Получение путей резервных копий, на которые ссылаются записи файлов
+        
+        Returns:
+            множество путей к резервным копиям
+        """
+        try:
+            with self._read_connection() as connection:
+                cursor = connection.execute("SELECT backup_path FROM files WHERE backup_path IS NOT NULL")
+                return {row['backup_path'] for row in cursor}
+            
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка получения путей резервных копий: {e}")
+    
+    def get_file_summaries(self, file_paths: List[str]) -> Dict[str, FileRecord]:
+        """
+        Получение информации о наборе файлов (без хэшей блоков)
+        
+        Пути запрашиваются пачками через IN (...), а не отдельным запросом
+        на каждый файл
+        
+        Args:
+            file_paths: пути к файлам
+            
+        Returns:
+            {путь: FileRecord с пустым block_hashes} для найденных файлов
+        """
+        summaries = {}
+        try:
+            with self._read_connection() as connection:
+                for start in range(0, len(file_paths), self.SUMMARY_BATCH_SIZE):
+                    chunk = file_paths[start:start + self.SUMMARY_BATCH_SIZE]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor = connection.execute(f"""
+                        SELECT file_path, file_size, block_size, blocks_count, created_at, updated_at,
+                               is_trusted, backup_path, hash_algorithm
+                        FROM files WHERE file_path IN ({placeholders})
+                    """, chunk)
+                    
+                    for row in cursor:
+                        summaries[row['file_path']] = FileRecord(
+                            file_path=row['file_path'],
+                            file_size=row['file_size'],
+                            block_size=row['block_size'],
+                            blocks_count=row['blocks_count'],
+                            block_hashes=[],
+                            created_at=row['created_at'],
+                            updated_at=row['updated_at'],
+                            is_trusted=bool(row['is_trusted']),
+                            backup_path=row['backup_path'],
+                            hash_algorithm=row['hash_algorithm']
+                        )
+            
+            return summaries
+            
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка получения информации о файлах: {e}")
+    
     def get_files_count(self) -> int:
         """
         Получение количества файлов в доверенном состоянии
@@ -308,9 +509,9 @@ class HashStorage:
             количество файлов
         """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT COUNT(*) as count FROM files")
-            return cursor.fetchone()['count']
+            with self._read_connection() as connection:
+                cursor = connection.execute("SELECT COUNT(*) as count FROM files")
+                return cursor.fetchone()['count']
             
         except sqlite3.Error as e:
             raise Exception(f"Ошибка подсчёта файлов: {e}")
@@ -326,58 +527,73 @@ class HashStorage:
         Returns:
             True если обновление успешно
         """
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("""
-                UPDATE files SET is_trusted = ? WHERE file_path = ?
-            """, (1 if is_trusted else 0, file_path))
-            self.connection.commit()
-            return cursor.rowcount > 0
-            
-        except sqlite3.Error as e:
-            self.connection.rollback()
-            raise Exception(f"Ошибка установки статуса доверия для {file_path}: {e}")
+        with self._write_lock:
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("""
+                    UPDATE files SET is_trusted = ? WHERE file_path = ?
+                """, (1 if is_trusted else 0, file_path))
+                self.connection.commit()
+                return cursor.rowcount > 0
+                
+            except sqlite3.Error as e:
+                self.connection.rollback()
+                raise Exception(f"Ошибка установки статуса доверия для {file_path}: {e}")
     
     def get_statistics(self) -> Dict[str, any]:
         """
         Получение статистики хранилища
         
+        Результат кэшируется на STATISTICS_TTL секунд: частые опросы
+        статуса из GUI не выполняют запросы к базе данных
+        
         Returns:
             словарь со статистикой
         """
+        deadline, cached = self._statistics_cache
+        if cached is not None and time.monotonic() < deadline:
+            return cached
+        
+        statistics = self._query_statistics()
+        self._statistics_cache = (time.monotonic() + self.STATISTICS_TTL, statistics)
+        return statistics
+    
+    def _query_statistics(self) -> Dict[str, any]:
+        """Запрос статистики хранилища из базы данных"""
         try:
-            cursor = self.connection.cursor()
-            
-            # Общее количество файлов
-            cursor.execute("SELECT COUNT(*) as count FROM files")
-            total_files = cursor.fetchone()['count']
-            
-            # Доверенные файлы
-            cursor.execute("SELECT COUNT(*) as count FROM files WHERE is_trusted = 1")
-            trusted_files = cursor.fetchone()['count']
-            
-            # Общий размер файлов
-            cursor.execute("SELECT SUM(file_size) as total_size FROM files")
-            total_size = cursor.fetchone()['total_size'] or 0
-            
-            # Общее количество блоков
-            cursor.execute("SELECT SUM(blocks_count) as total_blocks FROM files")
-            total_blocks = cursor.fetchone()['total_blocks'] or 0
-            
-            # Количество хэшей
-            cursor.execute("SELECT COUNT(*) as count FROM block_hashes")
-            total_hashes = cursor.fetchone()['count']
-            
-            return {
-                'total_files': total_files,
-                'trusted_files': trusted_files,
-                'untrusted_files': total_files - trusted_files,
-                'total_size_bytes': total_size,
-                'total_blocks': total_blocks,
-                'total_hashes': total_hashes,
-                'db_size_bytes': os.path.getsize(self.storage_path) if os.path.exists(self.storage_path) else 0
-            }
-            
+            with self._read_connection() as connection:
+                cursor = connection.cursor()
+                
+                # Общее количество файлов
+                cursor.execute("SELECT COUNT(*) as count FROM files")
+                total_files = cursor.fetchone()['count']
+                
+                # Доверенные файлы
+                cursor.execute("SELECT COUNT(*) as count FROM files WHERE is_trusted = 1")
+                trusted_files = cursor.fetchone()['count']
+                
+                # Общий размер файлов
+                cursor.execute("SELECT SUM(file_size) as total_size FROM files")
+                total_size = cursor.fetchone()['total_size'] or 0
+                
+                # Общее количество блоков
+                cursor.execute("SELECT SUM(blocks_count) as total_blocks FROM files")
+                total_blocks = cursor.fetchone()['total_blocks'] or 0
+                
+                # Количество хэшей
+                cursor.execute("SELECT COUNT(*) as count FROM block_hashes")
+                total_hashes = cursor.fetchone()['count']
+                
+                return {
+                    'total_files': total_files,
+                    'trusted_files': trusted_files,
+                    'untrusted_files': total_files - trusted_files,
+                    'total_size_bytes': total_size,
+                    'total_blocks': total_blocks,
+                    'total_hashes': total_hashes,
+                    'db_size_bytes': os.path.getsize(self.storage_path) if os.path.exists(self.storage_path) else 0
+                }
+                
         except sqlite3.Error as e:
             raise Exception(f"Ошибка получения статистики: {e}")
     
@@ -389,16 +605,18 @@ class HashStorage:
         Returns:
             True если очистка успешна
         """
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM block_hashes")
-            cursor.execute("DELETE FROM files")
-            self.connection.commit()
-            return True
-            
-        except sqlite3.Error as e:
-            self.connection.rollback()
-            raise Exception(f"Ошибка очистки хранилища: {e}")
+        with self._write_lock:
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM block_hashes")
+                cursor.execute("DELETE FROM files")
+                self.connection.commit()
+                self._tracked_paths.clear()
+                return True
+                
+            except sqlite3.Error as e:
+                self.connection.rollback()
+                raise Exception(f"Ошибка очистки хранилища: {e}")
     
     def verify_integrity(self) -> Tuple[bool, str]:
         """
@@ -408,9 +626,8 @@ class HashStorage:
             (успешность, сообщение)
         """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("PRAGMA integrity_check")
-            result = cursor.fetchone()[0]
+            with self._read_connection() as connection:
+                result = connection.execute("PRAGMA integrity_check").fetchone()[0]
             
             if result == "ok":
                 return True, "Целостность базы данных подтверждена"
@@ -425,6 +642,12 @@ class HashStorage:
         if self.connection:
             self.connection.close()
             self.connection = None
+        
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
     
     def __enter__(self):
         """Поддержка контекстного менеджера"""
@@ -6,9 +6,21 @@ import math
 from typing import List, Optional, Tuple, Dict
 from enum import Enum
 from dataclasses import dataclass
-from collections import deque
+from collections import deque, Counter
 from datetime import datetime, timedelta
 
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+try:
+    import numpy
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 class ChangeType(Enum):
     """Типы изменений файла"""
     NO_CHANGE = "NO_CHANGE"                    # Файл не изменён
@@ -47,20 +59,45 @@ class IntegrityEngine:
     
     Отвечает за:
     - разбиение файлов на блоки
-    - вычисление хэшей блоков (SHA-256)
+    - вычисление хэшей блоков (BLAKE3, SHA-256 для старых эталонов)
     - сравнение с эталоном
     - определение типа изменения
     - обнаружение ransomware-паттернов
     """
     
-    def __init__(self, block_size: int = 65536, ransomware_thresholds: dict = None):
+    # Поддерживаемые алгоритмы хэширования блоков
+    SUPPORTED_ALGORITHMS = ('blake3', 'sha256')
+    
+    # Размер файла, начиная с которого включается последовательное упреждающее чтение
+    SEQUENTIAL_READ_THRESHOLD = 10 * 1024 * 1024  # 10 MB
+    
+    # Размер порции чтения файла (не зависит от размера блока хэширования)
+    READ_BUFFER_SIZE = 1024 * 1024  # 1 MB
+    
+    def __init__(self, block_size: int = 65536, ransomware_thresholds: dict = None,
+                 hash_algorithm: str = 'blake3'):
         """
         Args:
             block_size: размер блока в байтах (по умолчанию 64 KB)
             ransomware_thresholds: пороги для определения ransomware
+            hash_algorithm: алгоритм хэширования новых эталонов
         """
         self.block_size = block_size
-        self.hash_algorithm = 'sha256'
+        
+        # Размер блока не меняется после запуска - границы блоков внутри
+        # полного буфера чтения вычисляются один раз
+        self._read_size = max(self.READ_BUFFER_SIZE // block_size, 1) * block_size
+        self._buffer_blocks = [(offset, offset + block_size)
+                               for offset in range(0, self._read_size, block_size)]
+        
+        if hash_algorithm not in self.SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Неподдерживаемый алгоритм хэширования: {hash_algorithm}")
+        
+        if hash_algorithm == 'blake3' and not BLAKE3_AVAILABLE:
+            print("WARNING: blake3 не установлен, используется sha256")
+            hash_algorithm = 'sha256'
+        
+        self.hash_algorithm = hash_algorithm
         
         # Пороги ransomware
         self.ransomware_thresholds = ransomware_thresholds or {
@@ -73,12 +110,35 @@ class IntegrityEngine:
         # История модификаций для обнаружения массовых атак
         self.modification_history: deque = deque(maxlen=1000)
     
-    def compute_file_hashes(self, file_path: str) -> Tuple[List[str], int]:
+    def _get_block_hasher(self, algorithm: Optional[str] = None):
+        """
+        Получение конструктора хэша блока
+        
+        Args:
+            algorithm: алгоритм (если None - алгоритм новых эталонов)
+            
+        Returns:
+            конструктор объекта хэша с методом hexdigest()
+        """
+        algorithm = algorithm or self.hash_algorithm
+        
+        if algorithm == 'blake3':
+            if not BLAKE3_AVAILABLE:
+                raise RuntimeError("Эталон вычислен BLAKE3, но модуль blake3 не установлен")
+            return blake3.blake3
+        
+        if algorithm == 'sha256':
+            return hashlib.sha256
+        
+        raise ValueError(f"Неподдерживаемый алгоритм хэширования: {algorithm}")
+    
+    def compute_file_hashes(self, file_path: str, algorithm: Optional[str] = None) -> Tuple[List[str], int]:
         """
         Вычисление хэшей всех блоков файла
         
         Args:
             file_path: путь к файлу
+            algorithm: алгоритм хэширования (если None - алгоритм новых эталонов)
             
         Returns:
             (список хэшей блоков, размер файла)
@@ -90,20 +150,45 @@ class IntegrityEngine:
             raise ValueError(f"Путь не является файлом: {file_path}")
         
         block_hashes = []
-        file_size = os.path.getsize(file_path)
+        new_hasher = self._get_block_hasher(algorithm)
         
         try:
-            with open(file_path, 'rb') as f:
+            with open(file_path, 'rb', buffering=0) as f:
+                file_size = os.fstat(f.fileno()).st_size
+                
+                # Подсказка ядру об упреждающем чтении для больших файлов
+                if file_size >= self.SEQUENTIAL_READ_THRESHOLD and hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                
+                # Чтение крупными порциями (кратными размеру блока) в один
+                # переиспользуемый буфер, блоки хэшируются срезами memoryview
+                block_size = self.block_size
+                read_size = self._read_size
+                buffer_blocks = self._buffer_blocks
+                buffer = bytearray(read_size)
+                view = memoryview(buffer)
                 while True:
-                    block = f.read(self.block_size)
-                    if not block:
+                    filled = 0
+                    while filled < read_size:
+                        read = f.readinto(view[filled:])
+                        if not read:
+                            break
+                        filled += read
+                    
+                    if not filled:
                         break
                     
-                    # Вычисление хэша блока
-                    hasher = hashlib.sha256()
-                    hasher.update(block)
-                    block_hash = hasher.hexdigest()
-                    block_hashes.append(block_hash)
+                    # Вычисление хэшей блоков: полный буфер - по заранее
+                    # вычисленным границам, хвост файла - с усечением
+                    if filled == read_size:
+                        block_hashes.extend([new_hasher(view[start:end]).hexdigest()
+                                             for start, end in buffer_blocks])
+                        continue
+                    
+                    for offset in range(0, filled, block_size):
+                        block_hash = new_hasher(view[offset:min(offset + block_size, filled)]).hexdigest()
+                        block_hashes.append(block_hash)
+                    break
             
             return block_hashes, file_size
             
@@ -123,21 +208,19 @@ class IntegrityEngine:
         Returns:
             (список индексов изменённых блоков, процент изменений)
         """
-        changed_indices = []
-        
         # Если количество блоков изменилось, файл точно модифицирован
         max_blocks = max(len(current_hashes), len(reference_hashes))
         min_blocks = min(len(current_hashes), len(reference_hashes))
         
-        # Сравнение общих блоков
-        for i in range(min_blocks):
-            if current_hashes[i] != reference_hashes[i]:
-                changed_indices.append(i)
+        # Сравнение общих блоков (zip останавливается на более коротком списке)
+        changed_indices = [
+            i for i, (current, reference) in enumerate(zip(current_hashes, reference_hashes))
+            if current != reference
+        ]
         
         # Если размер файла изменился, добавляем индексы новых/удалённых блоков
         if len(current_hashes) != len(reference_hashes):
-            for i in range(min_blocks, max_blocks):
-                changed_indices.append(i)
+            changed_indices.extend(range(min_blocks, max_blocks))
         
         # Процент изменённых блоков
         change_percent = (len(changed_indices) / max_blocks * 100) if max_blocks > 0 else 0
@@ -172,10 +255,11 @@ class IntegrityEngine:
             if not data:
                 return 0.0
             
-            # Подсчёт частоты байтов
-            byte_counts = [0] * 256
-            for byte in data:
-                byte_counts[byte] += 1
+            # Подсчёт частоты байтов (без цикла Python по каждому байту)
+            if NUMPY_AVAILABLE:
+                byte_counts = numpy.bincount(numpy.frombuffer(data, dtype=numpy.uint8), minlength=256).tolist()
+            else:
+                byte_counts = Counter(data).values()
             
             # Вычисление энтропии Шеннона
             entropy = 0.0
@@ -193,7 +277,8 @@ class IntegrityEngine:
             return 0.0
     
     def check_integrity(self, file_path: str, reference_hashes: List[str], 
-                       is_update_mode: bool = False) -> IntegrityCheckResult:
+                       is_update_mode: bool = False,
+                       algorithm: Optional[str] = None) -> IntegrityCheckResult:
         """
         Проверка целостности файла
         
@@ -201,13 +286,14 @@ class IntegrityEngine:
             file_path: путь к файлу
             reference_hashes: эталонные хэши блоков
             is_update_mode: включён ли режим обновления
+            algorithm: алгоритм, которым вычислен эталон
             
         Returns:
             результат проверки целостности
         """
         try:
             # Вычисление текущих хэшей
-            current_hashes, file_size = self.compute_file_hashes(file_path)
+            current_hashes, file_size = self.compute_file_hashes(file_path, algorithm)
             
             # Сравнение хэшей
             changed_indices, change_percent = self.compare_hashes(current_hashes, reference_hashes)
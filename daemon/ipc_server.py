@@ -2,19 +2,151 @@
 
 import os
 import json
+import queue
 import socket
 import threading
 import struct
 from pathlib import Path
-from typing import Callable, Optional, Dict, Any, Tuple
+from typing import Callable, Optional, Dict, Any, Tuple, List
 from enum import Enum
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+# Поддерживаемые форматы сообщений (в порядке предпочтения)
+SUPPORTED_PROTOCOLS = ('msgpack', 'json') if MSGPACK_AVAILABLE else ('json',)
+
+def _json_dumps(obj: Any) -> bytes:
+    """Сериализация в JSON (orjson, если установлен - формат на проводе тот же)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode('utf-8')
+
+def _json_loads(data: bytes) -> Any:
+    """Разбор JSON (orjson.JSONDecodeError - подкласс json.JSONDecodeError)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _encode_message(obj: Any, protocol: str) -> bytes:
+    """Сериализация сообщения в формате соединения ('msgpack' или 'json')"""
+    if protocol == 'msgpack':
+        return msgpack.packb(obj, use_bin_type=True)
+    return _json_dumps(obj)
+
+def _decode_message(data: bytes) -> Tuple[Any, str]:
+    """
+    Разбор сообщения с определением формата
+    
+    JSON-объект всегда начинается с '{', словарь msgpack - с байта 0x80-0x8f,
+    0xde или 0xdf, поэтому формат определяется по первому байту
+    
+    Raises:
+        ValueError: неверный формат сообщения
+    """
+    if data[:1] == b'{' or not MSGPACK_AVAILABLE:
+        return _json_loads(data), 'json'
+    return msgpack.unpackb(data, raw=False, strict_map_key=False), 'msgpack'
+
+# Заголовок кадра: длина сообщения (big-endian uint32)
+_LEN = struct.Struct('!I')
+
+# Старший бит слова длины: тело кадра сжато lz4
+_COMPRESSED_FLAG = 0x80000000
+
+# Максимальное число буферов в одном sendmsg (IOV_MAX в Linux)
+_IOV_MAX = 1024
+
+def _send_buffers(sock: socket.socket, buffers: List[bytes]):
+    """
+    Отправка нескольких буферов через sendmsg (scatter-gather, без склейки
+    в один bytes); недоотправленный остаток досылается
+    """
+    views = [memoryview(buffer) for buffer in buffers if buffer]
+    while views:
+        sent = sock.sendmsg(views[:_IOV_MAX])
+        while sent:
+            if sent >= len(views[0]):
+                sent -= len(views[0])
+                views.pop(0)
+            else:
+                views[0] = views[0][sent:]
+                sent = 0
+
+class _FrameReader:
+    """
+    Буферизованное чтение из потокового сокета
+    
+    Данные читаются блоками: заголовок длины и тело небольшого сообщения
+    (а при конвейерной отправке - и следующие кадры) приходят одним recv
+    вместо двух. Большие сообщения дочитываются recv_into сразу в буфер
+    результата
+    """
+    
+    # Размер блока чтения
+    BUFFER_SIZE = 64 * 1024
+    
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.buffer = bytearray()
+    
+    def read(self, length: int) -> Optional[bytearray]:
+        """
+        Чтение точного количества байт
+        
+        Returns:
+            данные или None, если соединение закрыто
+        """
+        buffered = len(self.buffer)
+        if buffered >= length:
+            data = self.buffer[:length]
+            del self.buffer[:length]
+            return data
+        
+        data = bytearray(length)
+        data[:buffered] = self.buffer
+        self.buffer.clear()
+        view = memoryview(data)
+        received = buffered
+        while received < length:
+            if length - received < self.BUFFER_SIZE:
+                # Остаток меньше блока: читается целый блок, лишнее
+                # (начало следующего кадра) остаётся в буфере
+                chunk = self.sock.recv(self.BUFFER_SIZE)
+                if not chunk:
+                    return None
+                count = min(len(chunk), length - received)
+                view[received:received + count] = chunk[:count]
+                self.buffer += chunk[count:]
+            else:
+                count = self.sock.recv_into(view[received:])
+                if not count:
+                    return None
+            received += count
+        return data
+
 class IPCCommand(Enum):
     """Команды IPC"""
     # Статус системы
     GET_STATUS = "get_status"
     GET_STATISTICS = "get_statistics"
     GET_LOGS = "get_logs"
+    GET_LOGS_SINCE = "get_logs_since"
     
     # Управление режимами
     ENTER_INIT_MODE = "enter_init_mode"
@@ -31,6 +163,7 @@ class IPCCommand(Enum):
     # Управление файлами
     GET_FILES = "get_files"
     GET_FILE_INFO = "get_file_info"
+    GET_FILE_INFOS = "get_file_infos"
     CHECK_FILE = "check_file"
     RESTORE_FILE = "restore_file"
     
@@ -50,6 +183,9 @@ class IPCCommand(Enum):
     # Система
     SHUTDOWN = "shutdown"
     PING = "ping"
+    
+    # Подписка на уведомления (соединение переводится в режим push)
+    SUBSCRIBE = "subscribe"
 
 class IPCResponse:
     """Ответ IPC сервера"""
@@ -68,7 +204,111 @@ class IPCResponse:
     
     def to_json(self) -> str:
         """Преобразование в JSON"""
-        return json.dumps(self.to_dict())
+        return _json_dumps(self.to_dict()).decode('utf-8')
+    
+    def to_bytes(self, protocol: str = 'json') -> bytes:
+        """Сериализация для передачи по сокету"""
+        return _encode_message(self.to_dict(), protocol)
+
+def _notification_frame(notification_type: str, data: Any) -> bytes:
+    """Кадр уведомления (длина + JSON-ответ)"""
+    notification = {
+        'type': 'notification',
+        'notification_type': notification_type,
+        'data': data,
+        'timestamp': str(threading.current_thread().ident)
+    }
+    
+    response_bytes = IPCResponse(success=True, data=notification).to_bytes()
+    return _LEN.pack(len(response_bytes)) + response_bytes
+
+class _Subscriber:
+    """
+    Подписчик на уведомления: ограниченная очередь кадров и собственный
+    поток записи
+    
+    Рассылка только кладёт кадр в очередь и не ждёт сокет. При переполнении
+    очереди подписчик помечается отстающим: новые кадры отбрасываются, а
+    когда очередь разобрана, ему отправляется уведомление resync - клиент
+    перечитывает состояние целиком. Подписчик, не принимающий данные дольше
+    SEND_TIMEOUT, отключается
+    """
+    
+    # Максимальное число неотправленных уведомлений
+    QUEUE_SIZE = 256
+    
+    # Таймаут отправки одного кадра (секунды)
+    SEND_TIMEOUT = 30
+    
+    def __init__(self, sock: socket.socket, on_failed: Callable):
+        """
+        Args:
+            sock: сокет подписчика
+            on_failed: вызывается (подписчик, ошибка) при ошибке отправки
+        """
+        self.sock = sock
+        self.on_failed = on_failed
+        self.queue: queue.Queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.lagging = False
+        self.closed = False
+        self.thread = threading.Thread(
+            target=self._write_loop,
+            daemon=True,
+            name="IPCNotifyThread"
+        )
+        
+        # Таймаут только на отправку (SO_SNDTIMEO): поток клиента
+        # продолжает ждать данные в том же сокете без таймаута
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO,
+                        struct.pack('ll', self.SEND_TIMEOUT, 0))
+    
+    def start(self):
+        """Запуск потока записи"""
+        self.thread.start()
+    
+    def offer(self, frame: bytes):
+        """Постановка кадра в очередь без ожидания (отстающему кадр не нужен)"""
+        if self.lagging:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except queue.Full:
+            self.lagging = True
+    
+    def close(self):
+        """
+        Отключение подписчика
+        
+        shutdown прерывает и ожидание данных в потоке клиента, и
+        заблокированную отправку в потоке записи
+        """
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass  # Поток записи завершится на ошибке отправки
+    
+    def _write_loop(self):
+        """Поток записи: отправка кадров из очереди по порядку"""
+        while not self.closed:
+            if self.lagging and self.queue.empty():
+                # Очередь разобрана: пропущенные уведомления заменяются одним
+                self.lagging = False
+                frame = _notification_frame('resync', {})
+            else:
+                frame = self.queue.get()
+                if frame is None:
+                    return
+            try:
+                self.sock.sendall(frame)
+            except OSError as e:
+                if not self.closed:
+                    self.on_failed(self, e)
+                return
 
 class IPCServer:
     """
@@ -80,6 +320,9 @@ class IPCServer:
     - отправку ответов и уведомлений
     """
     
+    # Ответы больше этого размера сжимаются lz4 (если клиент поддерживает)
+    COMPRESSION_THRESHOLD = 4096
+    
     def __init__(self, socket_path: str = "/var/run/secure_fs_guard.sock"):
         """
         Args:
@@ -97,6 +340,11 @@ class IPCServer:
         self.active_connections: list = []
         self.connections_lock = threading.Lock()
         
+        # Соединения-подписчики: получают только уведомления, команды
+        # по ним не передаются (ответы и уведомления не перемешиваются)
+        self.subscribers: Dict[socket.socket, _Subscriber] = {}
+        self.subscribers_lock = threading.Lock()
+        
         # Callback для логирования
         self.log_callback: Optional[Callable] = None
     
@@ -167,6 +415,12 @@ class IPCServer:
         """Остановка IPC сервера"""
         self.is_running = False
         
+        with self.subscribers_lock:
+            subscribers = list(self.subscribers.values())
+            self.subscribers.clear()
+        for subscriber in subscribers:
+            subscriber.close()
+        
         # Закрытие всех активных соединений
         with self.connections_lock:
             for conn in self.active_connections:
@@ -225,14 +479,18 @@ class IPCServer:
         Args:
             client_socket: сокет клиента
         """
+        reader = _FrameReader(client_socket)
+        
+        # Сжатие больших ответов (включается, если клиент запросил его в PING)
+        compress = False
         try:
             while self.is_running:
                 # Чтение длины сообщения (4 байта)
-                length_data = self._recv_exact(client_socket, 4)
+                length_data = reader.read(4)
                 if not length_data:
                     break
                 
-                message_length = struct.unpack('!I', length_data)[0]
+                message_length = _LEN.unpack(length_data)[0]
                 
                 # Защита от слишком больших сообщений
                 if message_length > 10 * 1024 * 1024:  # 10 MB
@@ -240,36 +498,65 @@ class IPCServer:
                     break
                 
                 # Чтение данных сообщения
-                message_data = self._recv_exact(client_socket, message_length)
+                message_data = reader.read(message_length)
                 if not message_data:
                     break
                 
                 # Обработка сообщения
+                protocol = 'json'
                 try:
-                    message = json.loads(message_data.decode('utf-8'))
+                    message, protocol = _decode_message(message_data)
+                    
+                    # Подписка обрабатывается сервером: после ответа соединение
+                    # только принимает уведомления, поток ждёт его закрытия
+                    if message.get('command') == IPCCommand.SUBSCRIBE.value:
+                        # Ответ отправляется до регистрации: уведомления пишет
+                        # только поток подписчика
+                        self._send_response(client_socket, IPCResponse(success=True, data={}))
+                        subscriber = _Subscriber(client_socket, self._on_subscriber_failed)
+                        with self.subscribers_lock:
+                            self.subscribers[client_socket] = subscriber
+                        subscriber.start()
+                        continue
+                    
                     response = self._process_message(message)
                     
-                    # Отправка ответа
-                    self._send_response(client_socket, response)
+                    # Ответ на PING сообщает поддерживаемые форматы сообщений
+                    # и подтверждает сжатие, если клиент его поддерживает
+                    if (message.get('command') == IPCCommand.PING.value
+                            and response.success and isinstance(response.data, dict)):
+                        response.data = dict(response.data, protocols=list(SUPPORTED_PROTOCOLS))
+                        requested = (message.get('params') or {}).get('compression') or ()
+                        if LZ4_AVAILABLE and 'lz4' in requested:
+                            compress = True
+                            response.data['compression'] = 'lz4'
+                    
+                    # Отправка ответа (в формате запроса)
+                    self._send_response(client_socket, response, protocol, compress)
                 
-                except json.JSONDecodeError:
+                except ValueError:
                     error_response = IPCResponse(
                         success=False,
-                        error="Неверный формат JSON"
+                        error="Неверный формат сообщения"
                     )
-                    self._send_response(client_socket, error_response)
+                    self._send_response(client_socket, error_response, protocol)
                 
                 except Exception as e:
                     error_response = IPCResponse(
                         success=False,
                         error=f"Ошибка обработки: {str(e)}"
                     )
-                    self._send_response(client_socket, error_response)
+                    self._send_response(client_socket, error_response, protocol)
         
         except Exception as e:
             self._log(f"Ошибка обработки клиента: {e}")
         
         finally:
+            with self.subscribers_lock:
+                subscriber = self.subscribers.pop(client_socket, None)
+            if subscriber:
+                subscriber.close()
+            
             # Удаление из списка активных
             with self.connections_lock:
                 if client_socket in self.active_connections:
@@ -283,41 +570,29 @@ class IPCServer:
             
             self._log("Клиент отключён")
     
-    def _recv_exact(self, sock: socket.socket, length: int) -> Optional[bytes]:
-        """
-        Чтение точного количества байт из сокета
-        
-        Args:
-            sock: сокет
-            length: количество байт
-            
-        Returns:
-            данные или None при ошибке
-        """
-        data = b''
-        while len(data) < length:
-            chunk = sock.recv(length - len(data))
-            if not chunk:
-                return None
-            data += chunk
-        return data
-    
-    def _send_response(self, sock: socket.socket, response: IPCResponse):
+    def _send_response(self, sock: socket.socket, response: IPCResponse, protocol: str = 'json',
+                       compress: bool = False):
         """
         Отправка ответа клиенту
         
         Args:
             sock: сокет
             response: ответ
+            protocol: формат сообщения ('msgpack' или 'json')
+            compress: сжимать ли большие ответы (клиент поддерживает lz4)
         """
         try:
             # Сериализация ответа
-            response_json = response.to_json()
-            response_bytes = response_json.encode('utf-8')
+            response_bytes = response.to_bytes(protocol)
+            header = len(response_bytes)
             
-            # Отправка длины + данных
-            length = struct.pack('!I', len(response_bytes))
-            sock.sendall(length + response_bytes)
+            # Большие ответы (списки файлов, логи) хорошо сжимаются
+            if compress and header > self.COMPRESSION_THRESHOLD:
+                response_bytes = lz4.frame.compress(response_bytes)
+                header = len(response_bytes) | _COMPRESSED_FLAG
+            
+            # Отправка длины + данных одним sendmsg
+            _send_buffers(sock, [_LEN.pack(header), response_bytes])
         
         except Exception as e:
             self._log(f"Ошибка отправки ответа: {e}")
@@ -378,34 +653,35 @@ class IPCServer:
     
     def broadcast_notification(self, notification_type: str, data: Any):
         """
-        Отправка уведомления всем подключённым клиентам
+        Отправка уведомления всем подписанным клиентам
         
         Args:
             notification_type: тип уведомления
             data: данные уведомления
         """
-        notification = {
-            'type': 'notification',
-            'notification_type': notification_type,
-            'data': data,
-            'timestamp': str(threading.current_thread().ident)
-        }
+        frame = _notification_frame(notification_type, data)
         
-        response = IPCResponse(success=True, data=notification)
+        # Кадр только ставится в очереди подписчиков (отправляют их потоки
+        # записи): рассылка не ждёт сокеты и не держит блокировку при отправке
+        with self.subscribers_lock:
+            subscribers = list(self.subscribers.values())
         
-        with self.connections_lock:
-            for client_socket in self.active_connections[:]:  # Копия списка
-                try:
-                    self._send_response(client_socket, response)
-                except Exception as e:
-                    # Удаление неактивного соединения
-                    self._log(f"Ошибка отправки уведомления: {e}")
-                    if client_socket in self.active_connections:
-                        self.active_connections.remove(client_socket)
-                    try:
-                        client_socket.close()
-                    except:
-                        pass
+        for subscriber in subscribers:
+            subscriber.offer(frame)
+    
+    def _on_subscriber_failed(self, subscriber: _Subscriber, error: Exception):
+        """Ошибка отправки уведомления подписчику (из потока записи)"""
+        self._drop_subscriber(subscriber, f"ошибка отправки уведомления: {error}")
+    
+    def _drop_subscriber(self, subscriber: _Subscriber, reason: str):
+        """Отключение подписчика (поток клиента закроет соединение)"""
+        with self.subscribers_lock:
+            if self.subscribers.get(subscriber.sock) is not subscriber:
+                return
+            del self.subscribers[subscriber.sock]
+        
+        self._log(f"Подписчик отключён: {reason}")
+        subscriber.close()
     
     def get_statistics(self) -> dict:
         """
@@ -421,6 +697,7 @@ class IPCServer:
             'is_running': self.is_running,
             'socket_path': self.socket_path,
             'active_connections': active_count,
+            'subscribers': len(self.subscribers),
             'registered_commands': len(self.command_handlers),
             'commands': list(self.command_handlers.keys())
         }
@@ -494,11 +771,10 @@ class IPCClient:
                 'params': params or {}
             }
             
-            message_json = json.dumps(message)
-            message_bytes = message_json.encode('utf-8')
+            message_bytes = _json_dumps(message)
             
             # Отправка длины + данных
-            length = struct.pack('!I', len(message_bytes))
+            length = _LEN.pack(len(message_bytes))
             self.client_socket.sendall(length + message_bytes)
             
             # Получение ответа
@@ -507,7 +783,7 @@ class IPCClient:
             if not length_data:
                 return False, None, "Соединение разорвано"
             
-            response_length = struct.unpack('!I', length_data)[0]
+            response_length = _LEN.unpack(length_data)[0]
             
             # Чтение данных
             response_data = self._recv_exact(response_length)
@@ -515,7 +791,7 @@ class IPCClient:
                 return False, None, "Соединение разорвано"
             
             # Парсинг ответа
-            response = json.loads(response_data.decode('utf-8'))
+            response = _json_loads(response_data)
             
             return response['success'], response.get('data'), response.get('error', '')
         
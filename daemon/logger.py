@@ -2,11 +2,15 @@
 
 import logging
 import os
+import queue
+import threading
+import time
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
 from enum import Enum
-from typing import Optional
-from logging.handlers import RotatingFileHandler
+from typing import Optional, Dict, List, Tuple, Callable
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
 class EventType(Enum):
     """Типы событий системы безопасности"""
@@ -45,6 +49,147 @@ class EventSeverity(Enum):
     CRITICAL = "CRITICAL"
     EMERGENCY = "EMERGENCY"
 
+class _SecurityFileHandler(RotatingFileHandler):
+    """
+    Файловый обработчик журнала с ротацией
+    
+    Вызывается только из потока QueueListener (единственный писатель),
+    поэтому захват I/O-блокировки на каждую запись не нужен.
+    """
+    
+    # Размер пользовательского буфера файла журнала
+    BUFFER_SIZE = 1024 * 1024  # 1 MB
+    
+    def _open(self):
+        """Открытие файла журнала в режиме O_APPEND с большим буфером"""
+        fd = os.open(self.baseFilename, os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_CLOEXEC, 0o600)
+        
+        # Права доступа только для root (в том числе для файлов после ротации)
+        os.fchmod(fd, 0o600)
+        
+        # Счётчик размера файла ведётся в памяти, без tell() на каждую запись
+        self._bytes_written = os.fstat(fd).st_size
+        
+        return os.fdopen(fd, 'ab', buffering=self.BUFFER_SIZE)
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Проверка необходимости ротации по счётчику записанных байт"""
+        return self.maxBytes > 0 and self._bytes_written >= self.maxBytes
+    
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Запись события без захвата блокировки обработчика"""
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+    
+    def emit(self, record: logging.LogRecord):
+        """
+        Запись события в буфер файла
+        
+        Сброс буфера выполняет поток записи после обработки пачки событий,
+        критические события сбрасываются на диск сразу
+        """
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            data = (self.format(record) + self.terminator).encode(self.encoding)
+            self.stream.write(data)
+            self._bytes_written += len(data)
+            
+            if record.levelno >= logging.CRITICAL:
+                self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def truncate(self):
+        """Очистка текущего файла журнала без удаления и переоткрытия"""
+        if self.stream is None:
+            return
+        self.stream.flush()
+        os.ftruncate(self.stream.fileno(), 0)
+        self.stream.seek(0)
+        self._bytes_written = 0
+
+class _TruncateRecord(logging.LogRecord):
+    """Управляющая запись очереди: очистка файла журнала потоком записи"""
+    
+    _truncate = True
+    
+    def __init__(self):
+        super().__init__("SecureFSGuard", logging.NOTSET, "", 0, "", None, None)
+
+class _BatchingQueueListener(QueueListener):
+    """
+    Поток записи журнала
+    
+    Забирает из очереди все накопившиеся события разом и сбрасывает
+    буферы обработчиков один раз на пачку, а не после каждой записи.
+    """
+    
+    def _monitor(self):
+        """Цикл обработки очереди (выполняется в отдельном потоке)"""
+        q = self.queue
+        while True:
+            batch = [self.dequeue(True)]
+            try:
+                while True:
+                    batch.append(q.get_nowait())
+            except queue.Empty:
+                pass
+            
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                    break
+                if getattr(record, '_truncate', False):
+                    self._truncate_files(record)
+                    continue
+                self.handle(record)
+            
+            for handler in self.handlers:
+                handler.flush()
+            
+            if stop:
+                break
+    
+    def _truncate_files(self, record: logging.LogRecord):
+        """Очистка файлов журнала (выполняется в потоке записи)"""
+        for handler in self.handlers:
+            if isinstance(handler, _SecurityFileHandler):
+                try:
+                    handler.truncate()
+                except OSError:
+                    handler.handleError(record)
+
+class _CachedTimeFormatter(logging.Formatter):
+    """
+    Форматтер с кэшированием отметки времени
+    
+    Формат даты имеет разрешение в одну секунду, поэтому события одной
+    секунды используют одну и ту же строку. Вызывается только из потока
+    записи, синхронизация кэша не требуется.
+    """
+    
+    def __init__(self, fmt: str, datefmt: str):
+        super().__init__(fmt, datefmt)
+        self._cache: Tuple[int, str] = (-1, "")
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        """Форматирование времени события с кэшем по целой секунде"""
+        sec = int(record.created)
+        cached = self._cache
+        if cached[0] == sec:
+            return cached[1]
+        s = time.strftime(datefmt or self.datefmt, time.localtime(sec))
+        self._cache = (sec, s)
+        return s
+
 class SecurityLogger:
     """
     Журнал безопасности системы
@@ -53,15 +198,58 @@ class SecurityLogger:
     - логирование всех событий безопасности
     - ротацию логов
     - структурированное хранение событий
+    - объединение массовых однотипных событий в сводные записи
     """
     
-    def __init__(self, log_path: str = "/var/log/secure_fs_guard/system.log"):
+    __slots__ = (
+        'log_path', 'logger', '_queue', '_listener', '_dispatch',
+        '_coalesce', '_coalesce_lock', '_coalesce_window',
+        '_coalesce_stop', '_coalesce_thread'
+    )
+    
+    # Типы событий, которые при всплеске объединяются в одну сводную запись
+    # (события безопасности сюда не входят - каждое пишется полностью)
+    COALESCE_TYPES = frozenset({
+        EventType.FILE_VERIFIED
+    })
+    
+    # Критичность, при которой событие пишется сразу, без объединения
+    NO_COALESCE_SEVERITIES = frozenset({
+        EventSeverity.CRITICAL,
+        EventSeverity.EMERGENCY
+    })
+    
+    def __init__(self, log_path: str = "/var/log/secure_fs_guard/system.log",
+                 coalesce_window: float = 0.2):
+        """
+        Args:
+            log_path: путь к файлу журнала
+            coalesce_window: окно объединения однотипных событий в секундах
+        """
         self.log_path = log_path
         self.logger = None
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._listener: Optional[_BatchingQueueListener] = None
+        self._dispatch: Dict[EventSeverity, Callable] = {}
         self._setup_logger()
+        
+        # Накопление событий COALESCE_TYPES: {тип: [(критичность, сообщение, путь)]}
+        self._coalesce: Dict[EventType, List[Tuple[EventSeverity, str, Optional[str]]]] = defaultdict(list)
+        self._coalesce_lock = threading.Lock()
+        self._coalesce_window = coalesce_window
+        self._coalesce_stop = threading.Event()
+        self._coalesce_thread = threading.Thread(
+            target=self._coalesce_loop,
+            daemon=True,
+            name="LogCoalescer"
+        )
+        self._coalesce_thread.start()
     
     def _setup_logger(self):
         """Настройка логгера с ротацией"""
+        # Остановка предыдущего потока записи (при повторной настройке)
+        self._stop_listener()
+        
         # Создание директории для логов
         Path(os.path.dirname(self.log_path)).mkdir(parents=True, exist_ok=True, mode=0o700)
         
@@ -73,7 +261,7 @@ class SecurityLogger:
         self.logger.handlers.clear()
         
         # Rotating File Handler (максимум 10 MB, 5 файлов)
-        file_handler = RotatingFileHandler(
+        file_handler = _SecurityFileHandler(
             self.log_path,
             maxBytes=10 * 1024 * 1024,  # 10 MB
             backupCount=5,
@@ -86,7 +274,7 @@ class SecurityLogger:
         console_handler.setLevel(logging.INFO)
         
         # Формат логов
-        formatter = logging.Formatter(
+        formatter = _CachedTimeFormatter(
             '[%(asctime)s] [%(levelname)s] [%(event_type)s] %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
@@ -94,12 +282,23 @@ class SecurityLogger:
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # Запись выполняется единственным потоком QueueListener,
+        # вызывающие потоки только помещают событие в очередь
+        self._queue = queue.SimpleQueue()
+        self._listener = _BatchingQueueListener(
+            self._queue, file_handler, console_handler,
+            respect_handler_level=True
+        )
+        self.logger.addHandler(QueueHandler(self._queue))
+        self._listener.start()
         
-        # Установка прав доступа к лог-файлу (только root)
-        if os.path.exists(self.log_path):
-            os.chmod(self.log_path, 0o600)
+        # Методы логгера по уровню критичности (связываются один раз)
+        self._dispatch = {
+            EventSeverity.INFO: self.logger.info,
+            EventSeverity.WARNING: self.logger.warning,
+            EventSeverity.CRITICAL: self.logger.critical,
+            EventSeverity.EMERGENCY: self.logger.critical
+        }
     
     def _log(self, event_type: EventType, severity: EventSeverity, message: str, **kwargs):
         """
@@ -111,26 +310,60 @@ class SecurityLogger:
             message: текст сообщения
             **kwargs: дополнительные параметры
         """
-        # Формирование дополнительной информации
+        # Добавление дополнительных полей
+        if kwargs:
+            details = ' | '.join([f"{k}={v}" for k, v in kwargs.items()])
+            message = f"{message} | {details}"
+        
+        # Массовые однотипные события накапливаются до конца окна
+        # (критические записываются сразу и по порядку с остальными)
+        if event_type in self.COALESCE_TYPES and severity not in self.NO_COALESCE_SEVERITIES:
+            with self._coalesce_lock:
+                self._coalesce[event_type].append((severity, message, kwargs.get('path')))
+            return
+        
+        self._emit(event_type, severity, message)
+    
+    def _emit(self, event_type: EventType, severity: EventSeverity, message: str):
+        """Передача записи в логгер с уровнем, соответствующим критичности"""
         extra_info = {
             'event_type': event_type.value,
             'severity': severity.value
         }
         
-        # Добавление дополнительных полей
-        if kwargs:
-            details = ' | '.join([f"{k}={v}" for k, v in kwargs.items()])
-            message = f"{message} | {details}"
+        if severity is EventSeverity.EMERGENCY:
+            message = f"🚨 EMERGENCY: {message}"
+        
+        self._dispatch[severity](message, extra=extra_info)
+    
+    def _coalesce_loop(self):
+        """Поток периодической выгрузки накопленных событий"""
+        while not self._coalesce_stop.wait(self._coalesce_window):
+            self._flush_coalesced()
+    
+    def _flush_coalesced(self):
+        """
+        Выгрузка накопленных событий
+        
+        Одиночное событие записывается как есть, серия - одной сводной записью
+        """
+        with self._coalesce_lock:
+            if not self._coalesce:
+                return
+            buckets = self._coalesce
+            self._coalesce = defaultdict(list)
         
-        # Выбор уровня логирования
-        if severity == EventSeverity.INFO:
-            self.logger.info(message, extra=extra_info)
-        elif severity == EventSeverity.WARNING:
-            self.logger.warning(message, extra=extra_info)
-        elif severity == EventSeverity.CRITICAL:
-            self.logger.critical(message, extra=extra_info)
-        elif severity == EventSeverity.EMERGENCY:
-            self.logger.critical(f"🚨 EMERGENCY: {message}", extra=extra_info)
+        for event_type, entries in buckets.items():
+            severity, message, first_path = entries[0]
+            
+            if len(entries) == 1:
+                self._emit(event_type, severity, message)
+                continue
+            
+            last_path = entries[-1][2]
+            self._emit(event_type, severity,
+                       f"Серия событий: {len(entries)} за {self._coalesce_window:.1f} сек"
+                       f" | first={first_path} | last={last_path}")
     
     # ========== События системы ==========
     
@@ -314,13 +547,94 @@ class SecurityLogger:
         except Exception as e:
             return [f"Ошибка чтения лога: {e}"]
     
-    def clear_logs(self):
-        """Очистка логов (использовать с осторожностью)"""
+    def get_logs_since(self, cursor: Optional[list] = None,
+                       lines: int = 100) -> Tuple[list, Optional[list], bool]:
+        """
+        Получение записей лога, добавленных после курсора
+        
+        Курсор - (inode файла, смещение после последней прочитанной строки).
+        Без курсора, после ротации или очистки журнала, а также если новых
+        строк больше lines, возвращаются последние lines строк со сбросом.
+        
+        Args:
+            cursor: курсор предыдущего чтения или None
+            lines: максимальное количество строк
+        
+        Returns:
+            (строки без перевода строки, новый курсор,
+             признак сброса - строки заменяют полученные ранее)
+        """
         try:
-            if os.path.exists(self.log_path):
-                os.remove(self.log_path)
-            self._setup_logger()
-            self._log(EventType.ADMIN_ACTION, EventSeverity.WARNING,
-                      "Логи очищены администратором")
+            with open(self.log_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                size = stat.st_size
+                reset = (not cursor or cursor[0] != stat.st_ino
+                         or cursor[1] > size)
+                start = self._tail_offset(f, size, lines) if reset else cursor[1]
+                f.seek(start)
+                data = f.read(size - start)
+        except FileNotFoundError:
+            return [], None, True
         except Exception as e:
-            self.error(f"Не удалось очистить логи: {e}")
\ No newline at end of file
+            return [f"Ошибка чтения лога: {e}"], None, True
+        
+        # Недописанная строка будет прочитана при следующем запросе
+        end = data.rfind(b'\n') + 1
+        new_lines = data[:end].decode('utf-8', errors='replace').splitlines()
+        if len(new_lines) > lines:
+            new_lines = new_lines[-lines:]
+            reset = True
+        return new_lines, [stat.st_ino, start + end], reset
+    
+    @staticmethod
+    def _tail_offset(f, size: int, lines: int) -> int:
+        """Смещение начала последних lines строк (чтение блоками с конца)"""
+        position = size
+        newlines = 0
+        while position > 0:
+            read_size = min(65536, position)
+            position -= read_size
+            f.seek(position)
+            chunk = f.read(read_size)
+            index = len(chunk)
+            while True:
+                index = chunk.rfind(b'\n', 0, index)
+                if index < 0:
+                    break
+                newlines += 1
+                if newlines > lines:
+                    return position + index + 1
+        return 0
+    
+    def close(self):
+        """Завершение записи: сброс очереди и закрытие файлов журнала"""
+        self._coalesce_stop.set()
+        self._coalesce_thread.join(timeout=2)
+        self._flush_coalesced()
+        
+        self._stop_listener()
+        if self.logger:
+            self.logger.handlers.clear()
+    
+    def _stop_listener(self):
+        """Остановка потока записи с обработкой оставшихся событий"""
+        if self._listener is None:
+            return
+        
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+    
+    def clear_logs(self):
+        """
+        Очистка логов (использовать с осторожностью)
+        
+        Файл очищается потоком записи в порядке очереди, поэтому вызывающий
+        поток не блокируется и не конкурирует с записью событий.
+        """
+        # Накопленные серии событий попадают в очередь до очистки
+        self._flush_coalesced()
+        self._queue.put(_TruncateRecord())
+        self._log(EventType.ADMIN_ACTION, EventSeverity.WARNING,
+                  "Логи очищены администратором")
\ No newline at end of file
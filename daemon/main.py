@@ -11,10 +11,16 @@ Secure FS Guard - Система контроля целостности и до
 import os
 import sys
 import signal
-import time
 import argparse
+import threading
+import itertools
+import time
+import ctypes
+import platform
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Tuple, Dict
 
 # Импорт модулей системы
 from config_manager import ConfigManager, SystemConfig
@@ -26,6 +32,37 @@ from recovery import RecoveryEngine, RecoveryMethod
 from auth import AuthManager, SystemMode
 from ipc_server import IPCServer, IPCCommand, IPCResponse
 
+# Номер системного вызова ioprio_set (в os/ctypes обёртки нет)
+SYS_IOPRIO_SET = {'x86_64': 251, 'aarch64': 30, 'i686': 289}.get(platform.machine())
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_BE = 2
+IOPRIO_CLASS_SHIFT = 13
+
+class _EventCounter:
+    """
+    Счётчик событий без блокировки на увеличении
+    
+    increment - next() на itertools.count: один вызов C-кода, атомарный
+    и без поиска по словарю. Значение itertools.count нельзя прочитать без
+    изменения, поэтому чтение тоже выполняет next() и вычитает число
+    предыдущих чтений; блокировкой сериализуются только чтения
+    """
+    
+    __slots__ = ('increment', '_counter', '_reads', '_read_lock')
+    
+    def __init__(self):
+        self._counter = itertools.count()
+        self._reads = 0
+        self._read_lock = threading.Lock()
+        self.increment = self._counter.__next__
+    
+    def value(self) -> int:
+        """Текущее число событий"""
+        with self._read_lock:
+            value = next(self._counter) - self._reads
+            self._reads += 1
+            return value
+
 class SecureFSGuard:
     """
     Главный класс системы контроля целостности
@@ -41,6 +78,26 @@ class SecureFSGuard:
     - IPC сервер
     """
     
+    # Интервал очистки истёкших сессий в основном цикле (секунды)
+    SESSION_CLEANUP_INTERVAL = 60
+    
+    # Окно объединения событий модификации одного файла (секунды)
+    MODIFY_DEBOUNCE_WINDOW = 0.25
+    
+    # Интервал обновления закэшированного статуса для IPC (секунды)
+    STATUS_REFRESH_INTERVAL = 1.0
+    
+    # Ядра, оставляемые IPC и мониторингу во время инициализации эталона
+    RESERVED_CORES = 2
+    
+    # Число файлов в работе на один поток пула инициализации: результаты
+    # подготовки не накапливаются в памяти для всего дерева
+    INIT_FILES_PER_WORKER = 4
+    
+    # Приоритет потоков инициализации эталона (nice и уровень best-effort I/O)
+    BASELINE_WORKER_NICE = 10
+    BASELINE_WORKER_IOPRIO = 7
+    
     def __init__(self, config_path: str = "/etc/secure_fs_guard/system.yaml"):
         # Проверка root прав
         if os.geteuid() != 0:
@@ -64,13 +121,30 @@ class SecureFSGuard:
         self.config_path = config_path
         self.is_running = False
         
-        # Статистика
-        self.stats = {
-            'files_checked': 0,
-            'violations_detected': 0,
-            'files_restored': 0,
-            'ransomware_detected': 0
-        }
+        # Событие остановки: основной поток ждёт его без периодических пробуждений
+        self._shutdown_event = threading.Event()
+        
+        # Отложенные проверки модификаций {file_path: срок проверки (monotonic)}
+        self._pending_checks: Dict[str, float] = {}
+        self._pending_cond = threading.Condition()
+        self._debounce_thread: Optional[threading.Thread] = None
+        
+        # Статус для IPC пересобирается фоновым потоком, обработчик только
+        # возвращает готовый словарь
+        self._cached_status: Optional[dict] = None
+        self._status_refresh_event = threading.Event()
+        self._status_thread: Optional[threading.Thread] = None
+        
+        # Флаг активности: статус рассылается подписчикам (GUI) не чаще
+        # одного раза за интервал обновления и только после изменений
+        self._status_dirty = True
+        
+        # Статистика: отдельный счётчик на каждое событие (увеличение без
+        # блокировки, снимок значений - только при чтении статистики)
+        self._c_files_checked = _EventCounter()
+        self._c_violations_detected = _EventCounter()
+        self._c_files_restored = _EventCounter()
+        self._c_ransomware_detected = _EventCounter()
     
     def initialize(self) -> bool:
         """
@@ -111,9 +185,11 @@ class SecureFSGuard:
                     'time_window': config.ransomware_thresholds.time_window,
                     'block_change_percent': config.ransomware_thresholds.block_change_percent,
                     'entropy_threshold': config.ransomware_thresholds.entropy_threshold
-                }
+                },
+                hash_algorithm=config.block_config.algorithm
             )
             print(f"✓ Движок целостности инициализирован")
+            print(f"  - Алгоритм хэширования: {self.integrity_engine.hash_algorithm}")
             print(f"  - Порог ransomware: {config.ransomware_thresholds.files_count} файлов за {config.ransomware_thresholds.time_window} сек")
             
             print("\n[5/8] Инициализация движка восстановления...")
@@ -122,7 +198,10 @@ class SecureFSGuard:
             self.recovery_engine = RecoveryEngine(
                 backup_dir=backup_dir,
                 quarantine_dir=quarantine_dir,
-                block_size=config.block_config.size
+                block_size=config.block_config.size,
+                max_backups_per_file=config.retention.max_backups_per_file,
+                backup_max_age=config.retention.backup_max_age,
+                quarantine_max_age=config.retention.quarantine_max_age
             )
             print(f"✓ Движок восстановления инициализирован")
             print(f"  - Директория резервных копий: {backup_dir}")
@@ -137,10 +216,13 @@ class SecureFSGuard:
                 protected_paths=config.protected_paths,
                 callback=self._on_file_event,
                 use_inotify=config.monitoring.use_inotify,
-                fallback_interval=config.monitoring.fallback_interval
+                use_fanotify=config.monitoring.use_fanotify,
+                fallback_interval=config.monitoring.fallback_interval,
+                path_filter=self.hash_storage.file_exists
             )
             print(f"✓ Мониторинг инициализирован")
             print(f"  - inotify: {'включён' if config.monitoring.use_inotify else 'выключен'}")
+            print(f"  - fanotify: {'включён' if self.watcher.use_fanotify else 'выключен'}")
             print(f"  - Fallback интервал: {config.monitoring.fallback_interval} сек")
             
             print("\n[8/8] Инициализация IPC сервера...")
@@ -152,6 +234,14 @@ class SecureFSGuard:
                 return False
             print(f"✓ IPC сервер запущен: {config.ipc_socket}")
             
+            # Фоновое обновление статуса для IPC
+            self._status_thread = threading.Thread(
+                target=self._status_refresh_loop,
+                daemon=True,
+                name="StatusRefresher"
+            )
+            self._status_thread.start()
+            
             print("\n" + "=" * 60)
             print("✓ Все подсистемы инициализированы успешно")
             print("=" * 60)
@@ -170,6 +260,7 @@ class SecureFSGuard:
         self.ipc_server.register_handler(IPCCommand.GET_STATUS, self._ipc_get_status)
         self.ipc_server.register_handler(IPCCommand.GET_STATISTICS, self._ipc_get_statistics)
         self.ipc_server.register_handler(IPCCommand.GET_LOGS, self._ipc_get_logs)
+        self.ipc_server.register_handler(IPCCommand.GET_LOGS_SINCE, self._ipc_get_logs_since)
         
         # Управление режимами
         self.ipc_server.register_handler(IPCCommand.ENTER_INIT_MODE, self._ipc_enter_init_mode)
@@ -186,6 +277,7 @@ class SecureFSGuard:
         # Управление файлами
         self.ipc_server.register_handler(IPCCommand.GET_FILES, self._ipc_get_files)
         self.ipc_server.register_handler(IPCCommand.GET_FILE_INFO, self._ipc_get_file_info)
+        self.ipc_server.register_handler(IPCCommand.GET_FILE_INFOS, self._ipc_get_file_infos)
         self.ipc_server.register_handler(IPCCommand.CHECK_FILE, self._ipc_check_file)
         self.ipc_server.register_handler(IPCCommand.RESTORE_FILE, self._ipc_restore_file)
         
@@ -210,21 +302,57 @@ class SecureFSGuard:
     
     def _ipc_get_status(self, params: dict) -> IPCResponse:
         """Получение статуса системы"""
-        status = {
+        status = self._cached_status
+        if status is None:
+            status = self._build_status()
+        return IPCResponse(success=True, data=status)
+    
+    def _build_status(self) -> dict:
+        """Сборка статуса системы"""
+        return {
             'is_running': self.is_running,
             'mode': self.auth_manager.get_current_mode().value,
             'mode_info': self.auth_manager.get_status(),
             'protected_files': self.hash_storage.get_files_count(),
-            'statistics': self.stats,
+            'statistics': self._get_stats(),
             'monitoring': self.watcher.get_statistics() if self.watcher else {},
             'storage': self.hash_storage.get_statistics()
         }
-        return IPCResponse(success=True, data=status)
+    
+    def _status_refresh_loop(self):
+        """Поток периодической пересборки статуса и рассылки его подписчикам"""
+        while not self._shutdown_event.is_set():
+            try:
+                # Новый словарь подменяет старый целиком (атомарно для читателей)
+                self._cached_status = self._build_status()
+                
+                if self._status_dirty:
+                    self._status_dirty = False
+                    self.ipc_server.broadcast_notification('status', self._cached_status)
+            except Exception as e:
+                self.logger.error(f"Ошибка обновления статуса: {e}")
+            
+            self._status_refresh_event.wait(self.STATUS_REFRESH_INTERVAL)
+            self._status_refresh_event.clear()
+    
+    def _request_status_refresh(self):
+        """Немедленная пересборка статуса после изменения состояния"""
+        self._status_dirty = True
+        self._status_refresh_event.set()
+    
+    def _get_stats(self) -> Dict[str, int]:
+        """Снимок счётчиков статистики"""
+        return {
+            'files_checked': self._c_files_checked.value(),
+            'violations_detected': self._c_violations_detected.value(),
+            'files_restored': self._c_files_restored.value(),
+            'ransomware_detected': self._c_ransomware_detected.value()
+        }
     
     def _ipc_get_statistics(self, params: dict) -> IPCResponse:
         """Получение детальной статистики"""
         stats = {
-            'system': self.stats,
+            'system': self._get_stats(),
             'storage': self.hash_storage.get_statistics(),
             'monitoring': self.watcher.get_statistics(),
             'integrity': self.integrity_engine.get_modification_statistics(),
@@ -239,6 +367,16 @@ class SecureFSGuard:
         logs = self.logger.get_recent_logs(lines)
         return IPCResponse(success=True, data={'logs': logs})
     
+    def _ipc_get_logs_since(self, params: dict) -> IPCResponse:
+        """Получение записей лога, добавленных после курсора клиента"""
+        lines = params.get('lines', 100)
+        logs, cursor, reset = self.logger.get_logs_since(params.get('cursor'), lines)
+        return IPCResponse(success=True, data={
+            'logs': logs,
+            'cursor': cursor,
+            'reset': reset
+        })
+    
     def _ipc_enter_init_mode(self, params: dict) -> IPCResponse:
         """Вход в режим инициализации"""
         admin_user = params.get('admin_user', 'gui')
@@ -246,6 +384,7 @@ class SecureFSGuard:
         
         if success:
             self.logger.init_mode_enabled(admin_user)
+            self._request_status_refresh()
         
         return IPCResponse(success=success, data={'message': message})
     
@@ -256,6 +395,7 @@ class SecureFSGuard:
         
         if success:
             self.logger.init_mode_disabled()
+            self._request_status_refresh()
         
         return IPCResponse(success=success, data={'message': message})
     
@@ -270,6 +410,7 @@ class SecureFSGuard:
             self.logger.update_mode_enabled(admin_user, timeout)
             # Приостановка мониторинга
             self.watcher.pause()
+            self._request_status_refresh()
         
         return IPCResponse(success=success, data={'message': message, 'token': token})
     
@@ -282,6 +423,7 @@ class SecureFSGuard:
             self.logger.update_mode_disabled()
             # Возобновление мониторинга
             self.watcher.resume()
+            self._request_status_refresh()
         
         return IPCResponse(success=success, data={'message': message})
     
@@ -294,6 +436,7 @@ class SecureFSGuard:
             self.logger.admin_action("Выход из аварийного режима", admin_user)
             # Возобновление мониторинга
             self.watcher.resume()
+            self._request_status_refresh()
         
         return IPCResponse(success=success, data={'message': message})
     
@@ -306,6 +449,8 @@ class SecureFSGuard:
         if self.config_manager.add_protected_path(path):
             self.watcher.add_path(path)
             self.logger.path_added(path, params.get('admin_user', 'gui'))
+            self._request_status_refresh()
+            self.ipc_server.broadcast_notification('settings_changed', {})
             return IPCResponse(success=True, data={'message': f'Путь добавлен: {path}'})
         else:
             return IPCResponse(success=False, error="Не удалось добавить путь")
@@ -319,6 +464,8 @@ class SecureFSGuard:
         if self.config_manager.remove_protected_path(path):
             self.watcher.remove_path(path)
             self.logger.path_removed(path, params.get('admin_user', 'gui'))
+            self._request_status_refresh()
+            self.ipc_server.broadcast_notification('settings_changed', {})
             return IPCResponse(success=True, data={'message': f'Путь удалён: {path}'})
         else:
             return IPCResponse(success=False, error="Не удалось удалить путь")
@@ -343,17 +490,32 @@ class SecureFSGuard:
         if not file_record:
             return IPCResponse(success=False, error="Файл не найден в хранилище")
         
-        info = {
+        return IPCResponse(success=True, data=self._file_info(file_record))
+    
+    def _ipc_get_file_infos(self, params: dict) -> IPCResponse:
+        """Получение информации о наборе файлов одним запросом"""
+        file_paths = params.get('file_paths')
+        if not isinstance(file_paths, list):
+            return IPCResponse(success=False, error="Не указан список путей")
+        
+        records = self.hash_storage.get_file_summaries(file_paths)
+        return IPCResponse(success=True, data={
+            'files': {path: self._file_info(record) for path, record in records.items()}
+        })
+    
+    @staticmethod
+    def _file_info(file_record) -> dict:
+        """Информация о файле для ответа IPC"""
+        return {
             'file_path': file_record.file_path,
             'file_size': file_record.file_size,
             'blocks_count': file_record.blocks_count,
             'is_trusted': file_record.is_trusted,
             'created_at': file_record.created_at,
             'updated_at': file_record.updated_at,
-            'backup_path': file_record.backup_path
+            'backup_path': file_record.backup_path,
+            'hash_algorithm': file_record.hash_algorithm
         }
-        
-        return IPCResponse(success=True, data=info)
     
     def _ipc_check_file(self, params: dict) -> IPCResponse:
         """Проверка целостности файла"""
@@ -368,7 +530,8 @@ class SecureFSGuard:
         result = self.integrity_engine.check_integrity(
             file_path,
             file_record.block_hashes,
-            self.auth_manager.is_update_mode()
+            self.auth_manager.is_update_mode(),
+            file_record.hash_algorithm
         )
         
         return IPCResponse(success=True, data={
@@ -422,7 +585,6 @@ class SecureFSGuard:
             return IPCResponse(success=False, error="Требуется режим инициализации")
         
         # Запуск инициализации в отдельном потоке
-        import threading
         thread = threading.Thread(target=self._perform_initialization, daemon=True)
         thread.start()
         
@@ -447,6 +609,7 @@ class SecureFSGuard:
     def _ipc_update_config(self, params: dict) -> IPCResponse:
         """Обновление конфигурации"""
         # Здесь можно добавить логику обновления конфигурации
+        self.ipc_server.broadcast_notification('settings_changed', {})
         return IPCResponse(success=True, data={'message': 'Конфигурация обновлена'})
     
     def _ipc_ping(self, params: dict) -> IPCResponse:
@@ -456,7 +619,10 @@ class SecureFSGuard:
     def _ipc_shutdown(self, params: dict) -> IPCResponse:
         """Остановка службы"""
         self.logger.admin_action("Остановка системы", params.get('admin_user', 'gui'))
-        self.shutdown()
+        
+        # Остановку выполняет основной поток: поток клиента IPC - фоновый
+        # и был бы прерван завершением интерпретатора посреди shutdown()
+        self._shutdown_event.set()
         return IPCResponse(success=True, data={'message': 'Система останавливается'})
     
     # ========== Основная логика ==========
@@ -469,22 +635,39 @@ class SecureFSGuard:
             config = self.config_manager.get_config()
             total_files = 0
             
+            # Полный список файлов собирается заранее
+            file_paths = []
             for base_path in config.protected_paths:
                 expanded_path = os.path.expanduser(base_path)
                 
                 if os.path.isfile(expanded_path):
-                    self._initialize_file(expanded_path)
-                    total_files += 1
+                    file_paths.append(expanded_path)
                 
                 elif os.path.isdir(expanded_path):
-                    for root, dirs, files in os.walk(expanded_path):
-                        for filename in files:
-                            file_path = os.path.join(root, filename)
-                            try:
-                                self._initialize_file(file_path)
-                                total_files += 1
-                            except Exception as e:
-                                self.logger.error(f"Ошибка инициализации {file_path}: {e}")
+                    file_paths.extend(self._walk_files(expanded_path))
+            
+            # Хэширование и резервное копирование выполняются пулом потоков,
+            # запись в хранилище - только текущим потоком, пачками транзакций
+            # (блокировка записи хранилища удерживается только на время пачки)
+            max_workers = min(32, (os.cpu_count() or 1) * 2)
+            batch = []
+            with ThreadPoolExecutor(max_workers=max_workers,
+                                    thread_name_prefix="BaselineInit",
+                                    initializer=self._lower_worker_priority,
+                                    initargs=(self._get_worker_cores(),)) as executor:
+                window = max_workers * self.INIT_FILES_PER_WORKER
+                for file_path, prepared, error in self._prepare_files(executor, file_paths, window):
+                    if error is not None:
+                        self.logger.error(f"Ошибка инициализации {file_path}: {error}")
+                        continue
+                    
+                    batch.append((file_path, prepared))
+                    if len(batch) >= self.hash_storage.BULK_BATCH_SIZE:
+                        total_files += self._store_files(batch)
+                        batch = []
+            
+            if batch:
+                total_files += self._store_files(batch)
             
             self.logger.admin_action(f"Инициализация завершена", details=f"Обработано файлов: {total_files}")
             
@@ -496,26 +679,149 @@ class SecureFSGuard:
         except Exception as e:
             self.logger.error(f"Ошибка инициализации: {e}")
     
-    def _initialize_file(self, file_path: str):
-        """Инициализация одного файла"""
+    @staticmethod
+    def _walk_files(directory: str):
+        """
+        Обход дерева каталога через os.scandir
+        
+        Тип записи берётся из getdents (DirEntry), без отдельного stat
+        на каждый файл. Символические ссылки на каталоги не обходятся,
+        как и в os.walk; каталоги без прав доступа пропускаются
+        
+        Yields:
+            путь к обычному файлу
+        """
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file():
+                                yield entry.path
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+    
+    def _get_worker_cores(self) -> Optional[set]:
+        """
+        Ядра для потоков инициализации эталона
+        
+        Returns:
+            множество ядер без первых RESERVED_CORES (None - ограничение не нужно)
+        """
+        if not hasattr(os, 'sched_getaffinity'):
+            return None
+        
+        cores = sorted(os.sched_getaffinity(0))
+        if len(cores) <= self.RESERVED_CORES:
+            return None
+        
+        return set(cores[self.RESERVED_CORES:])
+    
+    @classmethod
+    def _lower_worker_priority(cls, worker_cores: Optional[set]):
+        """
+        Понижение приоритета текущего потока пула инициализации
+        
+        В Linux affinity, nice и ioprio задаются для отдельного потока,
+        поэтому потоки IPC и мониторинга сохраняют обычный приоритет
+        """
+        try:
+            if worker_cores:
+                os.sched_setaffinity(0, worker_cores)
+            
+            os.nice(cls.BASELINE_WORKER_NICE)
+            
+            if SYS_IOPRIO_SET is not None:
+                ioprio = (IOPRIO_CLASS_BE << IOPRIO_CLASS_SHIFT) | cls.BASELINE_WORKER_IOPRIO
+                ctypes.CDLL(None, use_errno=True).syscall(SYS_IOPRIO_SET, IOPRIO_WHO_PROCESS, 0, ioprio)
+        
+        except OSError:
+            # Приоритет - оптимизация, ошибка не мешает инициализации
+            pass
+    
+    def _prepare_file(self, file_path: str) -> Tuple[List[str], int, bool, str]:
+        """
+        Вычисление хэшей и создание резервной копии файла
+        
+        Не обращается к хранилищу, поэтому может выполняться в пуле потоков
+        
+        Returns:
+            (хэши блоков, размер файла, успешность копирования, путь к копии)
+        """
         # Вычисление хэшей
         block_hashes, file_size = self.integrity_engine.compute_file_hashes(file_path)
         
         # Создание резервной копии
         success, backup_path = self.recovery_engine.create_backup(file_path)
         
-        # Сохранение в хранилище
-        self.hash_storage.add_file(
-            file_path=file_path,
-            file_size=file_size,
-            block_size=self.config_manager.get_config().block_config.size,
-            block_hashes=block_hashes,
-            backup_path=backup_path if success else None
-        )
+        return block_hashes, file_size, success, backup_path
+    
+    def _prepare_files(self, executor: ThreadPoolExecutor, file_paths: List[str], window: int):
+        """
+        Подготовка файлов пулом потоков с ограниченным окном
         
-        self.logger.file_added(file_path, len(block_hashes))
-        if success:
-            self.logger.backup_created(file_path, backup_path)
+        В пул передаётся не больше window файлов одновременно, следующий
+        файл отправляется после получения результата самого старого
+        
+        Yields:
+            результаты _prepare_file_safe в порядке file_paths
+        """
+        pending = deque()
+        for file_path in file_paths:
+            pending.append(executor.submit(self._prepare_file_safe, file_path))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        
+        while pending:
+            yield pending.popleft().result()
+    
+    def _prepare_file_safe(self, file_path: str) -> Tuple[str, Optional[tuple], Optional[Exception]]:
+        """Подготовка файла для пула потоков (ошибка возвращается, а не выбрасывается)"""
+        try:
+            return file_path, self._prepare_file(file_path), None
+        except Exception as e:
+            return file_path, None, e
+    
+    def _store_files(self, batch: List[Tuple[str, tuple]]) -> int:
+        """
+        Сохранение пачки подготовленных файлов в хранилище одной транзакцией
+        
+        Args:
+            batch: [(путь, результат _prepare_file)]
+            
+        Returns:
+            количество сохранённых файлов
+        """
+        block_size = self.config_manager.get_config().block_config.size
+        hash_algorithm = self.integrity_engine.hash_algorithm
+        
+        try:
+            results = self.hash_storage.add_files([
+                (file_path, file_size, block_size, block_hashes, backup_path if success else None, hash_algorithm)
+                for file_path, (block_hashes, file_size, success, backup_path) in batch
+            ])
+        except Exception as e:
+            self.logger.error(f"Ошибка сохранения пачки из {len(batch)} файлов: {e}")
+            return 0
+        
+        stored = 0
+        for (file_path, error), (_, (block_hashes, _, success, backup_path)) in zip(results, batch):
+            if error is not None:
+                self.logger.error(f"Ошибка инициализации {file_path}: {error}")
+                continue
+            
+            stored += 1
+            self.logger.file_added(file_path, len(block_hashes))
+            if success:
+                self.logger.backup_created(file_path, backup_path)
+        
+        return stored
     
     def _on_file_event(self, event: WatchEvent):
         """
@@ -524,21 +830,88 @@ class SecureFSGuard:
         Args:
             event: событие изменения файла
         """
-        # Игнорируем события для директорий
-        if os.path.isdir(event.file_path):
-            return
-        
-        # Проверка наличия файла в хранилище
+        # Подписчики получат статус на следующем шаге StatusRefresher
+        self._status_dirty = True
+        
+        # Переименование отслеживаемого файла (x -> x.locked) для исходного
+        # пути равносильно удалению - так же его сообщает и fanotify
+        if event.event_type == WatchEventType.MOVE and event.src_path and not event.is_dir:
+            if self.hash_storage.file_exists(event.src_path):
+                self._handle_file_deletion(event.src_path)
+                self._notify_file_changed(event.src_path, WatchEventType.DELETE)
+        
+        # Проверка наличия файла в хранилище (множество в памяти,
+        # отсекает события неотслеживаемых файлов до любых системных вызовов)
         if not self.hash_storage.file_exists(event.file_path):
             # Файл не в доверенном состоянии - игнорируем
             return
         
-        # Обработка в зависимости от типа события
-        if event.event_type in [WatchEventType.MODIFY, WatchEventType.WRITE]:
-            self._handle_file_modification(event.file_path)
+        # Обработка в зависимости от типа события (события директорий игнорируются)
+        if not event.is_dir:
+            if event.event_type in [WatchEventType.MODIFY, WatchEventType.WRITE]:
+                self._schedule_check(event.file_path)
+            
+            elif event.event_type == WatchEventType.DELETE:
+                self._handle_file_deletion(event.file_path)
+            
+            elif event.event_type == WatchEventType.MOVE:
+                # Другой файл перемещён на место отслеживаемого - изменение
+                # содержимого; сам отслеживаемый файл перемещён (IN_MOVE_SELF) - удаление
+                if os.path.lexists(event.file_path):
+                    self._schedule_check(event.file_path)
+                else:
+                    self._handle_file_deletion(event.file_path)
+        
+        self._notify_file_changed(event.file_path, event.event_type)
+    
+    def _notify_file_changed(self, file_path: str, event_type: WatchEventType):
+        """
+        Уведомление клиентов об изменении файла (сброс кэшированной информации)
+        
+        Отправляется после постановки проверки и только ставится в очереди
+        подписчиков, не задерживая поток обратного вызова
+        """
+        self.ipc_server.broadcast_notification('file_changed', {
+            'file_path': file_path,
+            'event_type': event_type.value
+        })
+    
+    def _schedule_check(self, file_path: str):
+        """
+        Отложенная проверка целостности файла
         
-        elif event.event_type == WatchEventType.DELETE:
-            self._handle_file_deletion(event.file_path)
+        Каждое новое событие переносит срок проверки, поэтому серия
+        событий модификации одного файла приводит к одной проверке
+        """
+        with self._pending_cond:
+            was_empty = not self._pending_checks
+            self._pending_checks[file_path] = time.monotonic() + self.MODIFY_DEBOUNCE_WINDOW
+            
+            # Новый срок не раньше уже ожидаемых, будить поток нужно только
+            # если он ждёт без таймаута
+            if was_empty:
+                self._pending_cond.notify()
+    
+    def _debounce_loop(self):
+        """Поток выполнения отложенных проверок модификаций"""
+        while True:
+            with self._pending_cond:
+                while True:
+                    if self._shutdown_event.is_set():
+                        return
+                    
+                    now = time.monotonic()
+                    due = [path for path, deadline in self._pending_checks.items() if deadline <= now]
+                    if due:
+                        for path in due:
+                            del self._pending_checks[path]
+                        break
+                    
+                    timeout = min(self._pending_checks.values()) - now if self._pending_checks else None
+                    self._pending_cond.wait(timeout)
+            
+            for file_path in due:
+                self._handle_file_modification(file_path)
     
     def _handle_file_modification(self, file_path: str):
         """Обработка модификации файла"""
@@ -552,10 +925,11 @@ class SecureFSGuard:
             result = self.integrity_engine.check_integrity(
                 file_path,
                 file_record.block_hashes,
-                self.auth_manager.is_update_mode()
+                self.auth_manager.is_update_mode(),
+                file_record.hash_algorithm
             )
             
-            self.stats['files_checked'] += 1
+            self._c_files_checked.increment()
             
             # Обработка результата
             if result.change_type == ChangeType.NO_CHANGE:
@@ -574,7 +948,7 @@ class SecureFSGuard:
     
     def _handle_violation(self, file_path: str, result: IntegrityCheckResult, file_record: FileRecord):
         """Обработка нарушения целостности"""
-        self.stats['violations_detected'] += 1
+        self._c_violations_detected.increment()
         
         # Логирование
         self.logger.file_modified_unauthorized(file_path, result.blocks_changed, result.blocks_total)
@@ -604,7 +978,7 @@ class SecureFSGuard:
     
     def _handle_ransomware_attack(self, details: dict):
         """Обработка атаки ransomware"""
-        self.stats['ransomware_detected'] += 1
+        self._c_ransomware_detected.increment()
         
         self.logger.ransomware_detected(
             details['files_affected'],
@@ -614,15 +988,15 @@ class SecureFSGuard:
         
         # Вход в аварийный режим
         self.auth_manager.enter_emergency_mode("Обнаружена атака ransomware")
+        self._request_status_refresh()
         
         # Приостановка мониторинга
         self.watcher.pause()
         
-        # Массовая блокировка файлов
-        all_files = self.hash_storage.get_all_files()
-        blocked, errors = self.recovery_engine.emergency_block_all(all_files)
+        # Массовая блокировка файлов (пути читаются из хранилища потоком)
+        blocked, errors = self.recovery_engine.emergency_block_all(self.hash_storage.iter_all_files())
         
-        self.logger.emergency_mode_activated(f"Заблокировано файлов: {blocked}/{len(all_files)}")
+        self.logger.emergency_mode_activated(f"Заблокировано файлов: {blocked}/{blocked + errors}")
         
         # Уведомление через IPC
         self.ipc_server.broadcast_notification('ransomware_detected', details)
@@ -636,7 +1010,7 @@ class SecureFSGuard:
         result = self.recovery_engine.restore_from_backup(file_path, file_record.backup_path)
         
         if result.success:
-            self.stats['files_restored'] += 1
+            self._c_files_restored.increment()
             self.logger.file_restored(file_path, "full_backup")
         else:
             self.logger.error(f"Не удалось восстановить {file_path}: {result.message}")
@@ -650,7 +1024,7 @@ class SecureFSGuard:
         result = self.recovery_engine.restore_blocks(file_path, file_record.backup_path, block_indices)
         
         if result.success:
-            self.stats['files_restored'] += 1
+            self._c_files_restored.increment()
             self.logger.file_restored(file_path, "block_restore")
         else:
             self.logger.error(f"Не удалось восстановить блоки {file_path}: {result.message}")
@@ -686,6 +1060,14 @@ class SecureFSGuard:
         """Запуск основного цикла"""
         self.is_running = True
         
+        # Запуск потока отложенных проверок
+        self._debounce_thread = threading.Thread(
+            target=self._debounce_loop,
+            daemon=True,
+            name="ModifyDebounce"
+        )
+        self._debounce_thread.start()
+        
         # Запуск мониторинга
         self.watcher.start()
         
@@ -697,22 +1079,52 @@ class SecureFSGuard:
         print()
         
         # Основной цикл
+        last_backup_cleanup = time.monotonic()
         try:
-            while self.is_running:
-                time.sleep(1)
-                
-                # Периодическая очистка истёкших сессий
+            while not self._shutdown_event.wait(self.SESSION_CLEANUP_INTERVAL):
+                # Периодическая очистка истёкших сессий (срок действия
+                # сессии проверяется и при каждом обращении к ней)
                 self.auth_manager.cleanup_expired_sessions()
+                
+                # Очистка устаревших резервных копий и карантина
+                cleanup_interval = self.config_manager.get_config().retention.cleanup_interval
+                if time.monotonic() - last_backup_cleanup >= cleanup_interval:
+                    last_backup_cleanup = time.monotonic()
+                    self._cleanup_backups()
         
         except KeyboardInterrupt:
             print("\n\nПолучен сигнал прерывания...")
+        
+        # Остановка по сигналу или команде IPC выполняется здесь, в основном
+        # потоке: интерпретатор не завершится до окончания shutdown()
+        if self.is_running:
             self.shutdown()
     
+    def _cleanup_backups(self):
+        """Удаление устаревших резервных копий и файлов карантина"""
+        try:
+            removed_backups, removed_quarantine = self.recovery_engine.cleanup_expired_backups(
+                self.hash_storage.get_backup_paths()
+            )
+            if removed_backups or removed_quarantine:
+                self.logger.admin_action(
+                    "Очистка резервных копий",
+                    details=f"Удалено копий: {removed_backups}, файлов карантина: {removed_quarantine}"
+                )
+        except Exception as e:
+            self.logger.error(f"Ошибка очистки резервных копий: {e}")
+    
     def shutdown(self):
         """Корректная остановка системы"""
         print("\nОстановка системы...")
         
         self.is_running = False
+        self._shutdown_event.set()
+        self._status_refresh_event.set()
+        
+        # Пробуждение потока отложенных проверок
+        with self._pending_cond:
+            self._pending_cond.notify()
         
         # Остановка мониторинга
         if self.watcher:
@@ -733,13 +1145,15 @@ class SecureFSGuard:
         if self.logger:
             print("  [4/4] Финализация логов...")
             self.logger.system_stop()
+            self.logger.close()
         
         print("\n✓ Система остановлена")
     
     def setup_signal_handlers(self):
         """Установка обработчиков сигналов"""
-        signal.signal(signal.SIGTERM, lambda sig, frame: self.shutdown())
-        signal.signal(signal.SIGINT, lambda sig, frame: self.shutdown())
+        # Обработчик только будит основной поток, остановка выполняется в start()
+        signal.signal(signal.SIGTERM, lambda sig, frame: self._shutdown_event.set())
+        signal.signal(signal.SIGINT, lambda sig, frame: self._shutdown_event.set())
 
 
 def main():
@@ -1,10 +1,17 @@
 # daemon/recovery.py
 
 import os
+import errno
+import itertools
+import signal
+import fcntl
 import shutil
-import subprocess
-from pathlib import Path
-from typing import Optional, Tuple, List
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Optional, Tuple, List, Iterable, Dict, Set
 from enum import Enum
 from datetime import datetime
 import stat
@@ -16,6 +23,10 @@ class RecoveryMethod(Enum):
     ROLLBACK = "ROLLBACK"                 # Откат изменений
     NONE = "NONE"                         # Восстановление невозможно
 
+# Члены перечисления для горячих путей (LOAD_GLOBAL вместо обращения к Enum)
+_BACKUP_FULL = RecoveryMethod.BACKUP_FULL
+_BACKUP_BLOCKS = RecoveryMethod.BACKUP_BLOCKS
+
 class RecoveryAction(Enum):
     """Действия противодействия"""
     RESTORE = "RESTORE"                   # Восстановление файла
@@ -25,6 +36,9 @@ class RecoveryAction(Enum):
 
 class RecoveryResult:
     """Результат операции восстановления"""
+    __slots__ = ('success', 'method', 'message', 'restored_blocks',
+                 'process_terminated', 'created')
+    
     def __init__(self, success: bool, method: RecoveryMethod, message: str, 
                  restored_blocks: int = 0, process_terminated: bool = False):
         self.success = success
@@ -32,7 +46,23 @@ class RecoveryResult:
         self.message = message
         self.restored_blocks = restored_blocks
         self.process_terminated = process_terminated
-        self.timestamp = datetime.now().isoformat()
+        self.created = time.time()
+    
+    @property
+    def timestamp(self) -> str:
+        """Время операции в ISO-формате (форматируется только при обращении)"""
+        return datetime.fromtimestamp(self.created).isoformat()
+
+# ioctl клонирования файла (reflink) на Btrfs/XFS: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# ioctl флагов inode (аналог chattr) и флаг immutable
+FS_IOC_GETFLAGS = 0x80086601
+FS_IOC_SETFLAGS = 0x40086602
+FS_IMMUTABLE_FL = 0x00000010
+
+# Таблица замены разделителей пути в имени резервной копии
+_PATH_SAFE_TABLE = str.maketrans({'/': '_', os.sep: '_'})
 
 class RecoveryEngine:
     """
@@ -46,27 +76,97 @@ class RecoveryEngine:
     - карантин
     """
     
+    # Размер порции копирования при восстановлении
+    COPY_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB
+    
+    # Максимальный объём одного pread/pwrite при поблочном восстановлении
+    RESTORE_IO_CHUNK_SIZE = 4 * 1024 * 1024  # 4 MB
+    
+    # Размер файла, начиная с которого восстановление не оставляет данные
+    # в page cache (чтобы не вытеснять рабочие данные службы)
+    DROP_CACHE_THRESHOLD = 64 * 1024 * 1024  # 64 MB
+    
+    # Число потоков аварийной блокировки (работа упирается в системные вызовы)
+    EMERGENCY_BLOCK_WORKERS = 64
+    
+    # Максимальное число файлов одной директории в задаче аварийной блокировки
+    EMERGENCY_BLOCK_BATCH = 64
+    
+    # Длина суффикса имени резервной копии: _ГГГГММДД_ЧЧММСС.backup
+    BACKUP_NAME_SUFFIX_LENGTH = len('_20000101_000000.backup')
+    
     def __init__(self, backup_dir: str = "/var/lib/secure_fs_guard/storage/backups",
                  quarantine_dir: str = "/var/lib/secure_fs_guard/quarantine",
-                 block_size: int = 65536):
+                 block_size: int = 65536, max_backups_per_file: int = 5,
+                 backup_max_age: int = 0, quarantine_max_age: int = 0):
         """
         Args:
             backup_dir: директория резервных копий
             quarantine_dir: директория карантина
             block_size: размер блока в байтах
+            max_backups_per_file: сколько последних копий файла хранить
+            backup_max_age: срок хранения копий в секундах (0 - без ограничения)
+            quarantine_max_age: срок хранения карантина в секундах (0 - без ограничения)
         """
         self.backup_dir = backup_dir
         self.quarantine_dir = quarantine_dir
         self.block_size = block_size
+        self.max_backups_per_file = max(max_backups_per_file, 1)
+        self.backup_max_age = backup_max_age
+        self.quarantine_max_age = quarantine_max_age
+        
+        # Пул создаётся заранее, чтобы реакция на атаку не ждала его создания
+        self._block_executor = ThreadPoolExecutor(
+            max_workers=self.EMERGENCY_BLOCK_WORKERS,
+            thread_name_prefix="EmergencyBlock"
+        )
+        
+        # Индекс резервных копий {имя файла: [информация о копиях]},
+        # пересканируется только при изменении mtime директории
+        self._backup_index: Optional[Dict[str, List[dict]]] = None
+        self._backup_index_dir_mtime: Optional[int] = None
+        self._backup_index_lock = threading.Lock()
+        
+        # Директории, существование которых уже проверено
+        self._ensured_dirs = set()
         
         self._ensure_directories()
     
     def _ensure_directories(self):
         """Создание необходимых директорий"""
         for directory in [self.backup_dir, self.quarantine_dir]:
-            Path(directory).mkdir(parents=True, exist_ok=True, mode=0o700)
+            self._ensure_dir(directory, 0o700)
             os.chmod(directory, 0o700)
     
+    def _ensure_dir(self, directory: str, mode: int = 0o777):
+        """Создание директории, если она ещё не проверялась"""
+        if directory in self._ensured_dirs:
+            return
+        
+        os.makedirs(directory, mode=mode, exist_ok=True)
+        self._ensured_dirs.add(directory)
+    
+    def _write_into_dir(self, directory: str, operation, *args):
+        """
+        Выполнение операции, создающей файл в директории
+        
+        Если директория была удалена после проверки (например, при атаке),
+        она создаётся заново и операция повторяется
+        """
+        if not directory:
+            return operation(*args)
+        
+        self._ensure_dir(directory)
+        try:
+            return operation(*args)
+        except FileNotFoundError:
+            if os.path.isdir(directory):
+                raise
+            
+            self._ensured_dirs.discard(directory)
+            self._ensure_dir(directory)
+            return operation(*args)
+    
     def create_backup(self, file_path: str) -> Tuple[bool, str]:
         """
         Создание резервной копии файла
@@ -91,13 +191,13 @@ class RecoveryEngine:
             # Создание поддиректорий в backup_dir если нужно
             backup_subdir = os.path.dirname(backup_path)
             if backup_subdir:
-                Path(backup_subdir).mkdir(parents=True, exist_ok=True, mode=0o700)
+                self._ensure_dir(backup_subdir, 0o700)
             
-            # Копирование файла
-            shutil.copy2(file_path, backup_path)
+            # Копирование файла (в ядре), копия сразу создаётся с правами 0600
+            dir_mtime = self._backup_dir_mtime()
+            self._fast_copy_with_mode(file_path, backup_path, 0o600)
             
-            # Установка прав доступа
-            os.chmod(backup_path, 0o600)
+            self._index_backup(file_path, backup_path, dir_mtime)
             
             return True, backup_path
         
@@ -117,13 +217,18 @@ class RecoveryEngine:
             имя резервной копии
         """
         # Замена слэшей на подчёркивания
-        safe_path = file_path.replace('/', '_').replace(os.sep, '_')
+        safe_path = self._safe_name(file_path)
         
         # Добавление временной метки
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         return f"{safe_path}_{timestamp}.backup"
     
+    @staticmethod
+    def _safe_name(file_path: str) -> str:
+        """Имя файла без разделителей пути (основа имени резервной копии)"""
+        return file_path.translate(_PATH_SAFE_TABLE)
+    
     def restore_from_backup(self, file_path: str, backup_path: str) -> RecoveryResult:
         """
         Полное восстановление файла из резервной копии
@@ -138,47 +243,141 @@ class RecoveryEngine:
         if not os.path.exists(backup_path):
             return RecoveryResult(
                 success=False,
-                method=RecoveryMethod.BACKUP_FULL,
+                method=_BACKUP_FULL,
                 message=f"Резервная копия не найдена: {backup_path}"
             )
         
         try:
-            # Создание директории для файла если нужно
-            file_dir = os.path.dirname(file_path)
-            if file_dir:
-                Path(file_dir).mkdir(parents=True, exist_ok=True)
-            
-            # Временная блокировка файла (попытка)
-            self._lock_file(file_path)
-            
-            # Копирование резервной копии
-            shutil.copy2(backup_path, file_path)
-            
-            # Восстановление прав доступа (базовые)
-            os.chmod(file_path, 0o644)
-            
-            # Разблокировка файла
-            self._unlock_file(file_path)
+            # Файл перезаписывается целиком, поэтому временная блокировка
+            # не нужна (директория создаётся при необходимости)
+            self._write_into_dir(os.path.dirname(file_path), self._restore_contents,
+                                 backup_path, file_path)
             
             return RecoveryResult(
                 success=True,
-                method=RecoveryMethod.BACKUP_FULL,
+                method=_BACKUP_FULL,
                 message=f"Файл успешно восстановлен из резервной копии"
             )
         
         except PermissionError:
             return RecoveryResult(
                 success=False,
-                method=RecoveryMethod.BACKUP_FULL,
+                method=_BACKUP_FULL,
                 message=f"Нет прав доступа для восстановления {file_path}"
             )
         except Exception as e:
             return RecoveryResult(
                 success=False,
-                method=RecoveryMethod.BACKUP_FULL,
+                method=_BACKUP_FULL,
                 message=f"Ошибка восстановления: {e}"
             )
     
+    def _restore_contents(self, backup_path: str, file_path: str):
+        """Одно открытие, копирование в ядре, метаданные по fd"""
+        with open(backup_path, 'rb') as src, open(file_path, 'wb') as dst:
+            self._copy_between(src, dst)
+            
+            # Восстановление прав доступа (базовые) и времени изменения
+            backup_stat = os.fstat(src.fileno())
+            os.fchmod(dst.fileno(), 0o644)
+            os.utime(dst.fileno(), ns=(backup_stat.st_atime_ns, backup_stat.st_mtime_ns))
+            
+            if backup_stat.st_size >= self.DROP_CACHE_THRESHOLD:
+                dst.flush()
+                self._drop_page_cache(src.fileno(), dst.fileno())
+    
+    def _fast_copy(self, src_path: str, dst_path: str) -> str:
+        """
+        Копирование файла с метаданными (замена shutil.copy2)
+        
+        Сигнатура совместима с copy_function для shutil.move
+        """
+        self._copy_file_contents(src_path, dst_path)
+        shutil.copystat(src_path, dst_path)
+        return dst_path
+    
+    def _fast_copy_with_mode(self, src_path: str, dst_path: str, mode: int):
+        """
+        Копирование файла с заданными правами и временем изменения оригинала
+        
+        Права задаются при создании и одним fchmod (для уже существующей копии),
+        без отдельных stat/chmod по пути
+        """
+        dst_fd = os.open(dst_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, mode)
+        with open(src_path, 'rb') as src, open(dst_fd, 'wb') as dst:
+            self._copy_between(src, dst)
+            
+            src_stat = os.fstat(src.fileno())
+            os.fchmod(dst_fd, mode)
+            os.utime(dst_fd, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    
+    def _copy_file_contents(self, src_path: str, dst_path: str):
+        """
+        Копирование содержимого файла средствами ядра
+        
+        Порядок: клонирование FICLONE (мгновенно на Btrfs/XFS),
+        copy_file_range, sendfile, копирование через буфер
+        """
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            self._copy_between(src, dst)
+    
+    def _copy_between(self, src, dst):
+        """Копирование между открытыми файлами (src - в начале, dst - пустой)"""
+        src_fd = src.fileno()
+        dst_fd = dst.fileno()
+        
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return
+        except OSError:
+            pass
+        
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while os.copy_file_range(src_fd, dst_fd, self.COPY_CHUNK_SIZE):
+                    pass
+                return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+                self._rewind(src_fd, dst_fd)
+        
+        try:
+            while os.sendfile(dst_fd, src_fd, None, self.COPY_CHUNK_SIZE):
+                pass
+            return
+        except OSError as e:
+            if e.errno not in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+            self._rewind(src_fd, dst_fd)
+        
+        shutil.copyfileobj(src, dst, self.COPY_CHUNK_SIZE)
+    
+    @staticmethod
+    def _drop_page_cache(*fds: int):
+        """
+        Освобождение page cache файлов после восстановления
+        
+        Для записанного файла ядро сначала запускает запись грязных
+        страниц, затем вытесняет их
+        """
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        
+        for fd in fds:
+            try:
+                os.fdatasync(fd)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _rewind(src_fd: int, dst_fd: int):
+        """Возврат к началу копирования после неудачного системного вызова"""
+        os.lseek(src_fd, 0, os.SEEK_SET)
+        os.lseek(dst_fd, 0, os.SEEK_SET)
+        os.ftruncate(dst_fd, 0)
+    
     def restore_blocks(self, file_path: str, backup_path: str, 
                       block_indices: List[int]) -> RecoveryResult:
         """
@@ -195,7 +394,7 @@ class RecoveryEngine:
         if not os.path.exists(backup_path):
             return RecoveryResult(
                 success=False,
-                method=RecoveryMethod.BACKUP_BLOCKS,
+                method=_BACKUP_BLOCKS,
                 message=f"Резервная копия не найдена: {backup_path}"
             )
         
@@ -215,33 +414,48 @@ class RecoveryEngine:
             with open(backup_path, 'rb') as backup_file, \
                  open(file_path, 'r+b') as target_file:
                 
-                for block_index in sorted(block_indices):
-                    # Позиция блока
-                    block_offset = block_index * self.block_size
+                backup_fd = backup_file.fileno()
+                target_fd = target_file.fileno()
+                
+                # Диапазоны читаются по возрастанию смещения
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(backup_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                
+                # Соседние блоки объединяются в один pread/pwrite
+                max_run = max(self.RESTORE_IO_CHUNK_SIZE // self.block_size, 1)
+                
+                # Один буфер на все диапазоны (без выделения bytes на каждое чтение)
+                buffer = memoryview(bytearray(max_run * self.block_size))
+                for start_block, count in self._coalesce_blocks(block_indices, max_run):
+                    # Позиция первого блока
+                    run_offset = start_block * self.block_size
                     
-                    # Чтение блока из резервной копии
-                    backup_file.seek(block_offset)
-                    block_data = backup_file.read(self.block_size)
+                    # Чтение диапазона из резервной копии в буфер
+                    run_size = os.preadv(backup_fd, [buffer[:count * self.block_size]], run_offset)
                     
-                    if not block_data:
-                        # Блок за пределами файла
+                    if not run_size:
+                        # Диапазон за пределами файла
                         continue
                     
-                    # Запись блока в целевой файл
-                    target_file.seek(block_offset)
-                    target_file.write(block_data)
-                    
-                    restored_count += 1
+                    # Запись диапазона в целевой файл
+                    written = 0
+                    while written < run_size:
+                        written += os.pwrite(target_fd, buffer[written:run_size], run_offset + written)
                     
+                    restored_count += -(-run_size // self.block_size)
+                
                 # Удаляем лишние данные, если файл увеличился после изменений
-                target_file.truncate(backup_size)
+                os.ftruncate(target_fd, backup_size)
+                
+                if backup_size >= self.DROP_CACHE_THRESHOLD:
+                    self._drop_page_cache(backup_fd, target_fd)
             
             # Разблокировка
             self._unlock_file(file_path)
             
             return RecoveryResult(
                 success=True,
-                method=RecoveryMethod.BACKUP_BLOCKS,
+                method=_BACKUP_BLOCKS,
                 message=f"Восстановлено блоков: {restored_count}/{len(block_indices)}",
                 restored_blocks=restored_count
             )
@@ -249,10 +463,31 @@ class RecoveryEngine:
         except Exception as e:
             return RecoveryResult(
                 success=False,
-                method=RecoveryMethod.BACKUP_BLOCKS,
+                method=_BACKUP_BLOCKS,
                 message=f"Ошибка поблочного восстановления: {e}"
             )
     
+    @staticmethod
+    def _coalesce_blocks(block_indices: List[int], max_run: int) -> List[Tuple[int, int]]:
+        """
+        Объединение индексов блоков в непрерывные диапазоны
+        
+        Args:
+            block_indices: индексы блоков (в любом порядке, возможны повторы)
+            max_run: максимальное число блоков в одном диапазоне
+            
+        Returns:
+            список (первый блок, количество блоков)
+        """
+        runs = []
+        for block_index in sorted(set(block_indices)):
+            if runs and runs[-1][0] + runs[-1][1] == block_index and runs[-1][1] < max_run:
+                runs[-1][1] += 1
+            else:
+                runs.append([block_index, 1])
+        
+        return [(start, count) for start, count in runs]
+    
     def block_file(self, file_path: str, permanent: bool = False) -> Tuple[bool, str]:
         """
         Блокировка файла от изменений
@@ -275,15 +510,10 @@ class RecoveryEngine:
             # Метод 2: chattr +i (immutable) - только если постоянная блокировка
             if permanent:
                 try:
-                    subprocess.run(
-                        ['chattr', '+i', file_path],
-                        check=True,
-                        capture_output=True,
-                        timeout=5
-                    )
+                    self._set_immutable(file_path, True)
                     return True, f"Файл заблокирован (постоянно)"
-                except (subprocess.CalledProcessError, FileNotFoundError):
-                    # chattr может быть недоступен
+                except OSError:
+                    # Файловая система может не поддерживать флаг
                     return True, f"Файл заблокирован (chmod)"
             
             return True, f"Файл заблокирован (временно)"
@@ -309,14 +539,9 @@ class RecoveryEngine:
         try:
             # Снятие immutable флага
             try:
-                subprocess.run(
-                    ['chattr', '-i', file_path],
-                    check=True,
-                    capture_output=True,
-                    timeout=5
-                )
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                # chattr может быть недоступен
+                self._set_immutable(file_path, False)
+            except OSError:
+                # Файловая система может не поддерживать флаг
                 pass
             
             # Восстановление прав на запись
@@ -328,6 +553,27 @@ class RecoveryEngine:
         except Exception as e:
             return False, f"Ошибка разблокировки: {e}"
     
+    def _set_immutable(self, file_path: str, enabled: bool):
+        """
+        Установка/снятие флага immutable через ioctl (без запуска chattr)
+        
+        Raises:
+            OSError: если файловая система не поддерживает флаги inode
+        """
+        fd = os.open(file_path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        try:
+            self._set_immutable_fd(fd, enabled)
+        finally:
+            os.close(fd)
+    
+    @staticmethod
+    def _set_immutable_fd(fd: int, enabled: bool):
+        """Установка/снятие флага immutable для открытого файла"""
+        flags = struct.unpack('i', fcntl.ioctl(fd, FS_IOC_GETFLAGS, struct.pack('i', 0)))[0]
+        new_flags = flags | FS_IMMUTABLE_FL if enabled else flags & ~FS_IMMUTABLE_FL
+        if new_flags != flags:
+            fcntl.ioctl(fd, FS_IOC_SETFLAGS, struct.pack('i', new_flags))
+    
     def _lock_file(self, file_path: str):
         """Временная блокировка файла на время операции"""
         try:
@@ -358,33 +604,39 @@ class RecoveryEngine:
         """
         processes = []
         
+        # Обход /proc/<pid>/fd в процессе службы (то же делает lsof, но без
+        # запуска отдельной программы)
+        target_path = os.path.realpath(file_path)
+        
         try:
-            # Использование lsof для поиска процессов
-            result = subprocess.run(
-                ['lsof', '-t', file_path],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            pids = [int(name) for name in os.listdir('/proc') if name.isdigit()]
+        except OSError:
+            return processes
+        
+        for pid in pids:
+            fd_dir = f'/proc/{pid}/fd'
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                # Процесс завершился или нет прав
+                continue
             
-            if result.returncode == 0 and result.stdout.strip():
-                pids = result.stdout.strip().split('\n')
-                
-                for pid in pids:
-                    try:
-                        pid = int(pid.strip())
-                        
-                        # Получение имени процесса
-                        with open(f'/proc/{pid}/comm', 'r') as f:
-                            process_name = f.read().strip()
-                        
-                        processes.append((pid, process_name))
-                    except:
+            for fd in fds:
+                try:
+                    if os.readlink(f'{fd_dir}/{fd}') != target_path:
                         continue
-        
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            # lsof может быть недоступен
-            pass
+                except OSError:
+                    continue
+                
+                try:
+                    # Получение имени процесса
+                    with open(f'/proc/{pid}/comm', 'r') as f:
+                        process_name = f.read().strip()
+                    
+                    processes.append((pid, process_name))
+                except OSError:
+                    pass
+                break
         
         return processes
     
@@ -411,18 +663,15 @@ class RecoveryEngine:
             except:
                 process_name = "unknown"
             
-            # Завершение процесса
-            signal = 'SIGKILL' if force else 'SIGTERM'
+            # Завершение процесса (сигнал напрямую, без запуска kill)
+            sig = signal.SIGKILL if force else signal.SIGTERM
+            os.kill(pid, sig)
             
-            subprocess.run(
-                ['kill', '-9' if force else '-15', str(pid)],
-                check=True,
-                timeout=5
-            )
-            
-            return True, f"Процесс {pid} ({process_name}) завершён ({signal})"
+            return True, f"Процесс {pid} ({process_name}) завершён ({sig.name})"
         
-        except subprocess.CalledProcessError:
+        except ProcessLookupError:
+            return False, f"Процесс {pid} не существует"
+        except PermissionError:
             return False, f"Не удалось завершить процесс {pid}"
         except Exception as e:
             return False, f"Ошибка завершения процесса: {e}"
@@ -445,8 +694,8 @@ class RecoveryEngine:
             quarantine_name = self._generate_backup_name(file_path)
             quarantine_path = os.path.join(self.quarantine_dir, quarantine_name)
             
-            # Перемещение в карантин
-            shutil.move(file_path, quarantine_path)
+            # Перемещение в карантин (между файловыми системами - копированием в ядре)
+            shutil.move(file_path, quarantine_path, copy_function=self._fast_copy)
             
             # Блокировка файла в карантине
             os.chmod(quarantine_path, 0o000)
@@ -474,41 +723,124 @@ class RecoveryEngine:
             # Восстановление прав
             os.chmod(quarantine_path, 0o644)
             
-            # Создание директории если нужно
-            file_dir = os.path.dirname(original_path)
-            if file_dir:
-                Path(file_dir).mkdir(parents=True, exist_ok=True)
-            
-            # Перемещение обратно
-            shutil.move(quarantine_path, original_path)
+            # Перемещение обратно (директория создаётся при необходимости)
+            self._write_into_dir(os.path.dirname(original_path), shutil.move,
+                                 quarantine_path, original_path, self._fast_copy)
             
             return True, f"Файл восстановлен из карантина"
         
         except Exception as e:
             return False, f"Ошибка восстановления из карантина: {e}"
     
-    def emergency_block_all(self, file_paths: List[str]) -> Tuple[int, int]:
+    def emergency_block_all(self, file_paths: Iterable[str],
+                            max_workers: Optional[int] = None) -> Tuple[int, int]:
         """
         Аварийная блокировка множества файлов (при обнаружении ransomware)
         
         Args:
-            file_paths: список путей к файлам
+            file_paths: пути к файлам (список или генератор - читается по мере обработки)
+            max_workers: число потоков (если None - заранее созданный пул
+                         из EMERGENCY_BLOCK_WORKERS потоков)
             
         Returns:
             (количество заблокированных, количество ошибок)
         """
+        if max_workers is None or max_workers == self.EMERGENCY_BLOCK_WORKERS:
+            return self._block_all(self._block_executor, file_paths, self.EMERGENCY_BLOCK_WORKERS)
+        
+        with ThreadPoolExecutor(max_workers=max_workers,
+                                thread_name_prefix="EmergencyBlock") as executor:
+            return self._block_all(executor, file_paths, max_workers)
+    
+    def _block_all(self, executor: ThreadPoolExecutor, file_paths: Iterable[str],
+                   workers: int) -> Tuple[int, int]:
+        """Постоянная блокировка файлов пулом потоков (пачками по директориям)"""
         blocked = 0
         errors = 0
         
-        for file_path in file_paths:
-            success, _ = self.block_file(file_path, permanent=True)
-            if success:
-                blocked += 1
-            else:
-                errors += 1
+        # Число поставленных в очередь задач ограничено, чтобы не держать
+        # весь список в памяти
+        window = workers * 4
+        pending = deque()
+        
+        for directory, names in self._group_by_directory(file_paths):
+            pending.append(executor.submit(self._block_directory_batch, directory, names))
+            if len(pending) < window:
+                continue
+            
+            batch_blocked, batch_errors = pending.popleft().result()
+            blocked += batch_blocked
+            errors += batch_errors
+        
+        while pending:
+            batch_blocked, batch_errors = pending.popleft().result()
+            blocked += batch_blocked
+            errors += batch_errors
         
         return blocked, errors
     
+    def _group_by_directory(self, file_paths: Iterable[str]):
+        """
+        Группировка подряд идущих путей по родительской директории
+        
+        Группировка не требует списка всех путей. Пути из хранилища
+        отсортированы, но лексикографический порядок не держит файлы одной
+        директории вместе (/a/b/x, /a/b/y/z, /a/b/z) - директория может
+        встретиться в нескольких группах; это лишь добавляет пачки
+        
+        Yields:
+            (директория, имена файлов - не более EMERGENCY_BLOCK_BATCH)
+        """
+        for directory, paths in itertools.groupby(file_paths, key=os.path.dirname):
+            names = [os.path.basename(path) for path in paths]
+            for start in range(0, len(names), self.EMERGENCY_BLOCK_BATCH):
+                yield directory, names[start:start + self.EMERGENCY_BLOCK_BATCH]
+    
+    def _block_directory_batch(self, directory: str, names: List[str]) -> Tuple[int, int]:
+        """
+        Постоянная блокировка файлов одной директории
+        
+        Директория открывается один раз, файлы - относительно её дескриптора
+        (без разбора полного пути для каждого файла). Права и флаг
+        immutable меняются через дескриптор файла
+        
+        Returns:
+            (количество заблокированных, количество ошибок)
+        """
+        try:
+            dir_fd = os.open(directory or '.', os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+        except OSError:
+            return 0, len(names)
+        
+        blocked = 0
+        try:
+            for name in names:
+                try:
+                    fd = os.open(name, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC, dir_fd=dir_fd)
+                except OSError:
+                    continue
+                
+                try:
+                    # Снятие прав на запись
+                    current_mode = os.fstat(fd).st_mode
+                    os.fchmod(fd, current_mode & ~stat.S_IWUSR & ~stat.S_IWGRP & ~stat.S_IWOTH)
+                    
+                    # Флаг immutable (файловая система может его не поддерживать)
+                    try:
+                        self._set_immutable_fd(fd, True)
+                    except OSError:
+                        pass
+                    
+                    blocked += 1
+                except OSError:
+                    pass
+                finally:
+                    os.close(fd)
+        finally:
+            os.close(dir_fd)
+        
+        return blocked, len(names) - blocked
+    
     def get_backup_info(self, file_path: str) -> Optional[dict]:
         """
         Получение информации о резервной копии файла
@@ -520,22 +852,144 @@ class RecoveryEngine:
             информация о последней резервной копии или None
         """
         # Поиск всех резервных копий этого файла
-        safe_path = file_path.replace('/', '_').replace(os.sep, '_')
-        
-        backups = []
-        for backup_file in os.listdir(self.backup_dir):
-            if backup_file.startswith(safe_path):
-                backup_path = os.path.join(self.backup_dir, backup_file)
-                stat_info = os.stat(backup_path)
-                backups.append({
-                    'path': backup_path,
-                    'size': stat_info.st_size,
-                    'created': datetime.fromtimestamp(stat_info.st_ctime).isoformat(),
-                    'modified': datetime.fromtimestamp(stat_info.st_mtime).isoformat()
-                })
+        backups = self._get_backup_index().get(self._safe_name(file_path))
         
         if not backups:
             return None
         
-        # Возврат последней резервной копии
-        return max(backups, key=lambda x: x['created'])
\ No newline at end of file
+        # Возврат последней резервной копии (копия записи индекса)
+        return dict(max(backups, key=lambda x: x['created']))
+    
+    def _get_backup_index(self) -> Dict[str, List[dict]]:
+        """Индекс резервных копий (пересканирование при изменении директории)"""
+        dir_mtime = os.stat(self.backup_dir).st_mtime_ns
+        
+        with self._backup_index_lock:
+            if self._backup_index is None or dir_mtime != self._backup_index_dir_mtime:
+                self._backup_index = self._scan_backups()
+                self._backup_index_dir_mtime = dir_mtime
+            
+            return self._backup_index
+    
+    def _scan_backups(self) -> Dict[str, List[dict]]:
+        """Построение индекса резервных копий по содержимому директории"""
+        index = {}
+        for safe_path, backup_path, stat_info in self._scan_backup_dir(self.backup_dir):
+            index.setdefault(safe_path, []).append(self._backup_entry(backup_path, stat_info))
+        
+        return index
+    
+    def _scan_backup_dir(self, directory: str):
+        """
+        Обход директории с файлами, именованными _generate_backup_name
+        
+        Yields:
+            (имя оригинального файла, путь к копии, stat копии)
+        """
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                # Отбор по имени до любого stat
+                if len(entry.name) <= self.BACKUP_NAME_SUFFIX_LENGTH or not entry.name.endswith('.backup'):
+                    continue
+                
+                try:
+                    stat_info = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                
+                yield entry.name[:-self.BACKUP_NAME_SUFFIX_LENGTH], entry.path, stat_info
+    
+    def cleanup_expired_backups(self, referenced: Set[str]) -> Tuple[int, int]:
+        """
+        Удаление устаревших резервных копий и файлов карантина
+        
+        Копии, на которые ссылается хранилище хэшей, не удаляются никогда.
+        Ограничения применяются только к остальным: для каждого имени
+        хранится не более max_backups_per_file копий, копии старше
+        backup_max_age удаляются. Имя копии не однозначно (разделители пути
+        заменены), поэтому в группу могут попасть копии разных файлов -
+        самая новая копия группы тоже сохраняется
+        
+        Args:
+            referenced: пути резервных копий из хранилища хэшей
+        
+        Returns:
+            (удалено резервных копий, удалено файлов карантина)
+        """
+        now = time.time()
+        referenced_names = {os.path.basename(backup_path) for backup_path in referenced}
+        
+        backups = {}
+        for safe_path, backup_path, stat_info in self._scan_backup_dir(self.backup_dir):
+            backups.setdefault(safe_path, []).append((stat_info.st_ctime, backup_path))
+        
+        removed_backups = 0
+        for file_backups in backups.values():
+            file_backups.sort(reverse=True)
+            for position, (created, backup_path) in enumerate(file_backups[1:], start=1):
+                if os.path.basename(backup_path) in referenced_names:
+                    continue
+                
+                expired = self.backup_max_age and now - created > self.backup_max_age
+                if expired or position >= self.max_backups_per_file:
+                    removed_backups += self._remove_file(backup_path)
+        
+        # Индекс пересобирается при следующем обращении
+        with self._backup_index_lock:
+            self._backup_index = None
+        
+        removed_quarantine = 0
+        if self.quarantine_max_age:
+            for _, quarantine_path, stat_info in self._scan_backup_dir(self.quarantine_dir):
+                if now - stat_info.st_ctime > self.quarantine_max_age:
+                    removed_quarantine += self._remove_file(quarantine_path)
+        
+        return removed_backups, removed_quarantine
+    
+    @staticmethod
+    def _remove_file(file_path: str) -> int:
+        """Удаление файла (возвращает 1 при успехе, 0 при ошибке)"""
+        try:
+            os.unlink(file_path)
+            return 1
+        except OSError:
+            return 0
+    
+    def _backup_dir_mtime(self) -> Optional[int]:
+        """mtime директории резервных копий (None, если её нет)"""
+        try:
+            return os.stat(self.backup_dir).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _index_backup(self, file_path: str, backup_path: str, prev_dir_mtime: Optional[int]):
+        """
+        Добавление созданной резервной копии в индекс без пересканирования
+        
+        Индекс обновляется, только если до копирования mtime директории
+        совпадал с индексированным: иначе директорию изменил кто-то ещё
+        (другая копия, очистка, внешнее удаление), и индекс сбрасывается
+        """
+        with self._backup_index_lock:
+            if self._backup_index is None:
+                return
+            
+            if prev_dir_mtime is None or prev_dir_mtime != self._backup_index_dir_mtime:
+                self._backup_index = None
+                return
+            
+            backups = self._backup_index.setdefault(self._safe_name(file_path), [])
+            backups[:] = [backup for backup in backups if backup['path'] != backup_path]
+            backups.append(self._backup_entry(backup_path, os.stat(backup_path)))
+            
+            self._backup_index_dir_mtime = self._backup_dir_mtime()
+    
+    @staticmethod
+    def _backup_entry(backup_path: str, stat_info: os.stat_result) -> dict:
+        """Информация о резервной копии"""
+        return {
+            'path': backup_path,
+            'size': stat_info.st_size,
+            'created': datetime.fromtimestamp(stat_info.st_ctime).isoformat(),
+            'modified': datetime.fromtimestamp(stat_info.st_mtime).isoformat()
+        }
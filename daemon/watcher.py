@@ -2,20 +2,94 @@
 
 import os
 import time
+import struct
+import ctypes
+import ctypes.util
 import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, Set, List, Optional, Dict
-from queue import Queue, Empty
+from typing import Callable, Set, List, Optional, Dict, Tuple
 from enum import Enum
 import select
+import hashlib
+import errno
+from array import array
+from itertools import islice
 
 try:
-    import inotify.adapters
-    import inotify.constants
-    INOTIFY_AVAILABLE = True
+    import xxhash
+    XXHASH_AVAILABLE = True
 except ImportError:
+    XXHASH_AVAILABLE = False
+    print("WARNING: xxhash не установлен, для сравнения содержимого используется blake2b")
+
+try:
+    import liburing
+    LIBURING_AVAILABLE = True
+except ImportError:
+    LIBURING_AVAILABLE = False
+    print("WARNING: liburing не установлен, fallback проверка выполняет stat для каждого файла")
+
+try:
+    # inotify вызывается напрямую из libc (без обёрток над каждым событием)
+    _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    _libc.inotify_init1.argtypes = [ctypes.c_int]
+    _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    _libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    INOTIFY_AVAILABLE = True
+except (OSError, AttributeError):
     INOTIFY_AVAILABLE = False
-    print("WARNING: inotify не установлен, используется только fallback режим")
+    print("WARNING: inotify недоступен, используется только fallback режим")
+
+try:
+    # fanotify с FAN_REPORT_DFID_NAME (Linux >= 5.9, требуется CAP_SYS_ADMIN)
+    _libc.fanotify_init.argtypes = [ctypes.c_uint, ctypes.c_uint]
+    _libc.fanotify_mark.argtypes = [ctypes.c_int, ctypes.c_uint, ctypes.c_uint64, ctypes.c_int, ctypes.c_char_p]
+    _libc.open_by_handle_at.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+    FANOTIFY_AVAILABLE = True
+except (NameError, AttributeError):
+    FANOTIFY_AVAILABLE = False
+
+# Флаги событий inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+# Флаги fanotify (linux/fanotify.h); биты событий совпадают с IN_*,
+# FAN_ONDIR совпадает с IN_ISDIR
+FAN_CLOEXEC = 0x00000001
+FAN_NONBLOCK = 0x00000002
+FAN_CLASS_NOTIF = 0x00000000
+FAN_REPORT_DFID_NAME = 0x00000c00
+FAN_MARK_ADD = 0x00000001
+FAN_MARK_FILESYSTEM = 0x00000100
+FAN_Q_OVERFLOW = 0x00004000
+FAN_ONDIR = 0x40000000
+FAN_EVENT_INFO_TYPE_DFID_NAME = 2
+AT_FDCWD = -100
+
+# Маски событий: только то, что влияет на содержимое защищаемых файлов
+# (без IN_ACCESS/IN_OPEN). IN_MODIFY нужен для truncate() без открытия файла
+# на запись - после него IN_CLOSE_WRITE не приходит; повторы IN_MODIFY на
+# каждый write() сворачиваются дедупликацией в одно событие на окно.
+# IN_CREATE используется только для директорий: на новую директорию
+# добавляется наблюдение
+FILE_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_DELETE_SELF | IN_MOVE_SELF
+DIR_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+
+# Маска метки fanotify: события директорий inotify без IN_MODIFY (метка
+# охватывает всю ФС - событие на каждый write() любого процесса; truncate
+# находит сверка) и без IN_CREATE (новые директории покрыты меткой), плюс
+# события самих директорий (для сброса кэша путей при их переименовании)
+FANOTIFY_MASK = IN_CLOSE_WRITE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | FAN_ONDIR
 
 class WatchEventType(Enum):
     """Типы событий мониторинга"""
@@ -28,14 +102,490 @@ class WatchEventType(Enum):
 
 class WatchEvent:
     """Событие изменения файла"""
-    def __init__(self, event_type: WatchEventType, file_path: str, timestamp: float = None):
+    def __init__(self, event_type: WatchEventType, file_path: str, timestamp: float = None,
+                 is_dir: bool = False, src_path: Optional[str] = None):
         self.event_type = event_type
         self.file_path = file_path
         self.timestamp = timestamp or time.time()
+        self.is_dir = is_dir  # событие относится к директории (флаг IN_ISDIR)
+        self.src_path = src_path  # исходный путь для MOVE (если известен)
     
     def __repr__(self):
         return f"WatchEvent({self.event_type.value}, {self.file_path})"
 
+# Таблица определения типа события по маске inotify (в порядке приоритета)
+_MASK_TO_TYPE = (
+    (IN_MODIFY | IN_CLOSE_WRITE, WatchEventType.MODIFY),
+    (IN_DELETE | IN_DELETE_SELF, WatchEventType.DELETE),
+    (IN_MOVED_FROM | IN_MOVED_TO | IN_MOVE_SELF, WatchEventType.MOVE),
+    (IN_CREATE, WatchEventType.CREATE),
+)
+
+class _RawInotify:
+    """
+    Экземпляр inotify поверх системных вызовов libc
+    
+    События читаются из дескриптора пачками и разбираются из структуры
+    inotify_event (заголовок wd, mask, cookie, len + имя)
+    """
+    
+    # Заголовок struct inotify_event
+    EVENT_HEADER = struct.Struct('iIII')
+    
+    # Размер буфера чтения событий
+    READ_SIZE = 64 * 1024
+    
+    def __init__(self):
+        self.fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_init1: {os.strerror(error)}")
+        
+        self._wd_to_path: Dict[int, str] = {}
+        self._path_to_wd: Dict[str, int] = {}
+        
+        # Префикс пути файлов в наблюдаемой директории ("путь/"): полный путь
+        # собирается одной конкатенацией, без os.path.join на каждое событие
+        self._wd_to_prefix: Dict[int, str] = {}
+        
+        # Наблюдения добавляются из потоков IPC, события читает поток inotify
+        self._lock = threading.Lock()
+    
+    def add_watch(self, path: str, mask: int):
+        """Добавление пути в наблюдение"""
+        self.add_watches([path], mask)
+    
+    def add_watches(self, paths: List[str], mask: int) -> List[str]:
+        """
+        Добавление набора путей в наблюдение под одной блокировкой
+        
+        Returns:
+            пути, которые удалось добавить
+        
+        Raises:
+            OSError: если не удалось добавить ни одного пути
+        """
+        added = []
+        last_error = None
+        with self._lock:
+            for path in paths:
+                wd = _libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+                if wd < 0:
+                    error = ctypes.get_errno()
+                    last_error = OSError(error, f"inotify_add_watch {path}: {os.strerror(error)}")
+                    continue
+                
+                self._wd_to_path[wd] = path
+                self._wd_to_prefix[wd] = path if path.endswith(os.sep) else path + os.sep
+                self._path_to_wd[path] = wd
+                added.append(path)
+        
+        if paths and not added:
+            raise last_error
+        
+        return added
+    
+    def remove_watch(self, path: str):
+        """Удаление пути из наблюдения"""
+        self.remove_watches([path])
+    
+    def remove_watches(self, paths: List[str]):
+        """Удаление набора путей из наблюдения под одной блокировкой"""
+        with self._lock:
+            for path in paths:
+                wd = self._path_to_wd.pop(path, None)
+                if wd is None:
+                    continue
+                
+                self._wd_to_path.pop(wd, None)
+                self._wd_to_prefix.pop(wd, None)
+                _libc.inotify_rm_watch(self.fd, wd)
+    
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        """
+        Чтение всех доступных событий (до EAGAIN)
+        
+        Returns:
+            список (маска, cookie, полный путь файла)
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, self.READ_SIZE)
+            except BlockingIOError:
+                return events
+            
+            with self._lock:
+                events.extend(self._parse_events(data))
+    
+    def _parse_events(self, data: bytes) -> List[Tuple[int, int, str]]:
+        """Разбор буфера struct inotify_event (вызывается под блокировкой)"""
+        events = []
+        header_size = self.EVENT_HEADER.size
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, name_length = self.EVENT_HEADER.unpack_from(data, offset)
+            name_start = offset + header_size
+            offset = name_start + name_length
+            
+            if mask & IN_IGNORED:
+                # Наблюдение снято ядром (путь удалён)
+                path = self._wd_to_path.pop(wd, None)
+                self._wd_to_prefix.pop(wd, None)
+                if path is not None and self._path_to_wd.get(path) == wd:
+                    del self._path_to_wd[path]
+                continue
+            
+            # Из событий директорий передаётся только появление новой
+            # (для неё добавляется наблюдение), IN_CREATE файлов не
+            # передаётся; тип берётся из флага IN_ISDIR, без stat() и до
+            # декодирования имени
+            if mask & IN_ISDIR:
+                if not mask & (IN_CREATE | IN_MOVED_TO):
+                    continue
+            elif mask & IN_CREATE:
+                continue
+            
+            # Имя декодируется один раз и присоединяется к готовому префиксу
+            name = data[name_start:offset].rstrip(b'\0')
+            if name:
+                prefix = self._wd_to_prefix.get(wd)
+                if prefix is None:
+                    continue
+                events.append((mask, cookie, prefix + os.fsdecode(name)))
+            else:
+                watch_path = self._wd_to_path.get(wd)
+                if watch_path is None:
+                    continue
+                events.append((mask, cookie, watch_path))
+        
+        return events
+    
+    def close(self):
+        """Закрытие дескриптора (все наблюдения снимаются ядром)"""
+        os.close(self.fd)
+        self._wd_to_path.clear()
+        self._path_to_wd.clear()
+
+class _RawFanotify:
+    """
+    Экземпляр fanotify с меткой на всю файловую систему
+    
+    Одна метка FAN_MARK_FILESYSTEM покрывает все директории защищаемого
+    пути - без обхода дерева и наблюдения на каждую поддиректорию.
+    События содержат handle родительской директории и имя файла; путь
+    директории восстанавливается через open_by_handle_at и кэшируется.
+    События вне защищаемых путей отбрасываются при разборе
+    """
+    
+    # Заголовок struct fanotify_event_metadata
+    EVENT_METADATA = struct.Struct('=IBBHQii')
+    
+    # Заголовок struct fanotify_event_info_header
+    INFO_HEADER = struct.Struct('=BBH')
+    
+    # Поле handle_bytes struct file_handle
+    HANDLE_BYTES = struct.Struct('=I')
+    
+    # Размер буфера чтения событий
+    READ_SIZE = 64 * 1024
+    
+    # Максимальное число запоминаемых путей директорий (LRU)
+    DIR_CACHE_SIZE = 4096
+    
+    def __init__(self, exclude_predicate: Optional[Callable[[str], bool]] = None):
+        self.fd = _libc.fanotify_init(FAN_CLASS_NOTIF | FAN_REPORT_DFID_NAME | FAN_CLOEXEC | FAN_NONBLOCK,
+                                      os.O_RDONLY)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"fanotify_init: {os.strerror(error)}")
+        
+        self.exclude_predicate = exclude_predicate
+        
+        # Защищаемые пути {путь: "путь/"}
+        self._roots: Dict[str, str] = {}
+        
+        # Дескриптор директории на каждой помеченной ФС (для open_by_handle_at)
+        self._mount_fds: Dict[bytes, int] = {}  # {fsid: fd}
+        
+        # {fsid + file_handle: "путь директории/" или None, если путь не нужен}
+        self._dir_cache: OrderedDict = OrderedDict()
+        
+        # Пути добавляются из потоков IPC, события читает поток мониторинга
+        self._lock = threading.Lock()
+    
+    def add_root(self, path: str):
+        """Добавление защищаемого пути (ФС помечается один раз)"""
+        fsid = struct.pack('=Q', os.statvfs(path).f_fsid)
+        with self._lock:
+            if fsid not in self._mount_fds:
+                if _libc.fanotify_mark(self.fd, FAN_MARK_ADD | FAN_MARK_FILESYSTEM, FANOTIFY_MASK,
+                                       AT_FDCWD, os.fsencode(path)) < 0:
+                    error = ctypes.get_errno()
+                    raise OSError(error, f"fanotify_mark {path}: {os.strerror(error)}")
+                
+                directory = path if os.path.isdir(path) else os.path.dirname(path)
+                self._mount_fds[fsid] = os.open(directory, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+            
+            self._roots[path] = path.rstrip(os.sep) + os.sep
+            self._dir_cache.clear()
+    
+    def remove_root(self, path: str):
+        """
+        Удаление защищаемого пути
+        
+        Метка ФС остаётся (её могут использовать другие пути), события
+        удалённого пути отбрасываются при разборе
+        """
+        with self._lock:
+            self._roots.pop(path, None)
+            self._dir_cache.clear()
+    
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        """
+        Чтение всех доступных событий (до EAGAIN)
+        
+        Returns:
+            список (маска, cookie, полный путь файла); fanotify не сообщает
+            cookie переименования, он всегда 0
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, self.READ_SIZE)
+            except BlockingIOError:
+                return events
+            
+            with self._lock:
+                events.extend(self._parse_events(data))
+    
+    def _parse_events(self, data: bytes) -> List[Tuple[int, int, str]]:
+        """Разбор буфера struct fanotify_event_metadata (вызывается под блокировкой)"""
+        events = []
+        metadata_size = self.EVENT_METADATA.size
+        offset = 0
+        while offset + metadata_size <= len(data):
+            event_len, _, _, metadata_len, mask, event_fd, _ = self.EVENT_METADATA.unpack_from(data, offset)
+            if event_fd >= 0:
+                os.close(event_fd)
+            
+            if not mask & FAN_Q_OVERFLOW:
+                file_path = self._event_path(data, offset + metadata_len, offset + event_len, mask)
+                if file_path is not None:
+                    events.append((mask, 0, file_path))
+            
+            offset += event_len
+        
+        return events
+    
+    def _event_path(self, data: bytes, start: int, end: int, mask: int) -> Optional[str]:
+        """Путь файла из записи FAN_EVENT_INFO_TYPE_DFID_NAME (None - событие не нужно)"""
+        header_size = self.INFO_HEADER.size
+        while True:
+            if start >= end:
+                return None
+            info_type, _, info_length = self.INFO_HEADER.unpack_from(data, start)
+            if not info_length:
+                return None
+            if info_type == FAN_EVENT_INFO_TYPE_DFID_NAME:
+                break
+            start += info_length
+        
+        # fsid (8 байт), struct file_handle (handle_bytes, handle_type, f_handle), имя
+        handle_start = start + header_size + 8
+        name_start = handle_start + 8 + self.HANDLE_BYTES.unpack_from(data, handle_start)[0]
+        
+        if mask & FAN_ONDIR:
+            # Переименование или удаление директории делает кэш путей устаревшим
+            if mask & (IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE):
+                self._dir_cache.clear()
+            return None
+        
+        prefix = self._directory_prefix(data[start + header_size:name_start])
+        if prefix is None:
+            return None
+        
+        name = data[name_start:start + info_length].split(b'\0', 1)[0]
+        file_path = prefix + os.fsdecode(name)
+        
+        for root, root_prefix in self._roots.items():
+            if file_path == root or file_path.startswith(root_prefix):
+                return file_path
+        
+        return None
+    
+    def _directory_prefix(self, key: bytes) -> Optional[str]:
+        """
+        Путь директории по fsid + file_handle (с кэшированием)
+        
+        Returns:
+            "путь/" или None, если директория удалена, исключена или недоступна
+        """
+        cache = self._dir_cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        
+        prefix = None
+        mount_fd = self._mount_fds.get(key[:8])
+        if mount_fd is not None:
+            fd = _libc.open_by_handle_at(mount_fd, key[8:], os.O_PATH | os.O_CLOEXEC)
+            if fd >= 0:
+                try:
+                    directory = os.readlink(f'/proc/self/fd/{fd}')
+                finally:
+                    os.close(fd)
+                
+                if not directory.endswith(' (deleted)') and not (
+                        self.exclude_predicate is not None and self.exclude_predicate(directory)):
+                    prefix = directory if directory.endswith(os.sep) else directory + os.sep
+        
+        cache[key] = prefix
+        if len(cache) > self.DIR_CACHE_SIZE:
+            cache.popitem(last=False)
+        
+        return prefix
+    
+    def close(self):
+        """Закрытие дескрипторов (метки снимаются ядром)"""
+        os.close(self.fd)
+        for mount_fd in self._mount_fds.values():
+            os.close(mount_fd)
+        self._mount_fds.clear()
+        self._roots.clear()
+        self._dir_cache.clear()
+
+class _FileStateTable:
+    """
+    Состояния файлов (mtime_ns, size) одного защищаемого пути
+    
+    Структура массивов: словарь путь -> ячейка и два массива int64
+    (16 байт на файл вместо кортежа и двух объектов int); ячейки
+    удалённых файлов используются повторно. Таблицу изменяют поток
+    fallback и потоки обхода, поэтому выделение и освобождение ячеек
+    выполняется под блокировкой
+    """
+    
+    __slots__ = ('index', 'mtimes', 'sizes', '_free', '_lock')
+    
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.mtimes = array('q')
+        self.sizes = array('q')
+        self._free: List[int] = []
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def __iter__(self):
+        return iter(self.index)
+    
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self.index
+    
+    def set(self, file_path: str, mtime_ns: int, size: int):
+        """Запись состояния файла"""
+        with self._lock:
+            self._store(file_path, mtime_ns, size)
+    
+    def update(self, file_path: str, mtime_ns: int, size: int) -> Optional[bool]:
+        """
+        Сравнение с запомненным состоянием и запись нового
+        
+        Returns:
+            None для нового файла, True, если состояние изменилось,
+            False, если совпадает с запомненным
+        """
+        with self._lock:
+            slot = self.index.get(file_path)
+            if slot is not None and self.mtimes[slot] == mtime_ns and self.sizes[slot] == size:
+                return False
+            
+            self._store(file_path, mtime_ns, size)
+            return None if slot is None else True
+    
+    def _store(self, file_path: str, mtime_ns: int, size: int):
+        """Запись состояния в ячейку (вызывается под _lock)"""
+        slot = self.index.get(file_path)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self.mtimes)
+                self.mtimes.append(0)
+                self.sizes.append(0)
+            self.index[file_path] = slot
+        
+        self.mtimes[slot] = mtime_ns
+        self.sizes[slot] = size
+    
+    def discard(self, file_path: str) -> bool:
+        """
+        Удаление состояния файла
+        
+        Returns:
+            True, если состояние было записано
+        """
+        with self._lock:
+            slot = self.index.pop(file_path, None)
+            if slot is None:
+                return False
+            self._free.append(slot)
+            return True
+
+class _UringStat:
+    """
+    Пакетный statx через io_uring (IORING_OP_STATX, Linux >= 5.6)
+    
+    Запросы на пачку путей помещаются в очередь отправки и передаются ядру
+    одним io_uring_enter, результаты забираются из очереди завершений
+    """
+    
+    # Глубина очереди (число путей в одной пачке)
+    QUEUE_DEPTH = 1024
+    
+    def __init__(self):
+        self.ring = liburing.io_uring()
+        self.cqe = liburing.io_uring_cqe()
+        liburing.io_uring_queue_init(self.QUEUE_DEPTH, self.ring, 0)
+    
+    def stat_batch(self, paths: List[str]) -> List:
+        """
+        statx для пачки путей (не больше QUEUE_DEPTH)
+        
+        Returns:
+            для каждого пути (mtime_ns, size) или код ошибки errno
+        """
+        buffers = [liburing.statx() for _ in paths]
+        for index, path in enumerate(paths):
+            sqe = liburing.io_uring_get_sqe(self.ring)
+            liburing.io_uring_prep_statx(sqe, buffers[index], os.fsencode(path), 0,
+                                         liburing.STATX_MTIME | liburing.STATX_SIZE)
+            liburing.io_uring_sqe_set_data64(sqe, index)
+        
+        liburing.io_uring_submit_and_wait(self.ring, len(paths))
+        
+        results: List = [errno.EIO] * len(paths)
+        for _ in range(len(paths)):
+            liburing.io_uring_wait_cqe(self.ring, self.cqe)
+            index = liburing.io_uring_cqe_get_data64(self.cqe)
+            res = self.cqe.res
+            liburing.io_uring_cqe_seen(self.ring, self.cqe)
+            
+            if res < 0:
+                results[index] = -res
+            else:
+                buffer = buffers[index]
+                results[index] = (buffer.stx_mtime.tv_sec * 1_000_000_000 + buffer.stx_mtime.tv_nsec,
+                                  buffer.stx_size)
+        
+        return results
+    
+    def close(self):
+        """Освобождение кольца"""
+        liburing.io_uring_queue_exit(self.ring)
+
 class FileWatcher:
     """
     Отслеживание изменений файлов
@@ -49,21 +599,63 @@ class FileWatcher:
     - передачу события в обработчик
     """
     
+    # Время ожидания парного IN_MOVED_TO для IN_MOVED_FROM (секунды)
+    MOVE_PAIR_TIMEOUT = 0.5
+    
+    # Интервал сверки путей, покрытых inotify/fanotify (секунды): ловит
+    # изменения, пропущенные ядром (переполнение очереди, сетевые ФС)
+    RECONCILE_INTERVAL = 300
+    
+    # Окно накопления пачки событий перед вызовом обработчика (секунды)
+    EVENT_BATCH_WINDOW = 0.05
+    
+    # Число потоков обработки событий (callback)
+    EVENT_WORKERS = min(8, os.cpu_count() or 1)
+    
+    # Максимум переданных в пул и ещё не завершённых обработок: при
+    # достижении поток событий ждёт, события копятся в очереди
+    MAX_PENDING_CALLBACKS = 64
+    
+    # Максимальный размер файла для сравнения содержимого при смене mtime/size
+    CONTENT_DEDUP_MAX_SIZE = 64 * 1024
+    
+    # Максимальное число запоминаемых хэшей содержимого (LRU)
+    CONTENT_DEDUP_MAX_ENTRIES = 1024
+    
     def __init__(self, 
                  protected_paths: List[str],
                  callback: Callable[[WatchEvent], None],
                  use_inotify: bool = True,
-                 fallback_interval: int = 60):
+                 use_fanotify: bool = False,
+                 fallback_interval: int = 60,
+                 path_filter: Optional[Callable[[str], bool]] = None,
+                 exclude_predicate: Optional[Callable[[str], bool]] = None,
+                 batch_callback: Optional[Callable[[List[WatchEvent]], None]] = None):
         """
         Args:
             protected_paths: список защищаемых путей
             callback: функция обработки события изменения
             use_inotify: использовать inotify (если доступен)
+            use_fanotify: предпочитать fanotify (одна метка на файловую систему
+                          вместо наблюдения на каждую поддиректорию); если
+                          fanotify недоступен - используется inotify. Метка
+                          доставляет события всех файлов ФС, фильтрация по
+                          защищаемым путям выполняется в процессе
             fallback_interval: интервал периодической проверки в секундах
+            path_filter: проверка, отслеживается ли файл (события inotify
+                         для остальных файлов отбрасываются сразу)
+            exclude_predicate: проверка, исключается ли поддиректория из
+                               рекурсивного наблюдения inotify (например, временные)
+            batch_callback: обработка пачки событий, накопленных за EVENT_BATCH_WINDOW
+                            (если задан, вызывается вместо callback)
         """
         self.protected_paths = protected_paths
         self.callback = callback
+        self.batch_callback = batch_callback
+        self.path_filter = path_filter
+        self.exclude_predicate = exclude_predicate
         self.use_inotify = use_inotify and INOTIFY_AVAILABLE
+        self.use_fanotify = self.use_inotify and use_fanotify and FANOTIFY_AVAILABLE
         self.fallback_interval = fallback_interval
         
         # Состояние мониторинга
@@ -77,17 +669,51 @@ class FileWatcher:
         # Для inotify
         self.inotify_adapter = None
         self.watched_paths: Set[str] = set()
+        self._pending_moves: Dict[int, Tuple[str, float]] = {}  # {cookie: (путь, срок)}
+        
+        # Файлы, о которых ядро сообщило после последней сверки: сверка
+        # обновляет их состояние без повторного события
+        self._notified_paths: Set[str] = set()
         
         # Для fallback
-        self.file_states: Dict[str, Dict] = {}  # {file_path: {mtime, size, ...}}
+        # Состояния сгруппированы по защищаемым путям: удаление пути не
+        # требует просмотра состояний остальных файлов
+        self.file_states: Dict[str, _FileStateTable] = {}  # {base_path: состояния файлов}
+        
+        # Пакетный statx для fallback проверки (создаётся в потоке fallback)
+        self._uring_stat: Optional[_UringStat] = None
+        
+        # Сравнение содержимого небольших файлов: перезапись тем же
+        # содержимым (сохранение в редакторе) не порождает MODIFY
+        self.enable_content_dedup = True
+        self._content_digests: OrderedDict = OrderedDict()  # {file_path: digest}
         
         # Очередь событий
-        self.event_queue: Queue = Queue()
+        # (deque: append/popleft атомарны, без блокировки и Condition на событие;
+        # обработчик ждёт байта в канале событий)
+        self.event_queue: deque = deque()
+        self._event_r, self._event_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
         self.event_processor_thread: Optional[threading.Thread] = None
         
-        # Дедупликация событий
-        self.recent_events: Dict[str, float] = {}  # {file_path: timestamp}
+        # Пул обработки событий: события одного файла обрабатываются
+        # последовательно (очередь в _inflight), разных файлов - параллельно
+        self._callback_pool: Optional[ThreadPoolExecutor] = None
+        self._callback_slots = threading.BoundedSemaphore(self.MAX_PENDING_CALLBACKS)
+        self._inflight: Dict[str, deque] = {}  # {file_path: ожидающие события}
+        self._inflight_lock = threading.Lock()
+        
+        # Дедупликация событий (LRU: от старых к новым, время - monotonic)
+        self.recent_events: OrderedDict = OrderedDict()  # {file_path: timestamp}
         self.dedup_window = 2.0  # секунды
+        self.dedup_max = 4096  # максимальное число запоминаемых файлов
+        self._dedup_lock = threading.Lock()  # события приходят из inotify и fallback
+        
+        # Повторы внутри окна не отбрасываются: последнее событие файла
+        # откладывается до конца окна и передаётся одним событием
+        self._deferred_events: Dict[str, Tuple[float, WatchEvent]] = {}  # {file_path: (срок, событие)}
+        
+        # Канал пробуждения потоков при остановке (вместо ожидания таймаутов)
+        self._wake_r, self._wake_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
     
     def start(self):
         """Запуск мониторинга"""
@@ -96,11 +722,14 @@ class FileWatcher:
         
         self.is_running = True
         self.is_paused = False
+        self._drain_wakeup()
         
         # Инициализация состояний файлов
         self._init_file_states()
         
         # Запуск обработчика событий
+        self._callback_pool = ThreadPoolExecutor(max_workers=self.EVENT_WORKERS,
+                                                 thread_name_prefix="EventWorker")
         self.event_processor_thread = threading.Thread(
             target=self._event_processor,
             daemon=True,
@@ -129,6 +758,13 @@ class FileWatcher:
         """Остановка мониторинга"""
         self.is_running = False
         
+        # Пробуждение ожидающих потоков
+        try:
+            os.write(self._wake_w, b'x')
+        except BlockingIOError:
+            # Канал уже содержит сигнал пробуждения
+            pass
+        
         # Ожидание завершения потоков
         if self.inotify_thread and self.inotify_thread.is_alive():
             self.inotify_thread.join(timeout=2)
@@ -138,6 +774,11 @@ class FileWatcher:
         
         if self.event_processor_thread and self.event_processor_thread.is_alive():
             self.event_processor_thread.join(timeout=2)
+        
+        # Выполняющиеся обработки не ожидаются (как и раньше с join по таймауту)
+        if self._callback_pool is not None:
+            self._callback_pool.shutdown(wait=False)
+            self._callback_pool = None
     
     def pause(self):
         """Приостановка мониторинга (события игнорируются)"""
@@ -153,7 +794,7 @@ class FileWatcher:
             self.protected_paths.append(path)
             
             # Добавление в inotify (если запущен)
-            if self.use_inotify and self.inotify_adapter:
+            if self.inotify_adapter:
                 self._add_inotify_watch(path)
             
             # Обновление состояний файлов
@@ -165,7 +806,7 @@ class FileWatcher:
             self.protected_paths.remove(path)
             
             # Удаление из inotify
-            if self.use_inotify and self.inotify_adapter:
+            if self.inotify_adapter:
                 self._remove_inotify_watch(path)
             
             # Удаление состояний файлов
@@ -181,281 +822,668 @@ class FileWatcher:
     def _update_file_states_for_path(self, base_path: str):
         """Обновление состояний файлов для конкретного пути"""
         expanded_path = os.path.expanduser(base_path)
+        states = self.file_states.setdefault(expanded_path, _FileStateTable())
         
         if os.path.isfile(expanded_path):
-            self._record_file_state(expanded_path)
+            self._record_file_state(expanded_path, states)
         elif os.path.isdir(expanded_path):
-            for root, dirs, files in os.walk(expanded_path):
-                for filename in files:
-                    file_path = os.path.join(root, filename)
-                    self._record_file_state(file_path)
+            for entry in self._iter_file_entries(expanded_path):
+                self._record_file_state(entry.path, states, entry)
     
     def _remove_file_states_for_path(self, base_path: str):
         """Удаление состояний файлов для конкретного пути"""
         expanded_path = os.path.expanduser(base_path)
         
-        # Удаление всех файлов, начинающихся с этого пути
-        to_remove = [
-            fp for fp in self.file_states.keys()
-            if fp.startswith(expanded_path)
-        ]
+        # Удаление группы состояний пути целиком
+        states = self.file_states.pop(expanded_path, None)
+        if states:
+            for fp in states:
+                self._content_digests.pop(fp, None)
+    
+    @staticmethod
+    def _iter_file_entries(directory: str):
+        """
+        Рекурсивный обход директории через os.scandir
+        
+        Тип записи берётся из getdents (DirEntry), путь - из entry.path,
+        без os.path.join и повторного stat директорий
         
-        for fp in to_remove:
-            del self.file_states[fp]
+        Yields:
+            DirEntry каждого файла
+        """
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file():
+                                yield entry
+                        except OSError:
+                            continue
+            except OSError:
+                continue
     
-    def _record_file_state(self, file_path: str):
-        """Запись текущего состояния файла"""
+    def _record_file_state(self, file_path: str, states: _FileStateTable,
+                           entry: Optional[os.DirEntry] = None):
+        """
+        Запись текущего состояния файла (stat берётся из DirEntry, если передан)
+        
+        Args:
+            file_path: путь к файлу
+            states: состояния файлов защищаемого пути, к которому относится файл
+            entry: запись обхода директории
+        """
         try:
-            stat = os.stat(file_path)
-            self.file_states[file_path] = {
-                'mtime': stat.st_mtime,
-                'size': stat.st_size,
-                'inode': stat.st_ino
-            }
+            stat = entry.stat() if entry is not None else os.stat(file_path)
+            states.set(file_path, stat.st_mtime_ns, stat.st_size)
         except (OSError, FileNotFoundError):
             # Файл удалён или недоступен
-            if file_path in self.file_states:
-                del self.file_states[file_path]
+            states.discard(file_path)
     
     def _inotify_monitor(self):
         """Поток мониторинга через inotify"""
         if not INOTIFY_AVAILABLE:
             return
         
+        poller = None
         try:
-            # Создание inotify адаптера
-            self.inotify_adapter = inotify.adapters.Inotify()
+            # Создание экземпляра fanotify или inotify
+            self.inotify_adapter = self._create_notify_adapter()
             
             # Добавление путей в мониторинг
             for path in self.protected_paths:
                 self._add_inotify_watch(path)
             
-            # Основной цикл мониторинга
+            # Ожидание событий inotify или пробуждения от stop() без таймаута
+            poller = select.epoll()
+            poller.register(self.inotify_adapter.fd, select.EPOLLIN)
+            poller.register(self._wake_r, select.EPOLLIN)
+            
+            # Основной цикл мониторинга (с таймаутом только пока есть
+            # непарные IN_MOVED_FROM)
             while self.is_running:
-                # Проверка событий с таймаутом
-                events = self.inotify_adapter.event_gen(yield_nones=False, timeout_s=1)
+                timeout = self.MOVE_PAIR_TIMEOUT if self._pending_moves else -1
+                ready = [fd for fd, _ in poller.poll(timeout)]
+                if self._wake_r in ready or not self.is_running:
+                    break
                 
-                for event in events:
-                    if not self.is_running:
-                        break
-                    
-                    self._process_inotify_event(event)
+                for mask, cookie, file_path in self.inotify_adapter.read_events():
+                    self._process_inotify_event(mask, cookie, file_path)
+                
+                self._flush_stale_moves()
         
         except Exception as e:
             print(f"Ошибка inotify мониторинга: {e}")
         
         finally:
             # Очистка
+            if poller is not None:
+                poller.close()
             if self.inotify_adapter:
-                for path in list(self.watched_paths):
-                    try:
-                        self.inotify_adapter.remove_watch(path)
-                    except:
-                        pass
+                self.inotify_adapter.close()
+                self.inotify_adapter = None
+            self.watched_paths.clear()
+    
+    def _create_notify_adapter(self):
+        """Создание fanotify (если разрешён и доступен) или inotify"""
+        if self.use_fanotify:
+            try:
+                return _RawFanotify(self.exclude_predicate)
+            except OSError as e:
+                print(f"fanotify недоступен ({e}), используется inotify")
+        
+        return _RawInotify()
     
     def _add_inotify_watch(self, path: str):
-        """Добавление пути в inotify"""
+        """Добавление пути в inotify (или fanotify)"""
         if not self.inotify_adapter:
             return
         
         expanded_path = os.path.expanduser(path)
         
         try:
-            if os.path.isfile(expanded_path):
+            if isinstance(self.inotify_adapter, _RawFanotify):
+                # Метка на всю ФС - обход поддиректорий не нужен
+                if os.path.exists(expanded_path):
+                    self.inotify_adapter.add_root(expanded_path)
+                    self.watched_paths.add(expanded_path)
+            
+            elif os.path.isfile(expanded_path):
                 # Мониторинг файла
-                self.inotify_adapter.add_watch(
-                    expanded_path.encode('utf-8'),
-                    mask=inotify.constants.IN_MODIFY | 
-                         inotify.constants.IN_CLOSE_WRITE |
-                         inotify.constants.IN_DELETE_SELF |
-                         inotify.constants.IN_MOVE_SELF
-                )
+                self.inotify_adapter.add_watch(expanded_path, FILE_WATCH_MASK)
                 self.watched_paths.add(expanded_path)
             
             elif os.path.isdir(expanded_path):
-                # Рекурсивный мониторинг директории
-                self.inotify_adapter.add_watch(
-                    expanded_path.encode('utf-8'),
-                    mask=inotify.constants.IN_MODIFY |
-                         inotify.constants.IN_CLOSE_WRITE |
-                         inotify.constants.IN_DELETE |
-                         inotify.constants.IN_CREATE |
-                         inotify.constants.IN_MOVED_FROM |
-                         inotify.constants.IN_MOVED_TO
-                )
-                self.watched_paths.add(expanded_path)
-                
-                # Добавление всех поддиректорий
-                for root, dirs, files in os.walk(expanded_path):
-                    for dirname in dirs:
-                        dir_path = os.path.join(root, dirname)
-                        self.inotify_adapter.add_watch(
-                            dir_path.encode('utf-8'),
-                            mask=inotify.constants.IN_MODIFY |
-                                 inotify.constants.IN_CLOSE_WRITE |
-                                 inotify.constants.IN_DELETE |
-                                 inotify.constants.IN_CREATE |
-                                 inotify.constants.IN_MOVED_FROM |
-                                 inotify.constants.IN_MOVED_TO
-                        )
-                        self.watched_paths.add(dir_path)
+                # Рекурсивный мониторинг директории: дерево обходится
+                # параллельно, наблюдения добавляются одной пачкой
+                dir_paths = [expanded_path] + self._collect_subdirectories(expanded_path)
+                added = self.inotify_adapter.add_watches(dir_paths, DIR_WATCH_MASK)
+                self.watched_paths.update(added)
         
         except Exception as e:
             print(f"Ошибка добавления watch для {path}: {e}")
     
+    def _collect_subdirectories(self, directory: str) -> List[str]:
+        """
+        Сбор всех поддиректорий (кроме исключённых) для наблюдения
+        
+        Каждая поддиректория верхнего уровня обходится в отдельном потоке
+        """
+        top_level = self._list_subdirectories(directory)
+        if not top_level:
+            return []
+        
+        subdirectories = list(top_level)
+        max_workers = min(len(top_level), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers,
+                                thread_name_prefix="InotifyWalk") as executor:
+            for nested in executor.map(self._walk_subdirectories, top_level):
+                subdirectories.extend(nested)
+        
+        return subdirectories
+    
+    def _walk_subdirectories(self, directory: str) -> List[str]:
+        """Рекурсивный сбор поддиректорий через os.scandir"""
+        result = []
+        stack = [directory]
+        while stack:
+            nested = self._list_subdirectories(stack.pop())
+            result.extend(nested)
+            stack.extend(nested)
+        
+        return result
+    
+    def _list_subdirectories(self, directory: str) -> List[str]:
+        """Непосредственные поддиректории (без символических ссылок и исключённых)"""
+        try:
+            with os.scandir(directory) as entries:
+                subdirectories = [entry.path for entry in entries
+                                  if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return []
+        
+        if self.exclude_predicate is not None:
+            subdirectories = [path for path in subdirectories if not self.exclude_predicate(path)]
+        
+        return subdirectories
+    
     def _remove_inotify_watch(self, path: str):
-        """Удаление пути из inotify"""
+        """Удаление пути и всех его поддиректорий из inotify"""
         if not self.inotify_adapter:
             return
         
         expanded_path = os.path.expanduser(path)
+        prefix = expanded_path.rstrip(os.sep) + os.sep
         
         try:
-            if expanded_path in self.watched_paths:
-                self.inotify_adapter.remove_watch(expanded_path.encode('utf-8'))
-                self.watched_paths.remove(expanded_path)
+            if isinstance(self.inotify_adapter, _RawFanotify):
+                self.inotify_adapter.remove_root(expanded_path)
+                self.watched_paths.discard(expanded_path)
+                return
+            
+            to_remove = [watched for watched in self.watched_paths
+                         if watched == expanded_path or watched.startswith(prefix)]
+            self.inotify_adapter.remove_watches(to_remove)
+            self.watched_paths.difference_update(to_remove)
         except Exception as e:
             print(f"Ошибка удаления watch для {path}: {e}")
     
-    def _process_inotify_event(self, event):
-        """Обработка события inotify"""
-        (header, type_names, watch_path, filename) = event
+    def _watch_new_directory(self, directory: str):
+        """
+        Добавление наблюдения за директорией, созданной или перемещённой
+        внутрь наблюдаемой
         
-        # Формирование полного пути
-        if filename:
-            file_path = os.path.join(watch_path.decode('utf-8'), filename.decode('utf-8'))
-        else:
-            file_path = watch_path.decode('utf-8')
+        Файлы, записанные в неё до добавления наблюдения, передаются
+        событиями CREATE
+        """
+        if self.exclude_predicate is not None and self.exclude_predicate(directory):
+            return
+        
+        dir_paths = [directory] + self._collect_subdirectories(directory)
+        try:
+            self.watched_paths.update(self.inotify_adapter.add_watches(dir_paths, DIR_WATCH_MASK))
+        except OSError as e:
+            print(f"Ошибка добавления watch для {directory}: {e}")
+            return
+        
+        for dir_path in dir_paths:
+            try:
+                with os.scandir(dir_path) as entries:
+                    file_paths = [entry.path for entry in entries if entry.is_file(follow_symlinks=False)]
+            except OSError:
+                continue
+            
+            for file_path in file_paths:
+                if self.path_filter is None or self.path_filter(file_path):
+                    self._queue_event(WatchEvent(WatchEventType.CREATE, file_path))
+    
+    def _process_inotify_event(self, mask: int, cookie: int, file_path: str):
+        """Обработка события inotify (из событий директорий остаётся только появление новой)"""
+        if mask & IN_ISDIR:
+            self._watch_new_directory(file_path)
+            return
         
-        # Фильтрация директорий
-        if os.path.isdir(file_path):
+        # Переименование: IN_MOVED_FROM ожидает парный IN_MOVED_TO с тем же cookie
+        # (fanotify cookie не сообщает - исходный путь сразу считается удалённым)
+        if mask & IN_MOVED_FROM:
+            if cookie:
+                self._pending_moves[cookie] = (file_path, time.monotonic() + self.MOVE_PAIR_TIMEOUT)
+            elif self.path_filter is None or self.path_filter(file_path):
+                self._queue_event(WatchEvent(WatchEventType.DELETE, file_path))
             return
         
-        # Определение типа события
-        event_type = None
+        src_path = None
+        if mask & IN_MOVED_TO and cookie:
+            pending = self._pending_moves.pop(cookie, None)
+            src_path = pending[0] if pending else None
+        
+        # Отбрасывание событий неотслеживаемых файлов до создания WatchEvent
+        # (переименование учитывается, если отслеживается любой из путей)
+        if self.path_filter is not None and not self.path_filter(file_path):
+            if src_path is None or not self.path_filter(src_path):
+                return
+        
+        # Определение типа события по таблице масок
+        for type_mask, event_type in _MASK_TO_TYPE:
+            if mask & type_mask:
+                self._queue_event(WatchEvent(event_type, file_path, src_path=src_path))
+                self._notified_paths.add(file_path)
+                break
+    
+    def _flush_stale_moves(self):
+        """
+        Обработка IN_MOVED_FROM без пары
         
-        if 'IN_MODIFY' in type_names or 'IN_CLOSE_WRITE' in type_names:
-            event_type = WatchEventType.MODIFY
-        elif 'IN_DELETE' in type_names or 'IN_DELETE_SELF' in type_names:
-            event_type = WatchEventType.DELETE
-        elif 'IN_MOVED_FROM' in type_names or 'IN_MOVED_TO' in type_names or 'IN_MOVE_SELF' in type_names:
-            event_type = WatchEventType.MOVE
-        elif 'IN_CREATE' in type_names:
-            event_type = WatchEventType.CREATE
+        Файл перемещён за пределы наблюдаемых директорий - для него
+        это равносильно удалению
+        """
+        if not self._pending_moves:
+            return
         
-        if event_type:
-            self._queue_event(WatchEvent(event_type, file_path))
+        now = time.monotonic()
+        stale = [cookie for cookie, (_, deadline) in self._pending_moves.items() if deadline <= now]
+        for cookie in stale:
+            src_path, _ = self._pending_moves.pop(cookie)
+            if self.path_filter is None or self.path_filter(src_path):
+                self._queue_event(WatchEvent(WatchEventType.DELETE, src_path))
     
     def _fallback_monitor(self):
         """Поток периодической проверки (fallback)"""
+        if LIBURING_AVAILABLE:
+            try:
+                self._uring_stat = _UringStat()
+            except Exception as e:
+                print(f"io_uring недоступен ({e}), используется stat для каждого файла")
+        
+        try:
+            self._fallback_loop()
+        finally:
+            if self._uring_stat is not None:
+                self._uring_stat.close()
+                self._uring_stat = None
+    
+    def _fallback_loop(self):
+        """
+        Цикл периодической проверки
+        
+        Пути без наблюдения ядра проверяются каждые fallback_interval секунд,
+        пути под inotify/fanotify - только при сверке раз в RECONCILE_INTERVAL
+        """
+        next_reconcile = time.monotonic() + self.RECONCILE_INTERVAL
         while self.is_running:
             try:
+                reconcile = time.monotonic() >= next_reconcile
+                if reconcile:
+                    next_reconcile = time.monotonic() + self.RECONCILE_INTERVAL
+                
                 # Проверка каждого защищаемого пути
                 for base_path in self.protected_paths:
                     if not self.is_running:
                         break
                     
-                    self._check_path_changes(base_path)
+                    if reconcile or not self._is_kernel_watched(base_path):
+                        self._check_path_changes(base_path)
                 
-                # Ожидание следующего цикла
-                time.sleep(self.fallback_interval)
+                if reconcile:
+                    self._notified_paths = set()
+                
+                # Ожидание следующего цикла (прерывается остановкой)
+                self._wait_for_wakeup(self.fallback_interval)
             
             except Exception as e:
                 print(f"Ошибка fallback мониторинга: {e}")
-                time.sleep(5)
+                self._wait_for_wakeup(5)
+    
+    def _is_kernel_watched(self, base_path: str) -> bool:
+        """Покрыт ли путь наблюдением inotify/fanotify"""
+        return self.inotify_adapter is not None and os.path.expanduser(base_path) in self.watched_paths
+    
+    def _wait_for_wakeup(self, timeout: float) -> bool:
+        """
+        Ожидание сигнала пробуждения или истечения таймаута
+        
+        Returns:
+            True если поток разбужен вызовом stop()
+        """
+        readable, _, _ = select.select([self._wake_r], [], [], timeout)
+        return bool(readable)
+    
+    def _drain_wakeup(self):
+        """Очистка канала пробуждения"""
+        self._drain_pipe(self._wake_r)
+    
+    @staticmethod
+    def _drain_pipe(fd: int):
+        """Чтение всех байт из неблокирующего канала"""
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
     
     def _check_path_changes(self, base_path: str):
         """Проверка изменений в пути"""
         expanded_path = os.path.expanduser(base_path)
+        states = self.file_states.setdefault(expanded_path, _FileStateTable())
         
         if os.path.isfile(expanded_path):
-            self._check_file_change(expanded_path)
+            self._check_file_change(expanded_path, states)
         
         elif os.path.isdir(expanded_path):
             # Проверка всех файлов в директории
             try:
-                for root, dirs, files in os.walk(expanded_path):
-                    for filename in files:
-                        file_path = os.path.join(root, filename)
-                        self._check_file_change(file_path)
+                entries = self._iter_file_entries(expanded_path)
+                if self._uring_stat is None:
+                    for entry in entries:
+                        self._check_file_change(entry.path, states, entry)
+                    return
+                
+                # Пакетами через io_uring: один системный вызов на пачку statx
+                while True:
+                    paths = [entry.path for entry in islice(entries, _UringStat.QUEUE_DEPTH)]
+                    if not paths:
+                        break
+                    for file_path, result in zip(paths, self._uring_stat.stat_batch(paths)):
+                        if isinstance(result, tuple):
+                            self._compare_file_state(file_path, result, states)
+                        elif result == errno.ENOENT:
+                            self._handle_missing_file(file_path, states)
             except Exception as e:
                 print(f"Ошибка обхода директории {expanded_path}: {e}")
     
-    def _check_file_change(self, file_path: str):
-        """Проверка изменения конкретного файла"""
+    def _check_file_change(self, file_path: str, states: _FileStateTable,
+                           entry: Optional[os.DirEntry] = None):
+        """Проверка изменения конкретного файла (stat берётся из DirEntry, если передан)"""
         try:
-            current_stat = os.stat(file_path)
-            current_state = {
-                'mtime': current_stat.st_mtime,
-                'size': current_stat.st_size,
-                'inode': current_stat.st_ino
-            }
-            
-            # Проверка наличия предыдущего состояния
-            if file_path not in self.file_states:
-                # Новый файл
-                self.file_states[file_path] = current_state
-                self._queue_event(WatchEvent(WatchEventType.CREATE, file_path))
-                return
-            
-            previous_state = self.file_states[file_path]
-            
-            # Проверка изменений
-            if (current_state['mtime'] != previous_state['mtime'] or
-                current_state['size'] != previous_state['size']):
-                # Файл изменён
-                self.file_states[file_path] = current_state
-                self._queue_event(WatchEvent(WatchEventType.MODIFY, file_path))
+            current_stat = entry.stat() if entry is not None else os.stat(file_path)
+            self._compare_file_state(file_path, (current_stat.st_mtime_ns, current_stat.st_size), states)
         
         except FileNotFoundError:
-            # Файл удалён
-            if file_path in self.file_states:
-                del self.file_states[file_path]
-                self._queue_event(WatchEvent(WatchEventType.DELETE, file_path))
+            self._handle_missing_file(file_path, states)
         
         except Exception as e:
             # Ошибка доступа к файлу
             pass
     
+    def _compare_file_state(self, file_path: str, current_state: Tuple[int, int],
+                            states: _FileStateTable):
+        """Сравнение нового состояния файла (mtime_ns, size) с запомненным"""
+        mtime_ns, size = current_state
+        
+        # Сравнение (целочисленное по mtime_ns и размеру) и запись состояния
+        changed = states.update(file_path, mtime_ns, size)
+        
+        if changed is None:
+            # Новый файл
+            self._queue_event(WatchEvent(WatchEventType.CREATE, file_path))
+            return
+        
+        if not changed:
+            return
+        
+        # Файл изменён
+        if file_path in self._notified_paths:
+            # Изменение уже передано событием inotify/fanotify
+            return
+        if self._content_unchanged(file_path, size):
+            return
+        self._queue_event(WatchEvent(WatchEventType.MODIFY, file_path))
+    
+    def _handle_missing_file(self, file_path: str, states: _FileStateTable):
+        """Файл удалён"""
+        self._content_digests.pop(file_path, None)
+        if states.discard(file_path):
+            self._queue_event(WatchEvent(WatchEventType.DELETE, file_path))
+    
+    def _content_unchanged(self, file_path: str, size: int) -> bool:
+        """
+        Проверка, что содержимое небольшого файла совпадает с запомненным
+        
+        Хэш запоминается при первом изменении файла, поэтому первое
+        изменение всегда передаётся дальше
+        
+        Returns:
+            True, если событие можно отбросить
+        """
+        if not self.enable_content_dedup or size > self.CONTENT_DEDUP_MAX_SIZE:
+            self._content_digests.pop(file_path, None)
+            return False
+        
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read(self.CONTENT_DEDUP_MAX_SIZE + 1)
+        except OSError:
+            return False
+        
+        if XXHASH_AVAILABLE:
+            digest = xxhash.xxh64_intdigest(data)
+        else:
+            digest = hashlib.blake2b(data, digest_size=8).digest()
+        
+        digests = self._content_digests
+        previous = digests.get(file_path)
+        digests[file_path] = digest
+        digests.move_to_end(file_path)
+        if len(digests) > self.CONTENT_DEDUP_MAX_ENTRIES:
+            digests.popitem(last=False)
+        
+        return previous == digest
+    
     def _queue_event(self, event: WatchEvent):
-        """Добавление события в очередь с дедупликацией"""
-        current_time = time.time()
-        
-        # Проверка дедупликации
-        if event.file_path in self.recent_events:
-            last_event_time = self.recent_events[event.file_path]
-            if (current_time - last_event_time) < self.dedup_window:
-                # Игнорируем дублирующееся событие
-                return
+        """
+        Добавление события в очередь с дедупликацией
+        
+        Повтор внутри dedup_window откладывается до конца окна (из
+        нескольких повторов остаётся последний), поэтому изменение в конце
+        серии записей не теряется. Переименование передаётся сразу: оно
+        несёт исходный путь
+        """
+        current_time = time.monotonic()
+        recent_events = self.recent_events
+        
+        with self._dedup_lock:
+            # Проверка дедупликации
+            last_event_time = recent_events.get(event.file_path)
+            if (last_event_time is not None and event.src_path is None
+                    and (current_time - last_event_time) < self.dedup_window
+                    and len(self._deferred_events) < self.dedup_max):
+                self._deferred_events[event.file_path] = (last_event_time + self.dedup_window, event)
+            else:
+                self._deferred_events.pop(event.file_path, None)
+                self._record_event_time(event.file_path, current_time)
+                self.event_queue.append(event)
+        
+        # Пробуждение обработчика (для отложенного события - пересчёт
+        # времени ожидания)
+        try:
+            os.write(self._event_w, b'x')
+        except BlockingIOError:
+            # Канал заполнен - обработчик и так будет разбужен
+            pass
+    
+    def _record_event_time(self, file_path: str, current_time: float):
+        """Запись времени переданного события (вызывается под _dedup_lock)"""
+        recent_events = self.recent_events
+        
+        # Запись времени события (файл переносится в конец LRU)
+        recent_events[file_path] = current_time
+        recent_events.move_to_end(file_path)
         
-        # Запись времени события
-        self.recent_events[event.file_path] = current_time
+        # Удаление устаревших записей с начала LRU и ограничение размера
+        while recent_events:
+            oldest_path, oldest_time = next(iter(recent_events.items()))
+            if current_time - oldest_time < self.dedup_window and len(recent_events) <= self.dedup_max:
+                break
+            del recent_events[oldest_path]
+    
+    def _flush_deferred_events(self) -> Optional[float]:
+        """
+        Перенос отложенных событий с истёкшим окном в очередь
+        
+        Returns:
+            время до срока ближайшего отложенного события или None
+        """
+        if not self._deferred_events:
+            return None
+        
+        current_time = time.monotonic()
+        next_deadline = None
+        with self._dedup_lock:
+            for file_path, (deadline, event) in list(self._deferred_events.items()):
+                if deadline <= current_time:
+                    del self._deferred_events[file_path]
+                    self._record_event_time(file_path, current_time)
+                    self.event_queue.append(event)
+                elif next_deadline is None or deadline < next_deadline:
+                    next_deadline = deadline
         
-        # Добавление в очередь
-        self.event_queue.put(event)
+        return None if next_deadline is None else next_deadline - current_time
     
     def _event_processor(self):
         """Поток обработки событий из очереди"""
         while self.is_running:
             try:
-                # Получение события с таймаутом
-                event = self.event_queue.get(timeout=1)
+                # Ожидание событий, остановки или срока отложенного события
+                # (без отложенных событий в простое поток не просыпается)
+                timeout = self._flush_deferred_events()
+                if self.event_queue:
+                    timeout = 0
+                readable, _, _ = select.select([self._event_r, self._wake_r], [], [], timeout)
+                if self._wake_r in readable and not self.is_running:
+                    break
+                if self._event_r in readable:
+                    self._drain_pipe(self._event_r)
+                
+                batch = self._collect_event_batch()
                 
                 # Проверка паузы
-                if self.is_paused:
+                if not batch or self.is_paused:
+                    continue
+                
+                # Группировка по директориям (сортировка стабильна - порядок
+                # событий внутри директории сохраняется)
+                batch.sort(key=lambda event: os.path.dirname(event.file_path))
+                
+                if self.batch_callback is not None:
+                    try:
+                        self.batch_callback(batch)
+                    except Exception as e:
+                        print(f"Ошибка обработки пачки из {len(batch)} событий: {e}")
                     continue
                 
-                # Вызов callback
+                # Вызов callback в пуле
+                for event in batch:
+                    if not self._dispatch_event(event):
+                        break
+            
+            except Exception as e:
+                print(f"Ошибка в event processor: {e}")
+    
+    def _dispatch_event(self, event: WatchEvent) -> bool:
+        """
+        Передача события в пул обработки
+        
+        Если файл уже обрабатывается, событие ставится в его очередь и будет
+        обработано тем же заданием после предыдущих
+        
+        Returns:
+            False, если мониторинг остановлен
+        """
+        with self._inflight_lock:
+            pending = self._inflight.get(event.file_path)
+            if pending is not None:
+                pending.append(event)
+                return True
+            self._inflight[event.file_path] = deque()
+        
+        # Ограничение числа незавершённых обработок (обратное давление)
+        while not self._callback_slots.acquire(timeout=1):
+            if not self.is_running:
+                with self._inflight_lock:
+                    self._inflight.pop(event.file_path, None)
+                return False
+        
+        try:
+            self._callback_pool.submit(self._run_callbacks, event)
+        except (RuntimeError, AttributeError):
+            # Пул уже остановлен
+            self._callback_slots.release()
+            with self._inflight_lock:
+                self._inflight.pop(event.file_path, None)
+            return False
+        
+        return True
+    
+    def _run_callbacks(self, event: WatchEvent):
+        """Обработка события и всех накопившихся событий того же файла"""
+        try:
+            while True:
                 try:
                     self.callback(event)
                 except Exception as e:
                     print(f"Ошибка обработки события {event}: {e}")
                 
-            except Empty:
-                # Таймаут - продолжаем
-                continue
-            except Exception as e:
-                print(f"Ошибка в event processor: {e}")
+                with self._inflight_lock:
+                    pending = self._inflight[event.file_path]
+                    if not pending:
+                        del self._inflight[event.file_path]
+                        return
+                    event = pending.popleft()
+        finally:
+            self._callback_slots.release()
+    
+    def _collect_event_batch(self) -> List[WatchEvent]:
+        """
+        Сбор накопленных событий и событий, пришедших в течение EVENT_BATCH_WINDOW
+        
+        Returns:
+            список событий в порядке поступления
+        """
+        batch: List[WatchEvent] = []
+        event_queue = self.event_queue
+        deadline = time.monotonic() + self.EVENT_BATCH_WINDOW
+        
+        while self.is_running:
+            while event_queue:
+                batch.append(event_queue.popleft())
+            
+            if not batch:
+                break
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            
+            readable, _, _ = select.select([self._event_r, self._wake_r], [], [], remaining)
+            if self._event_r not in readable:
+                break
+            self._drain_pipe(self._event_r)
+        
+        return batch
     
     def get_statistics(self) -> Dict:
         """Получение статистики мониторинга"""
@@ -464,9 +1492,11 @@ class FileWatcher:
             'is_paused': self.is_paused,
             'inotify_enabled': self.use_inotify,
             'inotify_available': INOTIFY_AVAILABLE,
+            'fanotify_active': isinstance(self.inotify_adapter, _RawFanotify),
             'protected_paths_count': len(self.protected_paths),
-            'watched_files_count': len(self.file_states),
+            'watched_files_count': sum(len(states) for states in self.file_states.values()),
             'watched_inotify_paths': len(self.watched_paths),
-            'pending_events': self.event_queue.qsize(),
+            'pending_events': len(self.event_queue),
+            'files_in_processing': len(self._inflight),
             'fallback_interval': self.fallback_interval
         }
\ No newline at end of file
@@ -8,11 +8,12 @@ Secure FS Guard - GUI
 
 import sys
 import os
+from typing import Optional
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTabWidget, QStatusBar, QMessageBox, QLabel, QPushButton
 )
-from PySide6.QtCore import Qt, QTimer, Signal, QThread
+from PySide6.QtCore import Qt, QTimer, Signal, QThread, QSocketNotifier
 from PySide6.QtGui import QIcon, QFont
 
 # Импорт клиента IPC
@@ -23,7 +24,7 @@ from ipc_client import DaemonClient
 from views.main_window import MainView
 from views.settings_view import SettingsView
 from views.integrity_view import IntegrityView
-from views.logs_view import LogsView
+from views.logs_view import LogsView, normalize_logs
 
 
 class SecureFSGuardGUI(QMainWindow):
@@ -39,24 +40,47 @@ class SecureFSGuardGUI(QMainWindow):
     # Сигналы
     connection_status_changed = Signal(bool, str)
     
+    # Интервал проверки связи при отсутствии уведомлений (мс)
+    WATCHDOG_INTERVAL = 30000
+    
+    # Интервал опроса, если служба не поддерживает уведомления (мс)
+    POLL_INTERVAL = 2000
+    
+    # Интервал keepalive: ping держит соединение и обнаруживает
+    # перезапуск службы (мс)
+    KEEPALIVE_INTERVAL = 10000
+    
+    # Интервал автообновления вкладок: один пакетный запрос на все (мс)
+    AUTO_REFRESH_INTERVAL = 2000
+    
     def __init__(self):
         super().__init__()
         
         # Клиент для связи с службой
         self.daemon_client = DaemonClient()
         
-        # Таймер обновления статуса
+        # Уведомления службы (статус обновляется по событиям, а не по таймеру)
+        self.notification_notifier: Optional[QSocketNotifier] = None
+        
+        # Сторожевой таймер: ping только если уведомлений давно не было
         self.status_timer = QTimer()
-        self.status_timer.timeout.connect(self.update_status)
+        self.status_timer.timeout.connect(self.check_connection)
+        
+        # Keepalive: восстановление связи после перезапуска службы
+        self.keepalive_timer = QTimer()
+        self.keepalive_timer.timeout.connect(self.keepalive)
+        self.connection_lost = False
+        
+        # Общий таймер автообновления для всех view, включивших его
+        self.auto_refresh_timer = QTimer()
+        self.auto_refresh_timer.timeout.connect(self.auto_refresh_tick)
+        self.auto_refresh_views = set()
         
         # Инициализация UI
         self.init_ui()
         
         # Попытка подключения к службе
         self.connect_to_daemon()
-        
-        # Запуск таймера обновления (каждые 2 секунды)
-        self.status_timer.start(2000)
     
     def init_ui(self):
         """Инициализация интерфейса"""
@@ -103,6 +127,9 @@ class SecureFSGuardGUI(QMainWindow):
         
         # Связь сигналов
         self.connection_status_changed.connect(self.on_connection_status_changed)
+        self.logs_view.auto_refresh_toggled.connect(
+            lambda enabled: self.set_auto_refresh(self.logs_view, enabled)
+        )
     
     def create_header(self) -> QWidget:
         """Создание заголовка приложения"""
@@ -128,6 +155,8 @@ class SecureFSGuardGUI(QMainWindow):
     def connect_to_daemon(self):
         """Подключение к службе"""
         # Отключение если уже подключён
+        self.keepalive_timer.stop()
+        self.unsubscribe_notifications()
         if self.daemon_client.is_connected:
             self.daemon_client.disconnect()
         
@@ -135,9 +164,14 @@ class SecureFSGuardGUI(QMainWindow):
         success, message = self.daemon_client.connect()
         
         if success:
+            self.connection_lost = False
+            self.keepalive_timer.start(self.KEEPALIVE_INTERVAL)
             self.connection_status_changed.emit(True, "Подключено к службе")
             self.status_bar.showMessage("✓ Подключение к службе установлено", 3000)
             
+            # Подписка на уведомления
+            self.subscribe_notifications()
+            
             # Обновление данных во всех view
             self.refresh_all_views()
         else:
@@ -162,14 +196,96 @@ class SecureFSGuardGUI(QMainWindow):
             self.connection_indicator.setText("🔴 Не подключён")
             self.connection_indicator.setStyleSheet("color: red;")
     
-    def update_status(self):
-        """Периодическое обновление статуса"""
+    def subscribe_notifications(self):
+        """
+        Подписка на уведомления службы
+        
+        Если служба не поддерживает подписку, статус опрашивается
+        по таймеру, как раньше
+        """
+        self.unsubscribe_notifications()
+        
+        fd = self.daemon_client.subscribe()
+        if fd is None:
+            self.status_timer.start(self.POLL_INTERVAL)
+            return
+        
+        self.notification_notifier = QSocketNotifier(fd, QSocketNotifier.Read, self)
+        self.notification_notifier.activated.connect(self.on_notification)
+        self.status_timer.start(self.WATCHDOG_INTERVAL)
+    
+    def unsubscribe_notifications(self):
+        """Отключение уведомлений службы"""
+        self.status_timer.stop()
+        if self.notification_notifier:
+            self.notification_notifier.setEnabled(False)
+            self.notification_notifier.deleteLater()
+            self.notification_notifier = None
+        self.daemon_client.unsubscribe()
+    
+    def on_notification(self):
+        """Обработка уведомления службы (в сокете есть данные)"""
+        notification = self.daemon_client.read_notification()
+        if notification is None:
+            # Служба закрыла соединение (восстановит keepalive)
+            self.on_connection_lost()
+            return
+        
+        # Уведомление подтверждает связь - сторожевой таймер перезапускается
+        self.status_timer.start(self.WATCHDOG_INTERVAL)
+        
+        notification_type = notification.get('notification_type')
+        if notification_type == 'status':
+            # Статус передан в уведомлении - запрос GET_STATUS не нужен
+            self.main_view.apply_status(notification.get('data') or {})
+        elif notification_type == 'file_changed':
+            # Кэш клиента уже сброшен, статус придёт отдельным уведомлением
+            pass
+        elif notification_type == 'settings_changed':
+            # Кэш настроек клиента уже сброшен - вкладка перезагружает их
+            self.settings_view.refresh()
+        elif notification_type == 'resync':
+            # Служба пропустила часть уведомлений (GUI не успевал их читать)
+            self.refresh_all_views()
+        else:
+            self.update_status()
+    
+    def check_connection(self):
+        """Проверка связи, если уведомлений давно не было (или опрос без подписки)"""
         if not self.daemon_client.is_connected:
             return
         
-        # Проверка связи со службой
         if not self.daemon_client.ping():
-            self.connection_status_changed.emit(False, "Потеряно соединение со службой")
+            self.on_connection_lost()
+            return
+        
+        self.update_status()
+    
+    def keepalive(self):
+        """Периодический ping: поддержание связи и переподключение к службе"""
+        # При разрыве ping сам переподключается к службе
+        if not self.daemon_client.ping():
+            if not self.connection_lost:
+                self.on_connection_lost()
+            return
+        
+        if self.connection_lost:
+            # Служба снова доступна - восстановление подписки и данных
+            self.connection_lost = False
+            self.connection_status_changed.emit(True, "Подключено к службе")
+            self.status_bar.showMessage("✓ Соединение со службой восстановлено", 3000)
+            self.subscribe_notifications()
+            self.refresh_all_views()
+    
+    def on_connection_lost(self):
+        """Обработка потери связи со службой"""
+        self.connection_lost = True
+        self.unsubscribe_notifications()
+        self.connection_status_changed.emit(False, "Потеряно соединение со службой")
+    
+    def update_status(self):
+        """Обновление статуса (по уведомлению службы)"""
+        if not self.daemon_client.is_connected:
             return
         
         # Обновление текущей активной вкладки
@@ -177,22 +293,68 @@ class SecureFSGuardGUI(QMainWindow):
         if hasattr(current_widget, 'refresh'):
             current_widget.refresh()
     
+    def set_auto_refresh(self, view: QWidget, enabled: bool):
+        """Подписка view на общий таймер автообновления"""
+        if enabled:
+            self.auto_refresh_views.add(view)
+        else:
+            self.auto_refresh_views.discard(view)
+        
+        if self.auto_refresh_views:
+            if not self.auto_refresh_timer.isActive():
+                self.auto_refresh_timer.start(self.AUTO_REFRESH_INTERVAL)
+        else:
+            self.auto_refresh_timer.stop()
+    
+    def auto_refresh_tick(self):
+        """Автообновление: статус и новые строки логов одним пакетом"""
+        if self.connection_lost or not self.daemon_client.is_connected:
+            return
+        
+        # Загрузка логов вкладкой ещё не завершена - курсор устарел
+        if self.logs_view.is_loading():
+            return
+        
+        success, dashboard, _ = self.daemon_client.get_dashboard(
+            self.logs_view.get_lines_count(),
+            self.logs_view.get_log_cursor()
+        )
+        if success:
+            self.apply_dashboard(dashboard)
+    
+    def apply_dashboard(self, dashboard: dict):
+        """Передача статуса и логов из пакетного ответа во view"""
+        self.main_view.apply_status(dashboard['status'])
+        logs = dashboard['logs']
+        self.logs_view.on_logs_loaded(
+            logs, normalize_logs(logs), dashboard['log_cursor'], dashboard['log_reset']
+        )
+    
     def refresh_all_views(self):
         """Обновление всех view"""
+        # Статус и логи запрашиваются одним пакетом
+        success, dashboard, _ = self.daemon_client.get_dashboard(self.logs_view.get_lines_count())
+        if success:
+            self.apply_dashboard(dashboard)
+        
         for i in range(self.tabs.count()):
             widget = self.tabs.widget(i)
+            if success and widget in (self.main_view, self.logs_view):
+                continue
             if hasattr(widget, 'refresh'):
                 widget.refresh()
     
     def closeEvent(self, event):
         """Обработка закрытия окна"""
+        # Отключение уведомлений и остановка таймеров
+        self.keepalive_timer.stop()
+        self.auto_refresh_timer.stop()
+        self.unsubscribe_notifications()
+        
         # Отключение от службы
         if self.daemon_client.is_connected:
             self.daemon_client.disconnect()
         
-        # Остановка таймера
-        self.status_timer.stop()
-        
         event.accept()
 
 
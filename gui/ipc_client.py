@@ -1,17 +1,195 @@
 # gui/ipc_client.py
 
 import json
+import select
+import selectors
 import socket
 import struct
-from typing import Tuple, Optional, Any
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple, Optional, Any, List, Callable
 from enum import Enum
 
-class IPCCommand(Enum):
-    """Команды IPC (дублирование из daemon)"""
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+# Поддерживаемые форматы сообщений (в порядке предпочтения)
+SUPPORTED_PROTOCOLS = ('msgpack', 'json') if MSGPACK_AVAILABLE else ('json',)
+
+def _json_dumps(obj: Any) -> bytes:
+    """Сериализация в JSON (orjson, если установлен - формат на проводе тот же)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode('utf-8')
+
+def _json_loads(data: bytes) -> Any:
+    """Разбор JSON (orjson.JSONDecodeError - подкласс json.JSONDecodeError)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _encode_message(obj: Any, protocol: str) -> bytes:
+    """Сериализация сообщения в формате соединения ('msgpack' или 'json')"""
+    if protocol == 'msgpack':
+        return msgpack.packb(obj, use_bin_type=True)
+    return _json_dumps(obj)
+
+def _decode_message(data: bytes) -> Tuple[Any, str]:
+    """
+    Разбор сообщения с определением формата
+    
+    JSON-объект всегда начинается с '{', словарь msgpack - с байта 0x80-0x8f,
+    0xde или 0xdf, поэтому формат определяется по первому байту
+    
+    Raises:
+        ValueError: неверный формат сообщения
+    """
+    if data[:1] == b'{' or not MSGPACK_AVAILABLE:
+        return _json_loads(data), 'json'
+    return msgpack.unpackb(data, raw=False, strict_map_key=False), 'msgpack'
+
+# Заголовок кадра: длина сообщения (big-endian uint32)
+_LEN = struct.Struct('!I')
+
+# Старший бит слова длины: тело кадра сжато lz4
+_COMPRESSED_FLAG = 0x80000000
+
+# Максимальное число буферов в одном sendmsg (IOV_MAX в Linux)
+_IOV_MAX = 1024
+
+def _send_buffers(sock: socket.socket, buffers: List[bytes], timeout: Optional[float] = None,
+                  on_readable: Optional[Callable[[], None]] = None):
+    """
+    Отправка нескольких буферов через sendmsg (scatter-gather, без склейки
+    в один bytes); недоотправленный остаток досылается
+    
+    Для неблокирующего сокета при заполненном буфере отправки ожидается
+    готовность к записи (не дольше timeout секунд), а если задан
+    on_readable - и готовность к чтению: он вызывается, чтобы прочитать
+    пришедшие данные, не дожидаясь конца отправки
+    """
+    views = [memoryview(buffer) for buffer in buffers if buffer]
+    while views:
+        try:
+            sent = sock.sendmsg(views[:_IOV_MAX])
+        except BlockingIOError:
+            readable, writable, _ = select.select((sock,) if on_readable else (), (sock,), (), timeout)
+            if readable:
+                on_readable()
+            elif not writable:
+                raise socket.timeout("Таймаут отправки")
+            continue
+        while sent:
+            if sent >= len(views[0]):
+                sent -= len(views[0])
+                views.pop(0)
+            else:
+                views[0] = views[0][sent:]
+                sent = 0
+
+class _FrameReader:
+    """
+    Буферизованное чтение из потокового сокета
+    
+    Данные читаются блоками: заголовок длины и тело небольшого сообщения
+    (а при конвейерной отправке - и следующие кадры) приходят одним recv
+    вместо двух. Большие сообщения дочитываются recv_into сразу в буфер
+    результата
+    """
+    
+    # Размер блока чтения
+    BUFFER_SIZE = 64 * 1024
+    
+    def __init__(self, sock: socket.socket, timeout: Optional[float] = None):
+        """
+        Args:
+            sock: сокет (неблокирующий, если задан timeout)
+            timeout: ожидание данных через селектор (секунды)
+        """
+        self.sock = sock
+        self.buffer = bytearray()
+        self.timeout = timeout
+        self.selector: Optional[selectors.BaseSelector] = None
+        if timeout is not None:
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(sock, selectors.EVENT_READ)
+    
+    def close(self):
+        """Освобождение селектора"""
+        if self.selector:
+            self.selector.close()
+            self.selector = None
+    
+    def _wait(self):
+        """Ожидание данных в сокете (таймаут - единственный путь с исключением)"""
+        if self.selector and not self.selector.select(self.timeout):
+            raise socket.timeout("Таймаут ожидания ответа")
+    
+    def read(self, length: int) -> Optional[bytearray]:
+        """
+        Чтение точного количества байт
+        
+        Returns:
+            данные или None, если соединение закрыто
+        """
+        buffered = len(self.buffer)
+        if buffered >= length:
+            data = self.buffer[:length]
+            del self.buffer[:length]
+            return data
+        
+        data = bytearray(length)
+        data[:buffered] = self.buffer
+        self.buffer.clear()
+        view = memoryview(data)
+        received = buffered
+        while received < length:
+            if length - received < self.BUFFER_SIZE:
+                # Остаток меньше блока: читается целый блок, лишнее
+                # (начало следующего кадра) остаётся в буфере
+                self._wait()
+                chunk = self.sock.recv(self.BUFFER_SIZE)
+                if not chunk:
+                    return None
+                count = min(len(chunk), length - received)
+                view[received:received + count] = chunk[:count]
+                self.buffer += chunk[count:]
+            else:
+                self._wait()
+                count = self.sock.recv_into(view[received:])
+                if not count:
+                    return None
+            received += count
+        return data
+
+class IPCCommand(str, Enum):
+    """
+    Команды IPC (дублирование из daemon)
+    
+    Наследуется от str: элемент сам является строкой команды и кладётся
+    в сообщение без обращения к .value
+    """
     # Статус системы
     GET_STATUS = "get_status"
     GET_STATISTICS = "get_statistics"
     GET_LOGS = "get_logs"
+    GET_LOGS_SINCE = "get_logs_since"
     
     # Управление режимами
     ENTER_INIT_MODE = "enter_init_mode"
@@ -28,6 +206,7 @@ class IPCCommand(Enum):
     # Управление файлами
     GET_FILES = "get_files"
     GET_FILE_INFO = "get_file_info"
+    GET_FILE_INFOS = "get_file_infos"
     CHECK_FILE = "check_file"
     RESTORE_FILE = "restore_file"
     
@@ -47,6 +226,9 @@ class IPCCommand(Enum):
     # Система
     SHUTDOWN = "shutdown"
     PING = "ping"
+    
+    # Подписка на уведомления (соединение переводится в режим push)
+    SUBSCRIBE = "subscribe"
 
 class DaemonClient:
     """
@@ -56,6 +238,24 @@ class DaemonClient:
     """
     
     IPCCommand = IPCCommand
+    
+    # Размер буферов сокета: ответ GET_FILES/GET_FILE_INFOS передаётся
+    # за меньшее число циклов записи/чтения
+    SOCKET_BUFFER_SIZE = 256 * 1024
+    
+    # Таймаут подключения и ожидания ответа службы (секунды)
+    RESPONSE_TIMEOUT = 5.0
+    
+    # Время жизни записи кэша информации о файлах (секунды)
+    INFO_CACHE_TTL = 30.0
+    
+    # Максимальное число записей кэша (вытесняются давно использованные)
+    INFO_CACHE_MAX_ENTRIES = 4096
+    
+    # Время жизни кэша путей и конфигурации (секунды); кэш общий для всех
+    # вкладок и сбрасывается при изменении настроек
+    SETTINGS_CACHE_TTL = 5.0
+    
     def __init__(self, socket_path: str = "/var/run/secure_fs_guard.sock"):
         """
         Args:
@@ -63,7 +263,30 @@ class DaemonClient:
         """
         self.socket_path = socket_path
         self.client_socket: Optional[socket.socket] = None
+        self._reader: Optional[_FrameReader] = None  # Чтение ответов основного соединения
         self.is_connected = False
+        
+        # Формат сообщений (согласуется при подключении через PING)
+        self.protocol = 'json'
+        
+        # Отдельное соединение для уведомлений службы (push)
+        self.notify_socket: Optional[socket.socket] = None
+        
+        # Запросы из разных потоков GUI не перемешиваются в одном соединении
+        # (RLock: подключение внутри запроса само отправляет PING)
+        self._request_lock = threading.RLock()
+        
+        # Переподключаться ли автоматически при разрыве (после connect()
+        # и до явного disconnect())
+        self._auto_reconnect = False
+        
+        # Кэш информации о файлах: путь -> (время получения, информация)
+        # (используется и из потоков загрузки GUI)
+        self._info_cache: OrderedDict = OrderedDict()
+        self._info_cache_lock = threading.Lock()
+        
+        # Кэш путей и конфигурации: (время получения, {'paths', 'config'})
+        self._settings_cache: Optional[Tuple[float, dict]] = None
     
     def connect(self) -> Tuple[bool, str]:
         """
@@ -75,11 +298,26 @@ class DaemonClient:
         if self.is_connected:
             return True, "Уже подключён"
         
+        # Сокет, оставшийся после таймаута или разрыва, не переиспользуется
+        self._close_client_socket()
+        
         try:
             self.client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-            self.client_socket.settimeout(5.0)  # Таймаут 5 секунд
+            self.client_socket.settimeout(self.RESPONSE_TIMEOUT)
+            self._configure_socket(self.client_socket)
             self.client_socket.connect(self.socket_path)
+            
+            # Дальше сокет неблокирующий: готовность ответа ожидается
+            # селектором, без poll() перед каждым send/recv
+            self.client_socket.setblocking(False)
+            self._reader = _FrameReader(self.client_socket, self.RESPONSE_TIMEOUT)
             self.is_connected = True
+            self._auto_reconnect = True
+            if not self._negotiate_protocol():
+                # Опоздавший ответ на PING был бы прочитан как ответ
+                # на следующую команду - сокет закрывается
+                self._close_client_socket()
+                return False, "Служба не ответила на согласование протокола"
             return True, "Подключение установлено"
         
         except FileNotFoundError:
@@ -93,8 +331,30 @@ class DaemonClient:
         except Exception as e:
             return False, f"Ошибка подключения: {e}"
     
+    def _configure_socket(self, sock: socket.socket):
+        """
+        Увеличение буферов сокета
+        
+        Алгоритм Нейгла и отложенные ACK относятся к TCP и на UNIX socket
+        не действуют, поэтому настраиваются только буферы
+        """
+        for option in (socket.SO_SNDBUF, socket.SO_RCVBUF):
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, option, self.SOCKET_BUFFER_SIZE)
+            except OSError:
+                pass
+    
     def disconnect(self):
         """Отключение от службы"""
+        self._auto_reconnect = False
+        self.unsubscribe()
+        self._close_client_socket()
+    
+    def _close_client_socket(self):
+        """Закрытие основного соединения"""
+        if self._reader:
+            self._reader.close()
+            self._reader = None
         if self.client_socket:
             try:
                 self.client_socket.close()
@@ -102,6 +362,50 @@ class DaemonClient:
                 pass
             self.client_socket = None
         self.is_connected = False
+        self.protocol = 'json'
+    
+    def _ensure_connected(self) -> bool:
+        """
+        Проверка соединения перед запросом
+        
+        Разорванное соединение (например, после перезапуска службы)
+        восстанавливается прозрачно для вызывающего кода
+        
+        Returns:
+            True, если соединение готово к запросу
+        """
+        if self.is_connected:
+            return True
+        
+        if not self._auto_reconnect:
+            return False
+        
+        self.connect()
+        return self.is_connected
+    
+    def _negotiate_protocol(self) -> bool:
+        """
+        Выбор формата сообщений и сжатия
+        
+        Первый PING отправляется в JSON; если служба сообщает поддержку
+        msgpack, дальнейшие запросы отправляются в msgpack (служба отвечает
+        в формате запроса, старая служба продолжает работать с JSON).
+        В том же PING клиент сообщает о поддержке lz4 - служба сжимает
+        большие ответы этого соединения, только получив такой запрос
+        
+        Returns:
+            False, если соединение потеряно (таймаут или разрыв)
+        """
+        self.protocol = 'json'
+        if not MSGPACK_AVAILABLE and not LZ4_AVAILABLE:
+            return True
+        
+        params = {'compression': ['lz4']} if LZ4_AVAILABLE else None
+        success, data, _ = self.send_command(IPCCommand.PING, params)
+        if (MSGPACK_AVAILABLE and success and isinstance(data, dict)
+                and 'msgpack' in data.get('protocols', ())):
+            self.protocol = 'msgpack'
+        return self.is_connected
     
     def send_command(self, command: IPCCommand, params: dict = None) -> Tuple[bool, Any, str]:
         """
@@ -114,60 +418,218 @@ class DaemonClient:
         Returns:
             (успешность, данные, ошибка)
         """
-        if not self.is_connected:
-            return False, None, "Не подключён к службе"
+        with self._request_lock:
+            if not self._ensure_connected():
+                return False, None, "Не подключён к службе"
+            
+            try:
+                # Формирование сообщения
+                message = {
+                    'command': command,
+                    'params': params or {}
+                }
+                
+                message_bytes = _encode_message(message, self.protocol)
+                
+                # Отправка длины + данных одним sendmsg
+                _send_buffers(self.client_socket, [_LEN.pack(len(message_bytes)), message_bytes],
+                              self.RESPONSE_TIMEOUT)
+                
+                # Получение ответа
+                response_data = self._read_response()
+                if not response_data:
+                    self.is_connected = False
+                    return False, None, "Соединение разорвано"
+                
+                # Парсинг ответа
+                response, _ = _decode_message(response_data)
+                
+                return response['success'], response.get('data'), response.get('error', '')
+            
+            except socket.timeout:
+                # Опоздавший ответ нарушил бы порядок кадров - соединение
+                # пересоздаётся при следующем запросе
+                self.is_connected = False
+                return False, None, "Таймаут ожидания ответа"
+            except ValueError:
+                return False, None, "Неверный формат ответа"
+            except Exception as e:
+                self.is_connected = False
+                return False, None, f"Ошибка отправки команды: {e}"
+    
+    def subscribe(self) -> Optional[int]:
+        """
+        Подписка на уведомления службы
+        
+        Открывает второе соединение, по которому служба присылает только
+        уведомления (статус, нарушения) - основное соединение остаётся
+        в режиме запрос-ответ
+        
+        Returns:
+            файловый дескриптор соединения уведомлений или None
+        """
+        self.unsubscribe()
         
         try:
-            # Формирование сообщения
-            message = {
-                'command': command.value,
-                'params': params or {}
-            }
-            
-            message_json = json.dumps(message)
-            message_bytes = message_json.encode('utf-8')
+            notify_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            notify_socket.settimeout(5.0)
+            self._configure_socket(notify_socket)
+            notify_socket.connect(self.socket_path)
             
-            # Отправка длины + данных
-            length = struct.pack('!I', len(message_bytes))
-            self.client_socket.sendall(length + message_bytes)
+            message_bytes = _json_dumps({'command': IPCCommand.SUBSCRIBE.value, 'params': {}})
+            _send_buffers(notify_socket, [_LEN.pack(len(message_bytes)), message_bytes])
             
-            # Получение ответа
-            # Чтение длины
-            length_data = self._recv_exact(4)
+            length_data = self._recv_exact(4, notify_socket)
             if not length_data:
-                self.is_connected = False
-                return False, None, "Соединение разорвано"
+                notify_socket.close()
+                return None
+            response_data = self._recv_exact(_LEN.unpack(length_data)[0], notify_socket)
+            if not response_data or not _decode_message(response_data)[0].get('success'):
+                notify_socket.close()
+                return None
+        
+        except (OSError, ValueError):
+            return None
+        
+        self.notify_socket = notify_socket
+        return notify_socket.fileno()
+    
+    def unsubscribe(self):
+        """Закрытие соединения уведомлений"""
+        if self.notify_socket:
+            try:
+                self.notify_socket.close()
+            except:
+                pass
+            self.notify_socket = None
+    
+    def read_notification(self) -> Optional[dict]:
+        """
+        Чтение одного уведомления (вызывается, когда в сокете есть данные)
+        
+        Returns:
+            уведомление {'notification_type', 'data', ...} или None,
+            если соединение разорвано
+        """
+        if not self.notify_socket:
+            return None
+        
+        try:
+            length_data = self._recv_exact(4, self.notify_socket)
+            if length_data:
+                response_data = self._recv_exact(_LEN.unpack(length_data)[0], self.notify_socket)
+                if response_data:
+                    notification = _decode_message(response_data)[0].get('data') or {}
+                    self._invalidate_by_notification(notification)
+                    return notification
+        except (OSError, ValueError):
+            pass
+        
+        self.unsubscribe()
+        return None
+    
+    def _invalidate_by_notification(self, notification: dict):
+        """Сброс устаревших записей кэша по уведомлению службы"""
+        notification_type = notification.get('notification_type')
+        data = notification.get('data') or {}
+        
+        if notification_type in ('file_changed', 'violation_detected'):
+            self.invalidate(data.get('file_path'))
+        elif notification_type == 'initialization_complete':
+            self.invalidate()
+        elif notification_type == 'settings_changed':
+            self.invalidate_settings()
+        elif notification_type == 'resync':
+            # Часть уведомлений пропущена - кэшу доверять нельзя
+            self.invalidate()
+            self.invalidate_settings()
+    
+    def send_command_batch(self, commands: List[Tuple[IPCCommand, Optional[dict]]]) -> List[Tuple[bool, Any, str]]:
+        """
+        Отправка нескольких команд одним вызовом sendmsg
+        
+        Служба обрабатывает сообщения соединения по порядку, поэтому ответы
+        читаются в порядке команд - вместо N ожиданий ответа одно
+        
+        Args:
+            commands: список (команда, параметры)
+            
+        Returns:
+            список (успешность, данные, ошибка) в порядке команд
+        """
+        with self._request_lock:
+            if not self._ensure_connected():
+                return [(False, None, "Не подключён к службе")] * len(commands)
             
-            response_length = struct.unpack('!I', length_data)[0]
+            results = []
             
-            # Чтение данных
-            response_data = self._recv_exact(response_length)
-            if not response_data:
-                self.is_connected = False
-                return False, None, "Соединение разорвано"
+            def read_result():
+                response_data = self._read_response()
+                if not response_data:
+                    raise ConnectionError("Соединение разорвано")
+                
+                response, _ = _decode_message(response_data)
+                results.append((response['success'], response.get('data'), response.get('error', '')))
             
-            # Парсинг ответа
-            response = json.loads(response_data.decode('utf-8'))
+            try:
+                frames = []
+                for command, params in commands:
+                    message_bytes = _encode_message({'command': command, 'params': params or {}},
+                                                    self.protocol)
+                    frames.append(_LEN.pack(len(message_bytes)))
+                    frames.append(message_bytes)
+                
+                # Пока буфер отправки заполнен, читаются готовые ответы:
+                # служба, ожидающая отправки ответа, не читает новые команды
+                _send_buffers(self.client_socket, frames, self.RESPONSE_TIMEOUT, read_result)
+                
+                while len(results) < len(commands):
+                    read_result()
+            
+            except Exception:
+                # После таймаута или ошибки разбора оставшиеся ответы нельзя
+                # сопоставить с командами - соединение считается разорванным
+                self.is_connected = False
             
-            return response['success'], response.get('data'), response.get('error', '')
+            # Команды без ответа
+            error = "Соединение разорвано"
+            results.extend((False, None, error) for _ in range(len(commands) - len(results)))
+            return results
+    
+    def _read_response(self) -> Optional[bytes]:
+        """
+        Чтение кадра ответа из основного соединения
         
-        except socket.timeout:
-            return False, None, "Таймаут ожидания ответа"
-        except json.JSONDecodeError:
-            return False, None, "Неверный формат ответа"
-        except Exception as e:
-            self.is_connected = False
-            return False, None, f"Ошибка отправки команды: {e}"
+        Returns:
+            тело ответа (распакованное, если служба его сжала) или None,
+            если соединение закрыто
+        """
+        length_data = self._reader.read(4)
+        if not length_data:
+            return None
+        
+        header = _LEN.unpack(length_data)[0]
+        response_data = self._reader.read(header & ~_COMPRESSED_FLAG)
+        if response_data and header & _COMPRESSED_FLAG:
+            return lz4.frame.decompress(response_data)
+        return response_data
     
-    def _recv_exact(self, length: int) -> Optional[bytes]:
-        """Чтение точного количества байт"""
-        data = b''
-        while len(data) < length:
+    def _recv_exact(self, length: int, sock: socket.socket) -> Optional[bytearray]:
+        """
+        Чтение точного количества байт из соединения уведомлений
+        
+        Без буферизации: остаток в буфере не разбудил бы QSocketNotifier.
+        Данные читаются сразу в буфер нужного размера, без склейки частей
+        """
+        data = bytearray(length)
+        view = memoryview(data)
+        received = 0
+        while received < length:
             try:
-                chunk = self.client_socket.recv(length - len(data))
-                if not chunk:
+                count = sock.recv_into(view[received:])
+                if not count:
                     return None
-                data += chunk
+                received += count
             except socket.timeout:
                 return None
         return data
@@ -189,6 +651,54 @@ class DaemonClient:
             return True, data.get('logs', []), ""
         return False, [], error
     
+    def get_logs_since(self, cursor: Optional[list] = None, lines: int = 100) -> Tuple[bool, dict, str]:
+        """
+        Получение записей лога, добавленных после курсора
+        
+        Args:
+            cursor: курсор из предыдущего ответа (None - последние lines строк)
+            lines: максимальное количество строк
+            
+        Returns:
+            (успешность, {'logs': новые строки, 'cursor': курсор,
+             'reset': строки заменяют полученные ранее}, ошибка)
+        """
+        success, data, error = self.send_command(IPCCommand.GET_LOGS_SINCE, {
+            'cursor': cursor,
+            'lines': lines
+        })
+        if success and data:
+            return True, data, ""
+        return False, {}, error
+    
+    def get_dashboard(self, lines: int = 100, log_cursor: Optional[list] = None) -> Tuple[bool, dict, str]:
+        """
+        Получение статуса и логов одним обменом (пакет GET_STATUS + GET_LOGS_SINCE)
+        
+        Args:
+            lines: максимальное количество строк логов
+            log_cursor: курсор логов (None - последние lines строк)
+            
+        Returns:
+            (успешность, {'status': статус, 'logs': логи,
+             'log_cursor': курсор для следующего запроса,
+             'log_reset': логи заменяют полученные ранее}, ошибка)
+        """
+        (status_ok, status, status_error), (logs_ok, logs, logs_error) = self.send_command_batch([
+            (IPCCommand.GET_STATUS, None),
+            (IPCCommand.GET_LOGS_SINCE, {'cursor': log_cursor, 'lines': lines}),
+        ])
+        
+        if not status_ok or not logs_ok:
+            return False, {}, status_error or logs_error
+        logs = logs or {}
+        return True, {
+            'status': status or {},
+            'logs': logs.get('logs', []),
+            'log_cursor': logs.get('cursor'),
+            'log_reset': logs.get('reset', True)
+        }, ""
+    
     def enter_init_mode(self, admin_user: str = "gui") -> Tuple[bool, str, str]:
         """Вход в режим инициализации"""
         success, data, error = self.send_command(IPCCommand.ENTER_INIT_MODE, {'admin_user': admin_user})
@@ -234,9 +744,36 @@ class DaemonClient:
             'admin_user': admin_user
         })
         if success and data:
+            self.invalidate_settings()
             return True, data.get('message', ''), ""
         return False, "", error
     
+    def add_paths(self, paths: List[str], admin_user: str = "gui") -> Tuple[bool, dict, str]:
+        """
+        Добавление набора защищаемых путей одним пакетом команд ADD_PATH
+        
+        Returns:
+            (все ли добавлены, {'added': [пути], 'failed': [(путь, ошибка)]}, ошибка)
+        """
+        results = self.send_command_batch([
+            (IPCCommand.ADD_PATH, {'path': path, 'admin_user': admin_user})
+            for path in paths
+        ])
+        
+        added = []
+        failed = []
+        for path, (success, data, error) in zip(paths, results):
+            if success and data:
+                added.append(path)
+            else:
+                failed.append((path, error))
+        
+        if added:
+            self.invalidate_settings()
+        
+        error = failed[0][1] if failed else ""
+        return not failed, {'added': added, 'failed': failed}, error
+    
     def remove_path(self, path: str, admin_user: str = "gui") -> Tuple[bool, str, str]:
         """Удаление защищаемого пути"""
         success, data, error = self.send_command(IPCCommand.REMOVE_PATH, {
@@ -244,6 +781,7 @@ class DaemonClient:
             'admin_user': admin_user
         })
         if success and data:
+            self.invalidate_settings()
             return True, data.get('message', ''), ""
         return False, "", error
     
@@ -261,17 +799,95 @@ class DaemonClient:
             return True, data.get('files', []), ""
         return False, [], error
     
+    def _cached_info(self, file_path: str) -> Optional[dict]:
+        """Информация о файле из кэша (None - нет записи или она устарела)"""
+        with self._info_cache_lock:
+            entry = self._info_cache.get(file_path)
+            if entry is None:
+                return None
+            
+            fetched_at, info = entry
+            if time.monotonic() - fetched_at > self.INFO_CACHE_TTL:
+                del self._info_cache[file_path]
+                return None
+            
+            self._info_cache.move_to_end(file_path)
+            return info
+    
+    def _cache_info(self, file_path: str, info: dict):
+        """Сохранение информации о файле в кэш"""
+        with self._info_cache_lock:
+            self._info_cache[file_path] = (time.monotonic(), info)
+            self._info_cache.move_to_end(file_path)
+            
+            while len(self._info_cache) > self.INFO_CACHE_MAX_ENTRIES:
+                self._info_cache.popitem(last=False)
+    
+    def invalidate(self, file_path: Optional[str] = None):
+        """
+        Сброс кэша информации о файлах
+        
+        Args:
+            file_path: путь к файлу (None - сбросить весь кэш)
+        """
+        with self._info_cache_lock:
+            if file_path is None:
+                self._info_cache.clear()
+            else:
+                self._info_cache.pop(file_path, None)
+    
+    def invalidate_settings(self):
+        """Сброс кэша путей и конфигурации"""
+        self._settings_cache = None
+    
     def get_file_info(self, file_path: str) -> Tuple[bool, dict, str]:
-        """Получение информации о файле"""
-        return self.send_command(IPCCommand.GET_FILE_INFO, {'file_path': file_path})
+        """Получение информации о файле (с кэшированием)"""
+        info = self._cached_info(file_path)
+        if info is not None:
+            return True, info, ""
+        
+        success, info, error = self.send_command(IPCCommand.GET_FILE_INFO, {'file_path': file_path})
+        if success and info:
+            self._cache_info(file_path, info)
+        return success, info, error
+    
+    def get_file_infos(self, file_paths: List[str]) -> Tuple[bool, dict, str]:
+        """
+        Получение информации о наборе файлов одним запросом ({путь: информация})
+        
+        У службы запрашиваются только файлы, которых нет в кэше
+        """
+        infos = {}
+        missing = []
+        for file_path in file_paths:
+            info = self._cached_info(file_path)
+            if info is not None:
+                infos[file_path] = info
+            else:
+                missing.append(file_path)
+        
+        if not missing:
+            return True, infos, ""
+        
+        success, data, error = self.send_command(IPCCommand.GET_FILE_INFOS, {'file_paths': missing})
+        if success and data:
+            for file_path, info in data.get('files', {}).items():
+                self._cache_info(file_path, info)
+                infos[file_path] = info
+            return True, infos, ""
+        return False, {}, error
     
     def check_file(self, file_path: str) -> Tuple[bool, dict, str]:
         """Проверка целостности файла"""
-        return self.send_command(IPCCommand.CHECK_FILE, {'file_path': file_path})
+        success, data, error = self.send_command(IPCCommand.CHECK_FILE, {'file_path': file_path})
+        if not success or (data or {}).get('change_type') != 'NO_CHANGE':
+            self.invalidate(file_path)
+        return success, data, error
     
     def restore_file(self, file_path: str) -> Tuple[bool, str, str]:
         """Восстановление файла"""
         success, data, error = self.send_command(IPCCommand.RESTORE_FILE, {'file_path': file_path})
+        self.invalidate(file_path)
         if success and data:
             return True, data.get('message', ''), ""
         return False, "", error
@@ -287,6 +903,43 @@ class DaemonClient:
         """Получение конфигурации"""
         return self.send_command(IPCCommand.GET_CONFIG)
     
+    def update_config(self, config: dict) -> Tuple[bool, dict, str]:
+        """Обновление конфигурации"""
+        success, data, error = self.send_command(IPCCommand.UPDATE_CONFIG, config)
+        if success:
+            self.invalidate_settings()
+        return success, data, error
+    
+    def get_settings(self, force: bool = False) -> Tuple[bool, dict, str]:
+        """
+        Получение путей и конфигурации одним обменом (пакет GET_PATHS + GET_CONFIG)
+        
+        Результат кэшируется на SETTINGS_CACHE_TTL и используется всеми
+        вкладками; кэш сбрасывается изменением путей, конфигурации и
+        уведомлением службы settings_changed
+        
+        Args:
+            force: запросить службу, не используя кэш
+            
+        Returns:
+            (успешность, {'paths': пути, 'config': конфигурация}, ошибка)
+        """
+        cached = self._settings_cache
+        if not force and cached is not None and time.monotonic() - cached[0] < self.SETTINGS_CACHE_TTL:
+            return True, cached[1], ""
+        
+        (paths_ok, paths, paths_error), (config_ok, config, config_error) = self.send_command_batch([
+            (IPCCommand.GET_PATHS, None),
+            (IPCCommand.GET_CONFIG, None),
+        ])
+        
+        if not paths_ok or not config_ok:
+            return False, {}, paths_error or config_error
+        
+        settings = {'paths': (paths or {}).get('paths', []), 'config': config or {}}
+        self._settings_cache = (time.monotonic(), settings)
+        return True, settings, ""
+    
     def ping(self) -> bool:
         """Проверка связи со службой"""
         success, data, error = self.send_command(IPCCommand.PING)
@@ -1,14 +1,123 @@
 # gui/views/integrity_view.py
 
+from typing import NamedTuple, Optional
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox,
-    QTableWidget, QTableWidgetItem, QPushButton, QMessageBox,
+    QTableView, QPushButton, QMessageBox,
     QLabel, QHeaderView, QAbstractItemView, QLineEdit, QProgressDialog
 )
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtCore import (
+    Qt, QThread, QTimer, Signal, QAbstractTableModel, QModelIndex,
+    QSortFilterProxyModel
+)
 from PySide6.QtGui import QColor, QFont
 
 
+class FileInfo(NamedTuple):
+    """Информация о защищённом файле (строка таблицы целостности)"""
+    path: str
+    size: int
+    blocks: int
+    is_trusted: bool
+    created_at: str
+    updated_at: str
+    backup_path: Optional[str]
+    
+    @classmethod
+    def from_dict(cls, info: dict) -> 'FileInfo':
+        """Построение из ответа службы (один раз при загрузке)"""
+        return cls(
+            info['file_path'],
+            info['file_size'],
+            info['blocks_count'],
+            info['is_trusted'],
+            info['created_at'],
+            info['updated_at'],
+            info.get('backup_path')
+        )
+
+
+# Единицы размера: индекс вычисляется по числу бит размера
+_UNITS = (('B', 1), ('KB', 1024), ('MB', 1024 ** 2), ('GB', 1024 ** 3))
+
+def format_size(size: int) -> str:
+    """Форматирование размера файла"""
+    # Каждые 10 бит - следующая единица (1024 = 2**10)
+    index = min(max(size.bit_length() - 1, 0) // 10, len(_UNITS) - 1)
+    unit, divisor = _UNITS[index]
+    
+    if index == 0:
+        return f"{size} {unit}"
+    return f"{size / divisor:.1f} {unit}"
+
+
+class FileInfoModel(QAbstractTableModel):
+    """
+    Модель таблицы файлов
+    
+    Представление запрашивает данные только видимых строк, поэтому
+    строки форматируются лениво, без создания элемента на каждую ячейку
+    """
+    
+    HEADERS = ("Путь к файлу", "Размер", "Блоков", "Обновлён", "Статус")
+    
+    # Цвета статуса (создаются один раз, а не на каждую строку)
+    _GREEN = QColor(0, 128, 0)
+    _RED = QColor(220, 0, 0)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.files = []  # Список FileInfo
+    
+    def set_files(self, files: list):
+        """Замена содержимого модели"""
+        self.beginResetModel()
+        self.files = files
+        self.endResetModel()
+    
+    def file_at(self, row: int) -> FileInfo:
+        """Информация о файле в строке модели"""
+        return self.files[row]
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.files)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        file_info = self.files[index.row()]
+        column = index.column()
+        
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return file_info.path
+            elif column == 1:
+                return format_size(file_info.size)
+            elif column == 2:
+                return str(file_info.blocks)
+            elif column == 3:
+                return file_info.updated_at.split('T')[0]  # Только дата
+            else:
+                return "✓ Доверенный" if file_info.is_trusted else "⚠️ Не доверенный"
+        
+        if role == Qt.TextAlignmentRole and column > 0:
+            return Qt.AlignCenter
+        
+        if role == Qt.ForegroundRole and column == 4:
+            return self._GREEN if file_info.is_trusted else self._RED
+        
+        return None
+
+
 class FileCheckThread(QThread):
     """Поток для проверки файла"""
     finished = Signal(bool, dict, str)
@@ -23,6 +132,31 @@ class FileCheckThread(QThread):
         self.finished.emit(success, data or {}, error)
 
 
+class FileListLoaderThread(QThread):
+    """Поток для загрузки списка файлов с информацией о каждом"""
+    loaded = Signal(list)
+    failed = Signal(str)
+    
+    def __init__(self, daemon_client):
+        super().__init__()
+        self.daemon_client = daemon_client
+    
+    def run(self):
+        success, files, error = self.daemon_client.get_files()
+        
+        if not success:
+            self.failed.emit(error)
+            return
+        
+        # Загрузка информации обо всех файлах одним запросом
+        files_data = []
+        success, infos, error = self.daemon_client.get_file_infos(files)
+        if success:
+            files_data = [FileInfo.from_dict(infos[file_path]) for file_path in files if file_path in infos]
+        
+        self.loaded.emit(files_data)
+
+
 class IntegrityView(QWidget):
     """
     Вкладка целостности
@@ -33,11 +167,15 @@ class IntegrityView(QWidget):
     - Действия: проверка, восстановление
     """
     
+    # Задержка фильтрации после ввода (мс): серия нажатий - одна фильтрация
+    FILTER_DEBOUNCE_INTERVAL = 150
+    
     def __init__(self, daemon_client):
         super().__init__()
         self.daemon_client = daemon_client
         
-        self.files_data = []  # Список файлов
+        self.files_data = []  # Список файлов (FileInfo)
+        self.loader_thread = None  # Поток загрузки списка файлов
         
         self.init_ui()
     
@@ -65,21 +203,26 @@ class IntegrityView(QWidget):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Введите путь к файлу...")
-        self.search_input.textChanged.connect(self.filter_files)
+        self.search_input.textChanged.connect(self.schedule_filter)
         search_layout.addWidget(self.search_input)
         
         main_layout.addLayout(search_layout)
         
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.timeout.connect(self.filter_files)
+        
         # ========== Таблица файлов ==========
-        self.files_table = QTableWidget()
-        self.files_table.setColumnCount(5)
-        self.files_table.setHorizontalHeaderLabels([
-            "Путь к файлу",
-            "Размер",
-            "Блоков",
-            "Обновлён",
-            "Статус"
-        ])
+        self.files_model = FileInfoModel(self)
+        
+        # Фильтрация по пути выполняется прокси-моделью
+        self.files_proxy = QSortFilterProxyModel(self)
+        self.files_proxy.setSourceModel(self.files_model)
+        self.files_proxy.setFilterKeyColumn(0)
+        self.files_proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        
+        self.files_table = QTableView()
+        self.files_table.setModel(self.files_proxy)
         
         # Настройка таблицы
         self.files_table.setSelectionBehavior(QAbstractItemView.SelectRows)
@@ -122,30 +265,31 @@ class IntegrityView(QWidget):
         main_layout.addLayout(actions_layout)
     
     def refresh(self):
-        """Обновление списка файлов"""
+        """Обновление списка файлов (загрузка в отдельном потоке)"""
         if not self.daemon_client.is_connected:
             return
         
-        # Получение списка файлов
-        success, files, error = self.daemon_client.get_files()
-        
-        if not success:
-            QMessageBox.warning(
-                self,
-                "Ошибка",
-                f"Не удалось загрузить список файлов:\n{error}"
-            )
+        # Предыдущая загрузка ещё не завершена
+        if self.loader_thread is not None and self.loader_thread.isRunning():
             return
         
-        # Сохранение данных
-        self.files_data = []
+        # Создание диалога прогресса
+        progress = QProgressDialog("Загрузка списка файлов...", None, 0, 0, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setWindowTitle("Загрузка")
+        progress.show()
         
-        # Загрузка информации о каждом файле
-        for file_path in files:
-            success, info, error = self.daemon_client.get_file_info(file_path)
-            
-            if success:
-                self.files_data.append(info)
+        self.loader_thread = FileListLoaderThread(self.daemon_client)
+        self.loader_thread.loaded.connect(lambda files_data: self.on_files_loaded(files_data, progress))
+        self.loader_thread.failed.connect(lambda error: self.on_files_load_failed(error, progress))
+        self.loader_thread.start()
+    
+    def on_files_loaded(self, files_data: list, progress: QProgressDialog):
+        """Обработка загруженного списка файлов"""
+        progress.close()
+        
+        # Сохранение данных
+        self.files_data = files_data
         
         # Обновление таблицы
         self.update_table()
@@ -153,81 +297,41 @@ class IntegrityView(QWidget):
         # Обновление счётчика
         self.total_files_label.setText(f"Всего файлов: {len(self.files_data)}")
     
+    def on_files_load_failed(self, error: str, progress: QProgressDialog):
+        """Обработка ошибки загрузки списка файлов"""
+        progress.close()
+        
+        QMessageBox.warning(
+            self,
+            "Ошибка",
+            f"Не удалось загрузить список файлов:\n{error}"
+        )
+    
     def update_table(self):
         """Обновление таблицы файлов"""
-        # Фильтрация по поисковому запросу
-        search_text = self.search_input.text().lower()
-        
-        if search_text:
-            filtered_data = [
-                f for f in self.files_data
-                if search_text in f['file_path'].lower()
-            ]
-        else:
-            filtered_data = self.files_data
-        
-        # Заполнение таблицы
-        self.files_table.setRowCount(len(filtered_data))
-        
-        for row, file_info in enumerate(filtered_data):
-            # Путь
-            path_item = QTableWidgetItem(file_info['file_path'])
-            self.files_table.setItem(row, 0, path_item)
-            
-            # Размер
-            size = file_info['file_size']
-            size_str = self.format_size(size)
-            size_item = QTableWidgetItem(size_str)
-            size_item.setTextAlignment(Qt.AlignCenter)
-            self.files_table.setItem(row, 1, size_item)
-            
-            # Блоков
-            blocks_item = QTableWidgetItem(str(file_info['blocks_count']))
-            blocks_item.setTextAlignment(Qt.AlignCenter)
-            self.files_table.setItem(row, 2, blocks_item)
-            
-            # Обновлён
-            updated = file_info['updated_at'].split('T')[0]  # Только дата
-            updated_item = QTableWidgetItem(updated)
-            updated_item.setTextAlignment(Qt.AlignCenter)
-            self.files_table.setItem(row, 3, updated_item)
-            
-            # Статус
-            is_trusted = file_info['is_trusted']
-            status_item = QTableWidgetItem("✓ Доверенный" if is_trusted else "⚠️ Не доверенный")
-            status_item.setTextAlignment(Qt.AlignCenter)
-            
-            if is_trusted:
-                status_item.setForeground(QColor("green"))
-            else:
-                status_item.setForeground(QColor("red"))
-            
-            self.files_table.setItem(row, 4, status_item)
+        self.files_model.set_files(self.files_data)
+    
+    def schedule_filter(self):
+        """Отложенная фильтрация (перезапуск таймера при каждом нажатии)"""
+        self.filter_timer.start(self.FILTER_DEBOUNCE_INTERVAL)
     
     def filter_files(self):
         """Фильтрация файлов по поисковому запросу"""
-        self.update_table()
+        self.files_proxy.setFilterFixedString(self.search_input.text())
     
     def format_size(self, size: int) -> str:
         """Форматирование размера файла"""
-        if size < 1024:
-            return f"{size} B"
-        elif size < 1024 * 1024:
-            return f"{size / 1024:.1f} KB"
-        elif size < 1024 * 1024 * 1024:
-            return f"{size / (1024 * 1024):.1f} MB"
-        else:
-            return f"{size / (1024 * 1024 * 1024):.1f} GB"
+        return format_size(size)
     
     def get_selected_file_path(self) -> str:
         """Получение пути выбранного файла"""
-        current_row = self.files_table.currentRow()
+        current_index = self.files_table.currentIndex()
         
-        if current_row < 0:
+        if not current_index.isValid():
             return None
         
-        path_item = self.files_table.item(current_row, 0)
-        return path_item.text() if path_item else None
+        source_index = self.files_proxy.mapToSource(current_index)
+        return self.files_model.file_at(source_index.row()).path
     
     def check_selected_file(self):
         """Проверка целостности выбранного файла"""
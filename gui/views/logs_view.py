@@ -1,12 +1,207 @@
 # gui/views/logs_view.py
 
+import re
+from collections import OrderedDict
+from typing import Optional
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox,
-    QTextEdit, QPushButton, QLabel, QComboBox, QLineEdit,
+    QPlainTextEdit, QPushButton, QLabel, QComboBox, QLineEdit,
     QMessageBox, QCheckBox
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont, QTextCursor, QColor, QTextCharFormat
+from PySide6.QtCore import Qt, QTimer, QThread, Signal
+from PySide6.QtGui import QFont, QTextCursor, QTextCharFormat, QColor
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Ключевые слова категорий фильтра (без учёта регистра)
+FILTER_KEYWORDS = {
+    "SYSTEM_START / STOP": ("SYSTEM_START", "SYSTEM_STOP"),
+    "MODE (Режимы)": ("INIT_MODE", "UPDATE_MODE", "EMERGENCY_MODE"),
+    "FILE (Файлы)": ("FILE_ADDED", "FILE_VERIFIED", "FILE_MODIFIED"),
+    "VIOLATION (Нарушения)": ("UNAUTHORIZED", "SUSPICIOUS"),
+    "RESTORE (Восстановление)": ("RESTORED", "BACKUP"),
+    "RANSOMWARE": ("RANSOMWARE", "MASS_MODIFICATION"),
+    "EMERGENCY": ("EMERGENCY",),
+    "ERROR": ("[ERROR]",),
+    "WARNING": ("[WARNING]",),
+}
+
+# Бит категории фильтра в маске строки лога
+FILTER_TO_MASK = {category: 1 << bit for bit, category in enumerate(FILTER_KEYWORDS)}
+
+# Уровни строк логов по убыванию важности: (уровень, ключевые слова)
+SEVERITY_KEYWORDS = (
+    ('emergency', ("EMERGENCY", "RANSOMWARE")),
+    ('critical', ("CRITICAL", "UNAUTHORIZED")),
+    ('warning', ("WARNING", "SUSPICIOUS")),
+    ('error', ("ERROR",)),
+)
+
+# Ключевые слова в форме casefold: сравниваются со строкой лога, приведённой
+# к этой форме один раз при загрузке
+_FILTER_KEYWORDS_FOLDED = {
+    category: tuple(keyword.casefold() for keyword in keywords)
+    for category, keywords in FILTER_KEYWORDS.items()
+}
+_SEVERITY_KEYWORDS_FOLDED = tuple(
+    (level, tuple(keyword.casefold() for keyword in keywords))
+    for level, keywords in SEVERITY_KEYWORDS
+)
+
+# Уровень строки без ключевых слов
+DEFAULT_SEVERITY = 'info'
+
+# Оформление строки лога по уровню: (цвет, префикс)
+SEVERITY_STYLE = {
+    'emergency': ("#ff0000", "🚨 "),  # Красный
+    'critical': ("#dc0000", "🔴 "),  # Тёмно-красный
+    'warning': ("#ffa500", "🟡 "),  # Оранжевый
+    'error': ("#ff6464", "🔴 "),  # Светло-красный
+    'info': ("#646464", "🟢 "),  # Серый
+}
+
+def _keyword_values() -> dict:
+    """
+    Значения всех ключевых слов: слово -> (маска категорий фильтра, номер
+    уровня важности; len(SEVERITY_KEYWORDS) - слово не задаёт уровень)
+    """
+    keyword_masks = {}
+    for category, keywords in _FILTER_KEYWORDS_FOLDED.items():
+        for keyword in keywords:
+            keyword_masks[keyword] = keyword_masks.get(keyword, 0) | FILTER_TO_MASK[category]
+    
+    keyword_ranks = {}
+    for rank, (_, keywords) in enumerate(_SEVERITY_KEYWORDS_FOLDED):
+        for keyword in keywords:
+            keyword_ranks.setdefault(keyword, rank)
+    
+    return {
+        keyword: (keyword_masks.get(keyword, 0), keyword_ranks.get(keyword, len(SEVERITY_KEYWORDS)))
+        for keyword in keyword_masks.keys() | keyword_ranks.keys()
+    }
+
+def _build_keyword_automaton():
+    """Автомат Ахо-Корасик по всем ключевым словам"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, value in _keyword_values().items():
+        automaton.add_word(keyword, value)
+    automaton.make_automaton()
+    return automaton
+
+def _build_keyword_pattern() -> tuple:
+    """
+    Одно регулярное выражение по всем ключевым словам (без pyahocorasick)
+    
+    Просмотр вперёд находит слово, начинающееся в каждой позиции строки,
+    а значение слова включает значения входящих в него ключевых слов
+    (EMERGENCY_MODE - и EMERGENCY), поэтому результат совпадает с автоматом
+    
+    Returns:
+        (скомпилированное выражение, найденное слово -> значение)
+    """
+    values = _keyword_values()
+    closure = {}
+    for keyword in values:
+        mask, rank = 0, len(SEVERITY_KEYWORDS)
+        for other, (other_mask, other_rank) in values.items():
+            if other in keyword:
+                mask |= other_mask
+                rank = min(rank, other_rank)
+        closure[keyword] = (mask, rank)
+    
+    alternatives = '|'.join(re.escape(keyword) for keyword in sorted(values, key=len, reverse=True))
+    return re.compile(f'(?=({alternatives}))'), closure
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+_KEYWORD_PATTERN, _KEYWORD_PATTERN_VALUES = _build_keyword_pattern()
+
+def classify_log_line(log_folded: str) -> tuple:
+    """
+    Маска категорий фильтра и уровень важности строки лога (в форме casefold)
+    
+    Строка просматривается один раз для всех ключевых слов: автоматом
+    pyahocorasick, иначе - общим регулярным выражением
+    
+    Returns:
+        (маска категорий фильтра, уровень)
+    """
+    if _KEYWORD_AUTOMATON is not None:
+        values = (value for _, value in _KEYWORD_AUTOMATON.iter(log_folded))
+    else:
+        values = (_KEYWORD_PATTERN_VALUES[match.group(1)]
+                  for match in _KEYWORD_PATTERN.finditer(log_folded))
+    
+    tags = 0
+    rank = len(SEVERITY_KEYWORDS)
+    for keyword_mask, keyword_rank in values:
+        tags |= keyword_mask
+        rank = min(rank, keyword_rank)
+    
+    severity = SEVERITY_KEYWORDS[rank][0] if rank < len(SEVERITY_KEYWORDS) else DEFAULT_SEVERITY
+    return tags, severity
+
+def normalize_logs(logs: list) -> list:
+    """
+    Нормализация строк логов: (строка, форма casefold, маска категорий, уровень)
+    
+    Выполняется один раз при загрузке, а не при каждом изменении фильтра,
+    поиска или отрисовке; классификация и поиск используют одну и ту же
+    форму casefold, других преобразований регистра нет
+    """
+    logs_norm = []
+    for log_line in logs:
+        log_folded = log_line.casefold()
+        tags, severity = classify_log_line(log_folded)
+        logs_norm.append((log_line, log_folded, tags, severity))
+    return logs_norm
+
+class LogsLoaderThread(QThread):
+    """Поток для загрузки новых строк логов и их нормализации"""
+    loaded = Signal(list, list, object, bool)
+    failed = Signal(str)
+    
+    def __init__(self, daemon_client, cursor: Optional[list], lines: int):
+        super().__init__()
+        self.daemon_client = daemon_client
+        self.cursor = cursor
+        self.lines = lines
+    
+    def run(self):
+        success, data, error = self.daemon_client.get_logs_since(self.cursor, self.lines)
+        
+        if success:
+            logs = data.get('logs', [])
+            self.loaded.emit(logs, normalize_logs(logs), data.get('cursor'), data.get('reset', True))
+        else:
+            self.failed.emit(error)
+
+class LogsExportThread(QThread):
+    """Поток для записи логов в файл"""
+    saved = Signal(str)
+    failed = Signal(str)
+    
+    def __init__(self, logs: list, file_path: str):
+        super().__init__()
+        self.logs = logs
+        self.file_path = file_path
+    
+    def run(self):
+        try:
+            # Построчная запись без сборки всего текста в одну строку
+            with open(self.file_path, 'w', encoding='utf-8') as f:
+                f.writelines(f"{log_line}\n" for log_line in self.logs)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.saved.emit(self.file_path)
 
 
 class LogsView(QWidget):
@@ -20,15 +215,45 @@ class LogsView(QWidget):
     - Автоматическое обновление
     """
     
+    # Сигналы
+    auto_refresh_toggled = Signal(bool)
+    
+    # Задержка фильтрации после ввода (мс): серия нажатий - одна фильтрация
+    FILTER_DEBOUNCE_INTERVAL = 120
+    
+    # Число запомненных результатов фильтрации (переключение между
+    # недавними фильтрами и запросами не требует повторного просмотра строк)
+    FILTER_CACHE_SIZE = 16
+    
     def __init__(self, daemon_client):
         super().__init__()
         self.daemon_client = daemon_client
         
         self.all_logs = []  # Все логи
+        self.all_logs_norm = []  # (строка, форма casefold, маска категорий, уровень)
+        self._last_filter = None  # (фильтр, поисковый запрос, результат)
+        self._filter_cache = OrderedDict()  # LRU: (фильтр, поисковый запрос) -> индексы строк
+        self._search_text = ""  # Поисковый запрос в форме casefold
+        self.loader_thread = None  # Поток загрузки логов
+        self.export_thread = None  # Поток экспорта логов
+        self._log_cursor = None  # Курсор службы: позиция последней полученной строки
+        self._visible_lines = set()  # Индексы строк, блоки которых видимы
+        self._rendered = False  # Строки выведены в область логов
+        self._severity_formats = self._build_severity_formats()  # Уровень -> (формат, префикс)
         self.auto_refresh = False
         
         self.init_ui()
     
+    @staticmethod
+    def _build_severity_formats() -> dict:
+        """Форматы текста по уровням: создаются один раз, а не для каждой строки"""
+        formats = {}
+        for severity, (color, prefix) in SEVERITY_STYLE.items():
+            fmt = QTextCharFormat()
+            fmt.setForeground(QColor(color))
+            formats[severity] = (fmt, prefix)
+        return formats
+    
     def init_ui(self):
         """Инициализация интерфейса"""
         main_layout = QVBoxLayout(self)
@@ -67,11 +292,15 @@ class LogsView(QWidget):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Введите текст для поиска...")
-        self.search_input.textChanged.connect(self.apply_filter)
+        self.search_input.textChanged.connect(self.schedule_filter)
         filter_layout.addWidget(self.search_input)
         
         control_layout.addLayout(filter_layout)
         
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        
         # Вторая строка: количество строк и обновление
         options_layout = QHBoxLayout()
         
@@ -124,10 +353,13 @@ class LogsView(QWidget):
         main_layout.addLayout(info_layout)
         
         # ========== Область логов ==========
-        self.log_display = QTextEdit()
+        # QPlainTextEdit - виджет для больших построчных текстов, число
+        # строк (блоков) ограничено выбранным количеством строк логов
+        self.log_display = QPlainTextEdit()
         self.log_display.setReadOnly(True)
         self.log_display.setFont(QFont("Courier New", 9))
-        self.log_display.setLineWrapMode(QTextEdit.NoWrap)
+        self.log_display.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.lines_combo.currentTextChanged.connect(self.on_lines_changed)
         
         main_layout.addWidget(self.log_display)
         
@@ -151,48 +383,97 @@ class LogsView(QWidget):
         main_layout.addLayout(legend_layout)
     
     def refresh(self):
-        """Обновление логов"""
+        """Обновление логов (загрузка в отдельном потоке)"""
         if not self.daemon_client.is_connected:
             return
         
+        # Предыдущая загрузка ещё не завершена
+        if self.is_loading():
+            return
+        
         # Получение количества строк
         lines = int(self.lines_combo.currentText())
         
-        # Загрузка логов
-        success, logs, error = self.daemon_client.get_logs(lines)
-        
-        if success:
-            self.all_logs = logs
-            self.info_label.setText(f"Всего событий: {len(logs)}")
+        # Запрашиваются только строки, добавленные после курсора
+        self.loader_thread = LogsLoaderThread(self.daemon_client, self._log_cursor, lines)
+        self.loader_thread.loaded.connect(self.on_logs_loaded)
+        self.loader_thread.failed.connect(self.on_logs_load_failed)
+        self.loader_thread.start()
+    
+    def is_loading(self) -> bool:
+        """Выполняется ли загрузка логов в отдельном потоке"""
+        return self.loader_thread is not None and self.loader_thread.isRunning()
+    
+    def get_log_cursor(self) -> Optional[list]:
+        """Курсор службы для запроса новых строк логов"""
+        return self._log_cursor
+    
+    def get_lines_count(self) -> int:
+        """Выбранное количество строк логов"""
+        return int(self.lines_combo.currentText())
+    
+    def on_logs_loaded(self, logs: list, logs_norm: list,
+                       cursor: Optional[list] = None, reset: bool = True):
+        """
+        Обработка загруженных логов
+        
+        Args:
+            logs: строки логов
+            logs_norm: нормализованные строки (normalize_logs)
+            cursor: курсор службы для следующего запроса
+            reset: строки заменяют загруженные ранее, иначе дополняют их
+        """
+        self._log_cursor = cursor
+        
+        if reset:
+            self.all_logs = list(logs)
+            self.all_logs_norm = list(logs_norm)
             
-            # Применение фильтра
-            self.apply_filter()
+            # Все строки выводятся один раз, фильтр только скрывает блоки
+            self.render_logs()
+        elif logs_norm:
+            self.append_logs(logs, logs_norm)
         else:
-            QMessageBox.warning(
-                self,
-                "Ошибка",
-                f"Не удалось загрузить логи:\n{error}"
-            )
+            # Новых записей нет
+            return
+        
+        self._last_filter = None
+        self._filter_cache.clear()
+        self.info_label.setText(f"Всего событий: {len(self.all_logs)}")
+        
+        # Применение фильтра
+        self.apply_filter()
+    
+    def on_logs_load_failed(self, error: str):
+        """Обработка ошибки загрузки логов"""
+        QMessageBox.warning(
+            self,
+            "Ошибка",
+            f"Не удалось загрузить логи:\n{error}"
+        )
+    
+    def schedule_filter(self, text: str = ""):
+        """Отложенная фильтрация (перезапуск таймера при каждом нажатии)"""
+        # Поисковый запрос приводится к форме casefold один раз при вводе
+        self._search_text = text.casefold()
+        self.filter_timer.start(self.FILTER_DEBOUNCE_INTERVAL)
     
     def apply_filter(self):
         """Применение фильтра и поиска"""
         filter_type = self.filter_combo.currentText()
-        search_text = self.search_input.text().lower()
-        
-        # Фильтрация логов
-        filtered_logs = []
+        search_text = self._search_text
+        
+        key = (filter_type, search_text)
+        filtered_logs = self._filter_cache.get(key)
+        if filtered_logs is None:
+            filtered_logs = self._filter_indices(filter_type, search_text)
+            self._filter_cache[key] = filtered_logs
+            if len(self._filter_cache) > self.FILTER_CACHE_SIZE:
+                self._filter_cache.popitem(last=False)
+        else:
+            self._filter_cache.move_to_end(key)
         
-        for log_line in self.all_logs:
-            # Применение фильтра по типу
-            if filter_type != "Все события":
-                if not self.matches_filter(log_line, filter_type):
-                    continue
-            
-            # Применение поиска
-            if search_text and search_text not in log_line.lower():
-                continue
-            
-            filtered_logs.append(log_line)
+        self._last_filter = (filter_type, search_text, filtered_logs)
         
         # Обновление отображения
         self.update_display(filtered_logs)
@@ -200,103 +481,162 @@ class LogsView(QWidget):
         # Обновление счётчика
         self.filtered_label.setText(f"Отображено: {len(filtered_logs)}")
     
-    def matches_filter(self, log_line: str, filter_type: str) -> bool:
-        """Проверка соответствия лога фильтру"""
-        log_upper = log_line.upper()
-        
-        if filter_type == "SYSTEM_START / STOP":
-            return "SYSTEM_START" in log_upper or "SYSTEM_STOP" in log_upper
-        
-        elif filter_type == "MODE (Режимы)":
-            return any(keyword in log_upper for keyword in [
-                "INIT_MODE", "UPDATE_MODE", "EMERGENCY_MODE"
-            ])
-        
-        elif filter_type == "FILE (Файлы)":
-            return any(keyword in log_upper for keyword in [
-                "FILE_ADDED", "FILE_VERIFIED", "FILE_MODIFIED"
-            ])
-        
-        elif filter_type == "VIOLATION (Нарушения)":
-            return "UNAUTHORIZED" in log_upper or "SUSPICIOUS" in log_upper
-        
-        elif filter_type == "RESTORE (Восстановление)":
-            return "RESTORED" in log_upper or "BACKUP" in log_upper
+    def _filter_indices(self, filter_type: str, search_text: str) -> list:
+        """Индексы строк, соответствующих фильтру и поисковому запросу"""
+        # Запрос, содержащий предыдущий, может совпасть только со строками
+        # предыдущего результата (при наборе текста - уточнение поиска)
+        source = range(len(self.all_logs_norm))
+        if self._last_filter is not None:
+            last_filter_type, last_search_text, last_result = self._last_filter
+            if filter_type == last_filter_type and last_search_text in search_text:
+                source = last_result
+        
+        # Маска категории фильтра (0 - все события)
+        filter_mask = FILTER_TO_MASK.get(filter_type, 0)
+        
+        # Фильтрация логов (индексы строк): фильтр по типу - маска
+        # категорий, поиск - по строкам, приведённым к форме casefold
+        # при загрузке
+        logs_norm = self.all_logs_norm
+        if filter_mask:
+            filtered_logs = [
+                index for index in source
+                if logs_norm[index][2] & filter_mask and search_text in logs_norm[index][1]
+            ]
+        elif search_text:
+            filtered_logs = [index for index in source if search_text in logs_norm[index][1]]
+        else:
+            filtered_logs = list(source)
+        return filtered_logs
+    
+    def render_logs(self):
+        """
+        Вывод всех загруженных строк: строка лога - блок документа
         
-        elif filter_type == "RANSOMWARE":
-            return "RANSOMWARE" in log_upper or "MASS_MODIFICATION" in log_upper
+        Вставка выполняется одной операцией редактирования (одна
+        перекомпоновка); число блоков ограничено количеством строк
+        """
+        self.log_display.clear()
+        self.log_display.setMaximumBlockCount(max(len(self.all_logs_norm), self.get_lines_count()))
+        
+        cursor = QTextCursor(self.log_display.document())
+        cursor.beginEditBlock()
+        for index, (log_line, _, _, severity) in enumerate(self.all_logs_norm):
+            if index:
+                cursor.insertBlock()
+            fmt, prefix = self._severity_formats[severity]
+            cursor.insertText(prefix + log_line, fmt)
+        cursor.endEditBlock()
+        
+        self._visible_lines = set(range(len(self.all_logs_norm)))
+        self._rendered = True
+    
+    def append_logs(self, logs: list, logs_norm: list):
+        """
+        Добавление новых строк в конец области логов
+        
+        Строки сверх выбранного количества удаляются с начала; выведенные
+        блоки не перерисовываются, новые строки видимы до применения фильтра
+        """
+        count = len(self.all_logs_norm)
+        overflow = count + len(logs_norm) - self.get_lines_count()
+        
+        self.all_logs.extend(logs)
+        self.all_logs_norm.extend(logs_norm)
+        if overflow > 0:
+            del self.all_logs[:overflow]
+            del self.all_logs_norm[:overflow]
+        
+        # Область пуста или вытесняются все выведенные строки
+        if not self._rendered or not count or overflow >= count:
+            self.render_logs()
+            return
         
-        elif filter_type == "EMERGENCY":
-            return "EMERGENCY" in log_upper
+        document = self.log_display.document()
+        cursor = QTextCursor(document)
+        cursor.beginEditBlock()
         
-        elif filter_type == "ERROR":
-            return "[ERROR]" in log_upper
+        if overflow > 0:
+            cursor.setPosition(document.findBlockByNumber(overflow).position(), QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+            self._visible_lines = {index - overflow for index in self._visible_lines if index >= overflow}
+            document.firstBlock().setVisible(0 in self._visible_lines)
         
-        elif filter_type == "WARNING":
-            return "[WARNING]" in log_upper
+        cursor.movePosition(QTextCursor.End)
+        for log_line, _, _, severity in logs_norm:
+            cursor.insertBlock()
+            fmt, prefix = self._severity_formats[severity]
+            cursor.insertText(prefix + log_line, fmt)
+        cursor.endEditBlock()
         
-        return True
+        self._visible_lines.update(range(len(self.all_logs_norm) - len(logs_norm), len(self.all_logs_norm)))
     
     def update_display(self, logs: list):
-        """Обновление отображения логов"""
-        self.log_display.clear()
-        
-        for log_line in logs:
-            self.append_colored_log(log_line)
-    
-    def append_colored_log(self, log_line: str):
-        """Добавление строки лога с цветовым кодированием"""
-        # Определение цвета по уровню
-        color = None
-        prefix = ""
-        
-        log_upper = log_line.upper()
-        
-        if "EMERGENCY" in log_upper or "RANSOMWARE" in log_upper:
-            color = QColor(255, 0, 0)  # Красный
-            prefix = "🚨 "
-        elif "CRITICAL" in log_upper or "UNAUTHORIZED" in log_upper:
-            color = QColor(220, 0, 0)  # Тёмно-красный
-            prefix = "🔴 "
-        elif "WARNING" in log_upper or "SUSPICIOUS" in log_upper:
-            color = QColor(255, 165, 0)  # Оранжевый
-            prefix = "🟡 "
-        elif "ERROR" in log_upper:
-            color = QColor(255, 100, 100)  # Светло-красный
-            prefix = "🔴 "
-        else:
-            color = QColor(100, 100, 100)  # Серый
-            prefix = "🟢 "
-        
-        # Форматирование текста
-        cursor = self.log_display.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        
-        fmt = QTextCharFormat()
-        fmt.setForeground(color)
-        
-        cursor.insertText(prefix + log_line + "\n", fmt)
-        
-        # Автопрокрутка вниз
-        self.log_display.setTextCursor(cursor)
-        self.log_display.ensureCursorVisible()
+        """
+        Обновление отображения логов (индексы отображаемых строк)
+        
+        Меняется видимость только тех блоков, чьё состояние изменилось:
+        при уточнении поиска - только скрываемых строк. Перекомпоновка
+        и перерисовка выполняются один раз на всё обновление
+        """
+        if not self._rendered:
+            self.render_logs()
+        
+        document = self.log_display.document()
+        visible_lines = set(logs)
+        changed = self._visible_lines ^ visible_lines
+        self._visible_lines = visible_lines
+        
+        self.log_display.setUpdatesEnabled(False)
+        try:
+            if changed:
+                for index in changed:
+                    document.findBlockByNumber(index).setVisible(index in visible_lines)
+                
+                # Одна отметка на диапазон изменённых блоков вместо отметки на блок
+                first = document.findBlockByNumber(min(changed))
+                last = document.findBlockByNumber(max(changed))
+                start = first.position()
+                document.markContentsDirty(start, last.position() + last.length() - start)
+            
+            # Автопрокрутка вниз
+            self.log_display.moveCursor(QTextCursor.End)
+            self.log_display.ensureCursorVisible()
+        finally:
+            self.log_display.setUpdatesEnabled(True)
+    
+    def on_lines_changed(self, text: str):
+        """Перезагрузка логов с выбранным количеством строк"""
+        self._log_cursor = None
+        self.refresh()
     
     def clear_display(self):
         """Очистка экрана (не удаляет логи)"""
         self.log_display.clear()
+        self._visible_lines = set()
+        self._rendered = False
     
     def toggle_auto_refresh(self, state):
-        """Переключение автообновления"""
+        """
+        Переключение автообновления
+        
+        Периодическое обновление выполняет общий таймер главного окна
+        """
         self.auto_refresh = (state == Qt.Checked)
+        self.auto_refresh_toggled.emit(self.auto_refresh)
         
         if self.auto_refresh:
             # Обновление сразу
             self.refresh()
     
     def export_logs(self):
-        """Экспорт логов в файл"""
+        """Экспорт логов в файл (запись в отдельном потоке)"""
         from PySide6.QtWidgets import QFileDialog
         
+        # Предыдущий экспорт ещё не завершён
+        if self.export_thread is not None and self.export_thread.isRunning():
+            return
+        
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             "Сохранить логи",
@@ -305,18 +645,24 @@ class LogsView(QWidget):
         )
         
         if file_path:
-            try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write('\n'.join(self.all_logs))
-                
-                QMessageBox.information(
-                    self,
-                    "Успех",
-                    f"Логи сохранены:\n{file_path}"
-                )
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "Ошибка",
-                    f"Не удалось сохранить логи:\n{e}"
-                )
\ No newline at end of file
+            # Копия списка: новые строки могут поступить во время записи
+            self.export_thread = LogsExportThread(list(self.all_logs), file_path)
+            self.export_thread.saved.connect(self.on_logs_exported)
+            self.export_thread.failed.connect(self.on_logs_export_failed)
+            self.export_thread.start()
+    
+    def on_logs_exported(self, file_path: str):
+        """Обработка завершения экспорта логов"""
+        QMessageBox.information(
+            self,
+            "Успех",
+            f"Логи сохранены:\n{file_path}"
+        )
+    
+    def on_logs_export_failed(self, error: str):
+        """Обработка ошибки экспорта логов"""
+        QMessageBox.critical(
+            self,
+            "Ошибка",
+            f"Не удалось сохранить логи:\n{error}"
+        )
\ No newline at end of file
@@ -250,6 +250,15 @@ class MainView(QWidget):
         if not success:
             return
         
+        self.apply_status(status)
+    
+    def apply_status(self, status: dict):
+        """
+        Отображение статуса службы
+        
+        Вызывается и после запроса, и по уведомлению службы со статусом
+        (без повторного запроса)
+        """
         # Обновление режима
         mode = status.get('mode', 'MONITOR')
         self.current_mode = mode
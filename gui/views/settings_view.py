@@ -1,13 +1,60 @@
 # gui/views/settings_view.py
 
+import os
+from functools import lru_cache
+from typing import Optional
+
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QGroupBox,
-    QListWidget, QListWidgetItem, QPushButton, QFileDialog,
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QGroupBox,
+    QListWidget, QPushButton, QFileDialog,
     QMessageBox, QLabel, QLineEdit, QSpinBox, QDoubleSpinBox,
-    QFormLayout, QCheckBox
+    QFormLayout, QCheckBox, QStyle
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont
+from PySide6.QtCore import Qt, QThread, QTimer, Signal, QSignalBlocker, QSettings
+from PySide6.QtGui import QFont, QIcon
+
+@lru_cache(maxsize=None)
+def _icon(theme_name: str, fallback: QStyle.StandardPixmap) -> QIcon:
+    """
+    Значок кнопки: из темы оформления, иначе стандартный значок стиля Qt
+    
+    Значки вместо эмодзи в подписях не требуют загрузки шрифта эмодзи
+    при первой отрисовке; созданный значок используется повторно
+    """
+    return QIcon.fromTheme(theme_name, QApplication.style().standardIcon(fallback))
+
+
+class SettingsLoaderThread(QThread):
+    """Поток для загрузки защищаемых путей и конфигурации"""
+    loaded = Signal(list, dict)
+    failed = Signal(str)
+    
+    def __init__(self, daemon_client):
+        super().__init__()
+        self.daemon_client = daemon_client
+    
+    def run(self):
+        # Пути и конфигурация запрашиваются одним пакетом
+        success, settings, error = self.daemon_client.get_settings()
+        
+        if success:
+            self.loaded.emit(settings['paths'], settings['config'])
+        else:
+            self.failed.emit(error)
+
+
+class DaemonCallThread(QThread):
+    """Поток для выполнения запроса к службе: function(*args) -> (успешность, данные, ошибка)"""
+    finished = Signal(bool, object, str)
+    
+    def __init__(self, function, *args):
+        super().__init__()
+        self.function = function
+        self.args = args
+    
+    def run(self):
+        success, data, error = self.function(*self.args)
+        self.finished.emit(success, data, error)
 
 
 class SettingsView(QWidget):
@@ -20,20 +67,127 @@ class SettingsView(QWidget):
     - Параметры мониторинга
     """
     
+    # Оформление вкладки: одна таблица стилей с селекторами по objectName
+    # вместо отдельной таблицы у каждого виджета
+    STYLE_SHEET = (
+        "QLabel#description { color: gray; }"
+        "QLabel#smallDescription { color: gray; font-size: 9pt; }"
+        "QPushButton#saveButton { background-color: #4CAF50; color: white; padding: 8px; }"
+    )
+    
+    # Отступы и интервалы layout вкладки и групп (задаются явно при
+    # создании, а не вычисляются стилем при первой компоновке)
+    LAYOUT_MARGINS = (9, 9, 9, 9)
+    LAYOUT_SPACING = 15
+    GROUP_MARGINS = (9, 9, 9, 9)
+    
+    # Задержка обновления (мс): серия запросов обновления - одна загрузка
+    REFRESH_DEBOUNCE_INTERVAL = 200
+    
+    # Параметры диалогов выбора: без поиска значков каждой директории
+    # (заметно ускоряет встроенный диалог Qt в больших каталогах)
+    FILE_DIALOG_OPTIONS = QFileDialog.DontUseCustomDirectoryIcons
+    
+    # Допустимые значения изменяемых параметров: (минимум, максимум, название)
+    CONFIG_LIMITS = {
+        'fallback_interval': (10, 600, "Интервал fallback проверки"),
+        'files_count': (1, 100, "Количество файлов"),
+        'time_window': (1, 60, "Временное окно"),
+        'block_change_percent': (10, 100, "Процент изменённых блоков"),
+        'entropy_threshold': (0.0, 8.0, "Порог энтропии"),
+    }
+    
     def __init__(self, daemon_client):
         super().__init__()
         self.daemon_client = daemon_client
         
+        self._fully_built = False  # Группы конфигурации и действий созданы
+        self._config = None  # Последняя загруженная конфигурация
+        self._saved_config = None  # Значения полей, совпадающие с конфигурацией службы
+        self._saving_config = None  # Конфигурация, отправленная на сохранение
+        self._pending_path = None  # Путь, добавляемый или удаляемый в потоке
+        self._paths = None  # Последний загруженный список путей
+        self.loader_thread = None  # Поток загрузки настроек
+        self.path_thread = None  # Поток добавления/удаления пути
+        self.save_thread = None  # Поток сохранения настроек
+        
+        self._message_box = None  # Окно сообщений (создаётся при первом сообщении)
+        self._dir_dialog = None  # Диалог выбора директории (создаётся при первом открытии)
+        self._file_dialog = None  # Диалог выбора файла (создаётся при первом открытии)
+        self._local_settings = QSettings("secure_fs_guard", "gui")  # Локальные настройки интерфейса
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self.load_settings)
+        
         self.init_ui()
     
     def init_ui(self):
-        """Инициализация интерфейса"""
-        main_layout = QVBoxLayout(self)
-        main_layout.setSpacing(15)
+        """
+        Инициализация интерфейса
+        
+        Сразу создаётся только группа путей; конфигурация, пороги и кнопки
+        действий создаются при первом показе вкладки (showEvent)
+        """
+        self.main_layout = main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(*self.LAYOUT_MARGINS)
+        main_layout.setSpacing(self.LAYOUT_SPACING)
+        
+        self.setStyleSheet(self.STYLE_SHEET)
+        
+        self._build_paths_group(main_layout)
+        
+        # Место для групп, создаваемых при первом показе
+        self.lazy_layout = QVBoxLayout()
+        self.lazy_layout.setContentsMargins(0, 0, 0, 0)
+        self.lazy_layout.setSpacing(self.LAYOUT_SPACING)
+        main_layout.addLayout(self.lazy_layout)
+        
+        # Растягивание
+        main_layout.addStretch()
         
-        # ========== Защищаемые пути ==========
-        paths_group = QGroupBox("Защищаемые пути")
+        # Одна компоновка после создания всех виджетов
+        main_layout.activate()
+    
+    def _notify(self, icon: QMessageBox.Icon, title: str, text: str):
+        """Модальное сообщение в одном переиспользуемом окне вкладки"""
+        if self._message_box is None:
+            self._message_box = QMessageBox(self)
+        elif self._message_box.isVisible():
+            # Окно уже открыто (сообщение пришло во время показа другого)
+            QMessageBox(icon, title, text, QMessageBox.Ok, self).exec()
+            return
+        
+        self._message_box.setIcon(icon)
+        self._message_box.setWindowTitle(title)
+        self._message_box.setText(text)
+        self._message_box.exec()
+    
+    def showEvent(self, event):
+        """Создание оставшихся групп при первом показе вкладки"""
+        if not self._fully_built:
+            # Группы добавляются в уже показываемую вкладку - одна перерисовка
+            self.setUpdatesEnabled(False)
+            try:
+                self._build_config_group(self.lazy_layout)
+                self._build_ransomware_group(self.lazy_layout)
+                self._build_actions(self.lazy_layout)
+                self.main_layout.activate()
+            finally:
+                self.setUpdatesEnabled(True)
+            self._fully_built = True
+            
+            # Конфигурация могла быть загружена до создания групп
+            if self._config is not None:
+                self.apply_config(self._config)
+        
+        super().showEvent(event)
+    
+    def _build_paths_group(self, main_layout: QVBoxLayout):
+        """Группа защищаемых путей"""
+        self.paths_group = paths_group = QGroupBox("Защищаемые пути")
         paths_layout = QVBoxLayout(paths_group)
+        paths_layout.setContentsMargins(*self.GROUP_MARGINS)
         
         # Описание
         description = QLabel(
@@ -41,7 +195,7 @@ class SettingsView(QWidget):
             "Изменения этих файлов будут отслеживаться и контролироваться."
         )
         description.setWordWrap(True)
-        description.setStyleSheet("color: gray;")
+        description.setObjectName("description")
         paths_layout.addWidget(description)
         
         # Список путей
@@ -52,15 +206,15 @@ class SettingsView(QWidget):
         # Кнопки управления путями
         paths_buttons = QHBoxLayout()
         
-        btn_add_dir = QPushButton("📁 Добавить директорию")
+        btn_add_dir = QPushButton(_icon("folder", QStyle.SP_DirIcon), "Добавить директорию")
         btn_add_dir.clicked.connect(self.add_directory)
         paths_buttons.addWidget(btn_add_dir)
         
-        btn_add_file = QPushButton("📄 Добавить файл")
+        btn_add_file = QPushButton(_icon("text-x-generic", QStyle.SP_FileIcon), "Добавить файлы")
         btn_add_file.clicked.connect(self.add_file)
         paths_buttons.addWidget(btn_add_file)
         
-        btn_remove = QPushButton("🗑️ Удалить выбранный")
+        btn_remove = QPushButton(_icon("edit-delete", QStyle.SP_TrashIcon), "Удалить выбранный")
         btn_remove.clicked.connect(self.remove_path)
         paths_buttons.addWidget(btn_remove)
         
@@ -69,58 +223,71 @@ class SettingsView(QWidget):
         paths_layout.addLayout(paths_buttons)
         
         main_layout.addWidget(paths_group)
-        
-        # ========== Конфигурация ==========
+    
+    def _build_form(self, group: QGroupBox, rows: list, footer: Optional[QWidget] = None) -> QFormLayout:
+        """
+        Форма группы: все строки (подпись, виджет) добавляются одним проходом
+        при выключенных обновлениях группы
+        """
+        group.setUpdatesEnabled(False)
+        try:
+            form = QFormLayout(group)
+            form.setContentsMargins(*self.GROUP_MARGINS)
+            form.setFieldGrowthPolicy(QFormLayout.AllNonFixedFieldsGrow)
+            for label, widget in rows:
+                form.addRow(label, widget)
+            if footer is not None:
+                form.addRow(footer)
+        finally:
+            group.setUpdatesEnabled(True)
+        return form
+    
+    def _build_config_group(self, main_layout: QVBoxLayout):
+        """Группа конфигурации системы"""
         config_group = QGroupBox("Конфигурация системы")
-        config_layout = QFormLayout(config_group)
         
-        # Размер блока
-        self.block_size_spin = QSpinBox()
-        self.block_size_spin.setRange(4, 1024)
-        self.block_size_spin.setValue(64)
-        self.block_size_spin.setSuffix(" KB")
-        self.block_size_spin.setEnabled(False)  # Только чтение (требует переинициализации)
-        config_layout.addRow("Размер блока:", self.block_size_spin)
+        # Размер блока (только чтение: изменение требует переинициализации)
+        self.block_size_label = QLabel("—")
         
         # Fallback интервал
         self.fallback_interval_spin = QSpinBox()
-        self.fallback_interval_spin.setRange(10, 600)
+        self.fallback_interval_spin.setRange(*self.CONFIG_LIMITS['fallback_interval'][:2])
         self.fallback_interval_spin.setValue(60)
         self.fallback_interval_spin.setSuffix(" сек")
-        config_layout.addRow("Интервал fallback проверки:", self.fallback_interval_spin)
         
-        main_layout.addWidget(config_group)
+        self._build_form(config_group, [
+            ("Размер блока:", self.block_size_label),
+            ("Интервал fallback проверки:", self.fallback_interval_spin),
+        ])
         
-        # ========== Пороги ransomware ==========
+        main_layout.addWidget(config_group)
+    
+    def _build_ransomware_group(self, main_layout: QVBoxLayout):
+        """Группа порогов обнаружения ransomware"""
         ransomware_group = QGroupBox("Пороги обнаружения ransomware")
-        ransomware_layout = QFormLayout(ransomware_group)
         
         # Количество файлов
         self.ransomware_files_spin = QSpinBox()
-        self.ransomware_files_spin.setRange(1, 100)
+        self.ransomware_files_spin.setRange(*self.CONFIG_LIMITS['files_count'][:2])
         self.ransomware_files_spin.setValue(10)
-        ransomware_layout.addRow("Количество файлов:", self.ransomware_files_spin)
         
         # Временное окно
         self.ransomware_time_spin = QSpinBox()
-        self.ransomware_time_spin.setRange(1, 60)
+        self.ransomware_time_spin.setRange(*self.CONFIG_LIMITS['time_window'][:2])
         self.ransomware_time_spin.setValue(10)
         self.ransomware_time_spin.setSuffix(" сек")
-        ransomware_layout.addRow("Временное окно:", self.ransomware_time_spin)
         
         # Процент изменённых блоков
         self.ransomware_blocks_spin = QSpinBox()
-        self.ransomware_blocks_spin.setRange(10, 100)
+        self.ransomware_blocks_spin.setRange(*self.CONFIG_LIMITS['block_change_percent'][:2])
         self.ransomware_blocks_spin.setValue(70)
         self.ransomware_blocks_spin.setSuffix(" %")
-        ransomware_layout.addRow("Процент изменённых блоков:", self.ransomware_blocks_spin)
         
         # Порог энтропии
         self.ransomware_entropy_spin = QDoubleSpinBox()
-        self.ransomware_entropy_spin.setRange(0.0, 8.0)
+        self.ransomware_entropy_spin.setRange(*self.CONFIG_LIMITS['entropy_threshold'][:2])
         self.ransomware_entropy_spin.setValue(7.5)
         self.ransomware_entropy_spin.setSingleStep(0.1)
-        ransomware_layout.addRow("Порог энтропии:", self.ransomware_entropy_spin)
         
         # Описание
         ransomware_description = QLabel(
@@ -129,66 +296,135 @@ class SettingsView(QWidget):
             "система определит это как атаку ransomware."
         )
         ransomware_description.setWordWrap(True)
-        ransomware_description.setStyleSheet("color: gray; font-size: 9pt;")
-        ransomware_layout.addRow(ransomware_description)
+        ransomware_description.setObjectName("smallDescription")
         
-        main_layout.addWidget(ransomware_group)
+        self._build_form(ransomware_group, [
+            ("Количество файлов:", self.ransomware_files_spin),
+            ("Временное окно:", self.ransomware_time_spin),
+            ("Процент изменённых блоков:", self.ransomware_blocks_spin),
+            ("Порог энтропии:", self.ransomware_entropy_spin),
+        ], ransomware_description)
         
-        # ========== Кнопки действий ==========
+        main_layout.addWidget(ransomware_group)
+    
+    def _build_actions(self, main_layout: QVBoxLayout):
+        """Кнопки действий"""
         actions_layout = QHBoxLayout()
         
-        btn_save = QPushButton("💾 Сохранить настройки")
-        btn_save.clicked.connect(self.save_settings)
-        btn_save.setStyleSheet("background-color: #4CAF50; color: white; padding: 8px;")
-        actions_layout.addWidget(btn_save)
+        self.btn_save = QPushButton(_icon("document-save", QStyle.SP_DialogSaveButton), "Сохранить настройки")
+        self.btn_save.clicked.connect(self.save_settings)
+        self.btn_save.setObjectName("saveButton")
+        actions_layout.addWidget(self.btn_save)
         
-        btn_refresh = QPushButton("🔄 Обновить")
+        btn_refresh = QPushButton(_icon("view-refresh", QStyle.SP_BrowserReload), "Обновить")
         btn_refresh.clicked.connect(self.refresh)
         actions_layout.addWidget(btn_refresh)
         
         actions_layout.addStretch()
         
         main_layout.addLayout(actions_layout)
-        
-        # Растягивание
-        main_layout.addStretch()
     
     def refresh(self):
-        """Обновление данных"""
+        """Обновление данных (отложенное: частые вызовы объединяются в одну загрузку)"""
+        if not self.refresh_timer.isActive():
+            self.refresh_timer.start(self.REFRESH_DEBOUNCE_INTERVAL)
+    
+    def load_settings(self):
+        """
+        Загрузка путей и конфигурации
+        
+        Данные берутся из общего кэша клиента (свежие - без обращения к
+        службе); загрузка идёт в отдельном потоке, а до её завершения
+        остаются показанными прежние значения
+        """
         if not self.daemon_client.is_connected:
             return
         
-        # Загрузка защищаемых путей
-        self.load_protected_paths()
+        # Предыдущая загрузка ещё не завершена
+        if self.loader_thread is not None and self.loader_thread.isRunning():
+            return
         
-        # Загрузка конфигурации
-        self.load_config()
+        self.loader_thread = SettingsLoaderThread(self.daemon_client)
+        self.loader_thread.loaded.connect(self.on_settings_loaded)
+        self.loader_thread.failed.connect(self.on_settings_load_failed)
+        self.loader_thread.start()
     
-    def load_protected_paths(self):
-        """Загрузка списка защищаемых путей"""
-        success, paths, error = self.daemon_client.get_paths()
+    def on_settings_loaded(self, paths: list, config: dict):
+        """Обработка загруженных путей и конфигурации"""
+        self.apply_paths(paths)
         
-        self.paths_list.clear()
+        # Конфигурация не изменилась - поля (и несохранённые правки) не трогаются
+        if config == self._config:
+            return
+        self._config = config
         
-        if success:
-            for path in paths:
-                item = QListWidgetItem(path)
-                self.paths_list.addItem(item)
-        else:
-            QMessageBox.warning(
-                self,
-                "Ошибка",
-                f"Не удалось загрузить список путей:\n{error}"
-            )
+        # Группы ещё не созданы - значения применятся при первом показе
+        if self._fully_built:
+            self.apply_config(config)
     
-    def load_config(self):
-        """Загрузка конфигурации"""
-        success, config, error = self.daemon_client.get_config()
+    def on_settings_load_failed(self, error: str):
+        """Обработка ошибки загрузки: прежние данные остаются на экране"""
+        if self._paths is not None:
+            return
         
-        if success:
+        self._notify(
+            QMessageBox.Warning,
+            "Ошибка",
+            f"Не удалось загрузить настройки:\n{error}"
+        )
+    
+    def reload(self):
+        """Загрузка путей и конфигурации без учёта кэша (после изменений)"""
+        self.daemon_client.invalidate_settings()
+        self.refresh()
+    
+    def apply_paths(self, paths: list):
+        """
+        Вывод списка защищаемых путей
+        
+        Изменяются только удалённые и добавленные пути: выделение и
+        прокрутка списка сохраняются, неизменный список не трогается
+        """
+        old_paths = set(self._paths or ())
+        new_paths = set(paths)
+        self._paths = paths
+        
+        removed = old_paths - new_paths
+        added = [path for path in paths if path not in old_paths]
+        if not removed and not added:
+            return
+        
+        # Изменение без промежуточных сигналов и перерисовок
+        self.paths_list.setUpdatesEnabled(False)
+        self.paths_list.blockSignals(True)
+        try:
+            if removed:
+                for row in range(self.paths_list.count() - 1, -1, -1):
+                    if self.paths_list.item(row).text() in removed:
+                        self.paths_list.takeItem(row)
+            self.paths_list.addItems(added)
+        finally:
+            self.paths_list.blockSignals(False)
+            self.paths_list.setUpdatesEnabled(True)
+    
+    def apply_config(self, config: dict):
+        """
+        Вывод значений конфигурации в поля
+        
+        Значения устанавливаются без сигналов valueChanged и с одной
+        перерисовкой вкладки
+        """
+        spins = (
+            self.fallback_interval_spin,
+            self.ransomware_files_spin, self.ransomware_time_spin,
+            self.ransomware_blocks_spin, self.ransomware_entropy_spin
+        )
+        blockers = [QSignalBlocker(spin) for spin in spins]
+        self.setUpdatesEnabled(False)
+        try:
             # Размер блока
             block_size_kb = config.get('block_size', 65536) // 1024
-            self.block_size_spin.setValue(block_size_kb)
+            self.block_size_label.setText(f"{block_size_kb} KB")
             
             # Fallback интервал
             fallback = config.get('fallback_interval', 60)
@@ -200,54 +436,145 @@ class SettingsView(QWidget):
             self.ransomware_time_spin.setValue(thresholds.get('time_window', 10))
             self.ransomware_blocks_spin.setValue(thresholds.get('block_change_percent', 70))
             self.ransomware_entropy_spin.setValue(thresholds.get('entropy_threshold', 7.5))
-        else:
-            QMessageBox.warning(
-                self,
-                "Ошибка",
-                f"Не удалось загрузить конфигурацию:\n{error}"
-            )
+        finally:
+            self.setUpdatesEnabled(True)
+            for blocker in blockers:
+                blocker.unblock()
+        
+        # Снимок значений полей (после округления спинбоксами) для сравнения при сохранении
+        self._saved_config = self.collect_config()
+    
+    def collect_config(self) -> dict:
+        """Изменяемая часть конфигурации из значений полей"""
+        return {
+            'fallback_interval': self.fallback_interval_spin.value(),
+            'ransomware_thresholds': {
+                'files_count': self.ransomware_files_spin.value(),
+                'time_window': self.ransomware_time_spin.value(),
+                'block_change_percent': self.ransomware_blocks_spin.value(),
+                'entropy_threshold': self.ransomware_entropy_spin.value()
+            }
+        }
     
     def add_directory(self):
         """Добавление директории"""
-        directory = QFileDialog.getExistingDirectory(
-            self,
-            "Выберите директорию для защиты",
-            "",
-            QFileDialog.ShowDirsOnly
-        )
+        if self._dir_dialog is None:
+            self._dir_dialog = self._create_file_dialog("Выберите директорию для защиты")
+            self._dir_dialog.setFileMode(QFileDialog.Directory)
+            self._dir_dialog.setOption(QFileDialog.ShowDirsOnly, True)
+            self._dir_dialog.fileSelected.connect(self.add_path)
         
-        if directory:
-            self.add_path(directory)
+        self._dir_dialog.open()
     
     def add_file(self):
-        """Добавление файла"""
-        file_path, _ = QFileDialog.getOpenFileName(
-            self,
-            "Выберите файл для защиты",
-            "",
-            "Все файлы (*)"
-        )
-        
-        if file_path:
-            self.add_path(file_path)
+        """Добавление файлов (можно выбрать несколько)"""
+        if self._file_dialog is None:
+            self._file_dialog = self._create_file_dialog("Выберите файлы для защиты")
+            self._file_dialog.setFileMode(QFileDialog.ExistingFiles)
+            self._file_dialog.setNameFilter("Все файлы (*)")
+            self._file_dialog.filesSelected.connect(self.add_paths)
+        
+        self._file_dialog.open()
+    
+    def _create_file_dialog(self, title: str) -> QFileDialog:
+        """
+        Диалог выбора пути, переиспользуемый между открытиями
+        
+        Текущая директория, история и боковая панель сохраняются и не
+        перечитываются при каждом открытии
+        """
+        dialog = QFileDialog(self, title)
+        dialog.setOptions(self.FILE_DIALOG_OPTIONS)
+        
+        # Начальная директория - последняя использованная, а не текущая
+        # директория процесса, которую пришлось бы читать заново
+        last_dir = self._local_settings.value("lastDir", "", type=str)
+        if last_dir and os.path.isdir(last_dir):
+            dialog.setDirectory(last_dir)
+        return dialog
+    
+    def _remember_directory(self, path: str):
+        """Сохранение родительской директории добавленного пути для диалогов"""
+        last_dir = os.path.dirname(os.path.normpath(path))
+        self._local_settings.setValue("lastDir", last_dir)
+        
+        for dialog in (self._dir_dialog, self._file_dialog):
+            if dialog is not None:
+                dialog.setDirectory(last_dir)
     
     def add_path(self, path: str):
-        """Добавление пути в защиту"""
-        success, message, error = self.daemon_client.add_path(path)
+        """Добавление пути в защиту (запрос в отдельном потоке)"""
+        self.paths_group.setEnabled(False)
+        
+        self._pending_path = path
+        self.path_thread = DaemonCallThread(self.daemon_client.add_path, path)
+        self.path_thread.finished.connect(self.on_path_added)
+        self.path_thread.start()
+    
+    def add_paths(self, paths: list):
+        """
+        Добавление нескольких путей одним пакетом запросов (в отдельном потоке)
+        
+        Список путей перечитывается один раз - после ответа на весь пакет
+        """
+        if len(paths) == 1:
+            self.add_path(paths[0])
+            return
+        
+        self.paths_group.setEnabled(False)
+        
+        self.path_thread = DaemonCallThread(self.daemon_client.add_paths, paths)
+        self.path_thread.finished.connect(self.on_paths_added)
+        self.path_thread.start()
+    
+    def on_paths_added(self, success: bool, result: object, error: str):
+        """Обработка результата пакетного добавления путей"""
+        self.paths_group.setEnabled(True)
+        
+        result = result or {}
+        added = result.get('added', [])
+        failed = result.get('failed', [])
+        
+        if added:
+            self._remember_directory(added[-1])
+            self.reload()
+        
+        if failed:
+            details = "\n".join(f"{path}: {path_error}" for path, path_error in failed)
+            self._notify(
+                QMessageBox.Warning if added else QMessageBox.Critical,
+                "Ошибка",
+                f"Добавлено путей: {len(added)}\n"
+                f"Не удалось добавить ({len(failed)}):\n{details}"
+            )
+        else:
+            self._notify(
+                QMessageBox.Information,
+                "Успех",
+                f"Добавлено путей: {len(added)}\n\n"
+                "Не забудьте инициализировать эталонное состояние для новых файлов."
+            )
+    
+    def on_path_added(self, success: bool, message: object, error: str):
+        """Обработка результата добавления пути"""
+        path = self._pending_path
+        self.paths_group.setEnabled(True)
         
         if success:
+            self._remember_directory(path)
+            
             # Обновление списка
-            self.load_protected_paths()
+            self.reload()
             
-            QMessageBox.information(
-                self,
+            self._notify(
+                QMessageBox.Information,
                 "Успех",
                 f"Путь добавлен:\n{path}\n\n"
                 "Не забудьте инициализировать эталонное состояние для новых файлов."
             )
         else:
-            QMessageBox.critical(
-                self,
+            self._notify(
+                QMessageBox.Critical,
                 "Ошибка",
                 f"Не удалось добавить путь:\n{error}"
             )
@@ -257,8 +584,8 @@ class SettingsView(QWidget):
         current_item = self.paths_list.currentItem()
         
         if not current_item:
-            QMessageBox.warning(
-                self,
+            self._notify(
+                QMessageBox.Warning,
                 "Предупреждение",
                 "Выберите путь для удаления"
             )
@@ -275,53 +602,100 @@ class SettingsView(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            success, message, error = self.daemon_client.remove_path(path)
+            self.paths_group.setEnabled(False)
+            
+            self._pending_path = path
+            self.path_thread = DaemonCallThread(self.daemon_client.remove_path, path)
+            self.path_thread.finished.connect(self.on_path_removed)
+            self.path_thread.start()
+    
+    def on_path_removed(self, success: bool, message: object, error: str):
+        """Обработка результата удаления пути"""
+        path = self._pending_path
+        self.paths_group.setEnabled(True)
+        
+        if success:
+            # Обновление списка
+            self.reload()
             
-            if success:
-                # Обновление списка
-                self.load_protected_paths()
-                
-                QMessageBox.information(
-                    self,
-                    "Успех",
-                    f"Путь удалён:\n{path}"
-                )
-            else:
-                QMessageBox.critical(
-                    self,
-                    "Ошибка",
-                    f"Не удалось удалить путь:\n{error}"
-                )
+            self._notify(
+                QMessageBox.Information,
+                "Успех",
+                f"Путь удалён:\n{path}"
+            )
+        else:
+            self._notify(
+                QMessageBox.Critical,
+                "Ошибка",
+                f"Не удалось удалить путь:\n{error}"
+            )
+    
+    def validate_config(self, config: dict) -> Optional[str]:
+        """
+        Локальная проверка конфигурации перед отправкой службе
+        
+        Returns:
+            описание ошибки или None, если значения допустимы
+        """
+        values = dict(config.get('ransomware_thresholds', {}))
+        values['fallback_interval'] = config.get('fallback_interval')
+        
+        for key, (minimum, maximum, name) in self.CONFIG_LIMITS.items():
+            value = values.get(key)
+            if value is None or not minimum <= value <= maximum:
+                return f"{name}: значение должно быть от {minimum} до {maximum}"
+        return None
     
     def save_settings(self):
         """Сохранение настроек"""
         # Формирование новой конфигурации
-        new_config = {
-            'fallback_interval': self.fallback_interval_spin.value(),
-            'ransomware_thresholds': {
-                'files_count': self.ransomware_files_spin.value(),
-                'time_window': self.ransomware_time_spin.value(),
-                'block_change_percent': self.ransomware_blocks_spin.value(),
-                'entropy_threshold': self.ransomware_entropy_spin.value()
-            }
-        }
+        new_config = self.collect_config()
+        
+        # Значения не менялись с загрузки или последнего сохранения
+        if new_config == self._saved_config:
+            self._notify(
+                QMessageBox.Information,
+                "Сохранение",
+                "Изменений нет - настройки совпадают с текущей конфигурацией."
+            )
+            return
+        
+        error = self.validate_config(new_config)
+        if error:
+            self._notify(
+                QMessageBox.Warning,
+                "Ошибка",
+                f"Недопустимые настройки:\n{error}"
+            )
+            return
+        
+        # Отправка обновлённой конфигурации в отдельном потоке
+        self.btn_save.setEnabled(False)
         
-        # Отправка обновлённой конфигурации
-        success, data, error = self.daemon_client.send_command(
-            self.daemon_client.IPCCommand.UPDATE_CONFIG,
+        self._saving_config = new_config
+        self.save_thread = DaemonCallThread(
+            self.daemon_client.update_config,
             new_config
         )
+        self.save_thread.finished.connect(self.on_settings_saved)
+        self.save_thread.start()
+    
+    def on_settings_saved(self, success: bool, data: object, error: str):
+        """Обработка результата сохранения настроек"""
+        self.btn_save.setEnabled(True)
         
         if success:
-            QMessageBox.information(
-                self,
+            self._saved_config = self._saving_config
+            
+            self._notify(
+                QMessageBox.Information,
                 "Успех",
                 "Настройки сохранены.\n\n"
                 "⚠️ Некоторые изменения могут потребовать перезапуска службы."
             )
         else:
-            QMessageBox.critical(
-                self,
+            self._notify(
+                QMessageBox.Critical,
                 "Ошибка",
                 f"Не удалось сохранить настройки:\n{error}"
             )
\ No newline at end of file